@@ -3,9 +3,10 @@ echo ========================================
 echo    AlgoCompiler Web Server
 echo ========================================
 echo.
-echo Clearing parser cache...
+echo Building parser tables...
 del /Q src\compiler\parser.out 2>nul
-del /Q src\compiler\parsetab.py 2>nul
+set PYTHONPATH=src
+python -m compiler.tables
 echo.
 echo Starting AlgoCompiler web server...
 echo Server will be available at: http://localhost:5000
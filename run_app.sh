@@ -29,9 +29,10 @@ if [ -f "AlgoCompiler.env" ]; then
     export $(grep -v '^#' AlgoCompiler.env | xargs)
 fi
 
-# Clear parser cache to ensure latest changes are loaded
-echo -e "${BLUE}Clearing parser cache...${NC}"
-rm -f src/compiler/parser.out src/compiler/parsetab.py 2>/dev/null
+# Regenerate the lexer/parser tables so the latest grammar loads fast
+echo -e "${BLUE}Building parser tables...${NC}"
+rm -f src/compiler/parser.out 2>/dev/null
+PYTHONPATH=src python3 -m compiler.tables
 
 # Start the server
 echo -e "${GREEN}Starting AlgoCompiler web server...${NC}"
@@ -36,9 +36,10 @@ pkill -f "python3 src/web/app.py" 2>/dev/null
 pkill -f "python src/web/app.py" 2>/dev/null
 sleep 1
 
-# Clear parser cache
-echo -e "${BLUE}→ Clearing parser cache...${NC}"
-rm -f src/compiler/parser.out src/compiler/parsetab.py 2>/dev/null
+# Regenerate parser tables
+echo -e "${BLUE}→ Building parser tables...${NC}"
+rm -f src/compiler/parser.out 2>/dev/null
+PYTHONPATH=src python3 -m compiler.tables
 
 # Start the server in the background
 echo -e "${GREEN}→ Starting AlgoCompiler...${NC}"
@@ -0,0 +1,635 @@
+"""Python AST backend: builds an ast.Module from the typed AST (see nodes.py).
+
+It produces the same program as codegen.py without going through source
+text, so compile() skips tokenising and parsing it. Every statement and
+expression carries the Algo line it comes from, which is what tracebacks
+and the debugger's line events report.
+
+Each method mirrors its CodeGenerator counterpart; tests/test_astgen.py
+checks that both backends agree on every example program.
+"""
+import ast
+
+from compiler import nodes
+from compiler.codegen import (CodeGenerator, MAIN_FUNCTION, _element_type, _is_pointer, _last_line,
+                              _plain_store, _pointer_offset, _pointer_variable, pointer_params, _typed_reader, global_cells, local_cells, main_globals,
+                              main_locals, ProgramScopes, split_definition, statement_lines, subprogram_locals)
+
+# Python precedence of an operator, used to group operands the way the
+# parser groups codegen's output (e.g. `not (a) == b` is `not (a == b)`)
+_PRECEDENCE = {'or': 1, 'and': 2, 'not': 3,
+               '==': 4, '!=': 4, '<': 4, '<=': 4, '>': 4, '>=': 4,
+               '+': 5, '-': 5, '*': 6, '/': 6, '//': 6, '%': 6}
+
+_BINOPS = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult, '/': ast.Div, '//': ast.FloorDiv, '%': ast.Mod}
+_CMPOPS = {'==': ast.Eq, '!=': ast.NotEq, '<': ast.Lt, '<=': ast.LtE, '>': ast.Gt, '>=': ast.GtE}
+_BOOLOPS = {'and': ast.And, 'or': ast.Or}
+
+# FunctionDef grew a required type_params field in Python 3.12
+_NO_TYPE_PARAMS = {'type_params': []} if 'type_params' in ast.FunctionDef._fields else {}
+
+
+def _check_name(name):
+    # codegen writes names verbatim; one that is not a Python identifier
+    # only compiles from source, if at all, so leave it to that path
+    if not name.isidentifier():
+        raise SyntaxError(f"invalid Python name {name!r}")
+    return name
+
+
+def _name(name):
+    return ast.Name(_check_name(name), ast.Load())
+
+
+def _store(name):
+    return ast.Name(_check_name(name), ast.Store())
+
+
+def _call(func, *args, **keywords):
+    if isinstance(func, str):
+        func = _name(func)
+    return ast.Call(func, list(args), [ast.keyword(k, v) for k, v in keywords.items()])
+
+
+def _method(value, method, *args):
+    return _call(ast.Attribute(value, method, ast.Load()), *args)
+
+
+def _const(value):
+    """AST of a literal Python value (dicts and lists included)."""
+    if isinstance(value, dict):
+        return ast.Dict([_const(k) for k in value], [_const(v) for v in value.values()])
+    if isinstance(value, list):
+        return ast.List([_const(v) for v in value], ast.Load())
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and (value < 0 or str(value) == '-0.0'):
+        return ast.UnaryOp(ast.USub(), ast.Constant(-value))
+    return ast.Constant(value)
+
+
+def _to_store(node):
+    node.ctx = ast.Store()
+    return node
+
+
+def _locate(node, lineno):
+    """Give `node` and its descendants without a position the line `lineno`.
+
+    Statements are located as soon as they are built, so a subtree that
+    already has a position (a nested block) is skipped.
+    """
+    stack = [node]
+    while stack:
+        child = stack.pop()
+        if getattr(child, 'lineno', None) is not None:
+            continue
+        if 'lineno' in child._attributes:
+            child.lineno = child.end_lineno = lineno
+            child.col_offset = child.end_col_offset = 0
+        for name in child._fields:
+            value = getattr(child, name, None)
+            if isinstance(value, ast.AST):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, ast.AST))
+    return node
+
+
+def _namespace(local):
+    return _call('locals' if local else 'globals')
+
+
+def _stub(node, lineno):
+    """`def name(): pass` on `lineno`, for a subprogram whose compiled
+    function is put in its place once the module is compiled."""
+    # A `global` inside a function changes how the module itself loads
+    # that name, so the stub keeps it
+    body = [ast.Global(list(node.global_names))] if node.global_names else []
+    body.append(ast.Pass())
+    stub = ast.FunctionDef(_check_name(node.name), ast.arguments([], [], None, [], [], None, []),
+                           body, [], None, **_NO_TYPE_PARAMS)
+    return _locate(stub, lineno)
+
+
+def _shift(code, delta):
+    """`code` (and its nested code objects) moved down by `delta` lines."""
+    if delta == 0:
+        return code
+    consts = tuple(_shift(c, delta) if isinstance(c, type(code)) else c for c in code.co_consts)
+    return code.replace(co_firstlineno=code.co_firstlineno + delta, co_consts=consts)
+
+
+def _nul_string(size):
+    return _call('_algo_fixed_string', ast.Constant(size))
+
+
+def _flushed(body, lineno):
+    # try: body finally: _algo_flush() -- buffered Ecrire output is written
+    # out however the program ends. The flush is on `lineno`, the `try` on
+    # line 1 where no statement steps
+    flush = _locate(ast.Expr(_call('_algo_flush')), lineno)
+    return _locate(ast.Try(body, [], [], [flush]), 1)
+
+
+def _range_comp(elt, size):
+    # [elt for _ in range(size)]
+    return ast.ListComp(elt, [ast.comprehension(_store('_'), _call('range', ast.Constant(size)), [], 0)])
+
+
+class AstGenerator:
+    """Renders a nodes.Program as an ast.Module."""
+
+    # Variables held in a _algo_cell, as in CodeGenerator
+    global_cells = frozenset()
+    cells = frozenset()
+    pointer_params = frozenset()
+    scopes = {}
+
+    def __init__(self, main_function=None):
+        # Source text of expressions that codegen embeds in string literals
+        self._source = CodeGenerator()
+        self.source = self._source.expr
+        self.main_function = MAIN_FUNCTION if main_function is None else main_function
+
+    def _var(self, name):
+        """Load of variable `name` (`name.value` for a cell)."""
+        if name in self.cells:
+            return ast.Attribute(_name(name), 'value', ast.Load())
+        return _name(name)
+
+    def _var_store(self, name):
+        return _to_store(self._var(name))
+
+    # ── Program structure ────────────────────────────────────────────────
+
+    def program(self, node):
+        scopes = ProgramScopes(node)
+        body = [
+            ast.ImportFrom('compiler.runtime', [ast.alias('install', '_algo_install')], 0),
+            ast.Assign([_store('_algo_record_sizes')], _const(node.record_sizes)),
+            ast.Assign([_store('_algo_vars_info')], _const(node.vars_info)),
+            ast.Assign([_store('_algo_line_table')], _const(statement_lines(node, self.main_function, scopes))),
+            ast.Expr(_call('_algo_install', _call('globals'), _name('_algo_record_sizes'),
+                           _name('_algo_vars_info'))),
+        ]
+        for stmt in body:
+            _locate(stmt, 1)
+        # Library subprograms are stubs until link_libraries()
+        for use in node.uses or ():
+            body.extend(_stub(sub, use.lineno) for sub in use.library.subprograms)
+        self.global_cells = self.cells = global_cells(node, scopes)
+        self.scopes = {id(sub): scope for sub, scope in scopes.subprograms}
+        local_names = main_locals(node, scopes) if self.main_function else set()
+        main_definitions = []
+        for decl in node.declarations:
+            if isinstance(decl, nodes.Subprogram):
+                body.append(self.subprogram(decl))
+            elif isinstance(decl, nodes.VarBlock):
+                for definition in decl.definitions:
+                    module_part, main_part = split_definition(definition, local_names)
+                    if module_part is not None:
+                        body.extend(self.var_definition(module_part))
+                    if main_part is not None:
+                        main_definitions.append(main_part)
+            elif isinstance(decl, nodes.ConstBlock):
+                for const in decl.constants:
+                    body.append(_locate(ast.Assign([_store(const.name)], self.expr(const.value)), const.lineno))
+        body.extend(self.subprogram(sub) for sub in node.subprograms)
+        if self.main_function:
+            body.extend(self.main(node, main_definitions, main_globals(node, local_names)))
+        else:
+            body.append(_flushed(self._body(node.body), _last_line(node.body)))
+        return _locate(ast.Module(body, []), 1)
+
+    def main(self, node, definitions, global_names):
+        # def _algo_main(): ...; _algo_main() -- both on the line of the
+        # first statement, where the main body starts
+        lineno = next((stmt.lineno for stmt in node.body if stmt.lineno), 1)
+        body = [_locate(ast.Global(global_names), lineno)] if global_names else []
+        for definition in definitions:
+            body.extend(self.var_definition(definition))
+        body.extend(self._body(node.body))
+        function = ast.FunctionDef('_algo_main', ast.arguments([], [], None, [], [], None, []),
+                                   body, [], None, **_NO_TYPE_PARAMS)
+        return [_locate(function, lineno), _flushed([_locate(ast.Expr(_call('_algo_main')), lineno)], lineno)]
+
+    def var_definition(self, node):
+        out = []
+        for item in node.items:
+            init = self.expr(item.init)
+            if item.name in self.cells:
+                init = _call('_algo_cell', init)
+            out.append(_locate(ast.Assign([_store(item.name)], init), item.lineno))
+        return out
+
+    def subprogram(self, node):
+        outer = self.cells
+        self.cells = local_cells(node, self.scopes.get(id(node))) | (self.global_cells - subprogram_locals(node))
+        self.pointer_params = self._source.pointer_params = pointer_params(node)
+        try:
+            body = self._subprogram_body(node)
+        finally:
+            self.cells = outer
+            self.pointer_params = self._source.pointer_params = frozenset()
+        args = ast.arguments([], [ast.arg(_check_name(name)) for name, _ in node.params], None, [], [], None, [])
+        return _locate(ast.FunctionDef(_check_name(node.name), args, body, [], None, **_NO_TYPE_PARAMS), node.lineno)
+
+    def _subprogram_body(self, node):
+        body = []
+        if node.global_names:
+            body.append(ast.Global(list(node.global_names)))
+        for name in node.cloned_params:
+            # name = name._clone() if hasattr(name, '_clone') else name
+            body.append(ast.Assign([_store(name)], ast.IfExp(
+                _call('hasattr', _name(name), ast.Constant('_clone')),
+                _method(_name(name), '_clone'), _name(name))))
+        for name, _ in node.params:
+            if name in self.cells:
+                body.append(ast.Assign([_store(name)], _call('_algo_cell', _name(name))))
+        for stmt in body:
+            _locate(stmt, node.lineno)
+        if node.variables is not None:
+            for definition in node.variables:
+                body.extend(self.var_definition(definition))
+        body.extend(self._body(node.body))
+        return body
+
+    # ── Statements ───────────────────────────────────────────────────────
+
+    def block(self, stmts):
+        out = []
+        for stmt in stmts:
+            for py_stmt in getattr(self, 'stmt_' + type(stmt).__name__)(stmt):
+                out.append(_locate(py_stmt, stmt.lineno))
+        return out
+
+    def _body(self, stmts):
+        # Only the optimizer leaves a block empty
+        return self.block(stmts) or [ast.Pass()]
+
+    def stmt_EmptyStmt(self, node):
+        return []
+
+    def stmt_ExprStmt(self, node):
+        return [ast.Expr(self.expr(node.expr))]
+
+    def stmt_Return(self, node):
+        return [ast.Return(self.expr(node.value))]
+
+    def stmt_Assign(self, node):
+        name, value, var_type = node.name, node.value, node.var_type
+        if var_type == 'CHAINE':
+            # Fill the fixed string in place; a dereference is copied from the
+            # pointer itself so the whole terminated string is read
+            source = value.pointer if isinstance(value, nodes.Deref) else value
+            return [ast.Assign([self._var_store(name)],
+                               _call('_algo_assign_fixed_string', self._var(name), self.expr(source)))]
+        if 'POINTEUR' in var_type.upper() or var_type.startswith('^'):
+            ns = _namespace(node.local)
+            if value.type.startswith('TABLEAU_') or value.type == 'CHAINE':
+                # Array decay: assign array to pointer directly
+                pointer = _call('Pointer', ast.Constant(self.source(value)), ns,
+                                index=ast.Constant(0), base_var=self.expr(value))
+                return [ast.Expr(_method(self._var(name), '_assign', pointer))]
+            # Evaluate, then mutate the existing pointer object via _assign
+            tmp = f"_tmp_{name}"
+            wrap = ast.IfExp(
+                ast.BoolOp(ast.And(), [_call('isinstance', _name(tmp), _name('list')),
+                                       ast.UnaryOp(ast.Not(), _call('hasattr', _name(tmp),
+                                                                    ast.Constant('_get_target_container')))]),
+                _call('Pointer', ast.Constant(f"{name}_ptr_src"), ns, index=ast.Constant(0), base_var=_name(tmp)),
+                _name(tmp))
+            return [ast.Assign([_store(tmp)], self.expr(value)),
+                    ast.Expr(_method(self._var(name), '_assign', wrap))]
+        return [ast.Assign([self._var_store(name)], self.expr(value))]
+
+    def stmt_DerefAssign(self, node):
+        return [ast.Expr(_method(self._var(node.name), '_set', self.expr(node.value)))]
+
+    def _field_slot(self, node):
+        target = self._postfix_target(node.target)
+        if node.arrow:
+            target = _method(target, '_get')
+        return ast.Subscript(target, ast.Constant(node.field), ast.Load())
+
+    def stmt_FieldAssign(self, node):
+        field_type = node.field_type
+        if field_type == 'CHAINE' or field_type.startswith('TABLEAU_CHAINE_'):
+            fill = _call('_algo_assign_fixed_string', self._field_slot(node), self.expr(node.value))
+            return [ast.Assign([_to_store(self._field_slot(node))], fill)]
+        if _plain_store(field_type, node.value):
+            return [ast.Assign([_to_store(self._field_slot(node))], self.expr(node.value))]
+        return self._clone_assign(_to_store(self._field_slot(node)), self.expr(node.value))
+
+    def _clone_assign(self, slot, value):
+        # Pointers are copied so the slot does not alias the source variable
+        return [ast.Assign([_store('_tmp_val')], value),
+                ast.Assign([slot], ast.IfExp(_call('hasattr', _name('_tmp_val'), ast.Constant('_clone')),
+                                             _method(_name('_tmp_val'), '_clone'), _name('_tmp_val')))]
+
+    def _item(self, name, *indices, store=False):
+        target = self._var(name)
+        for index in indices:
+            target = ast.Subscript(target, self.expr(index), ast.Load())
+        return _to_store(target) if store else target
+
+    def stmt_IndexAssign(self, node):
+        name, var_type = node.name, node.var_type.upper()
+        if var_type in ('CHAINE', 'CHAINE_TYPE'):
+            return [ast.Assign([self._var_store(name)], _call('_algo_set_char', self._var(name),
+                                                              self.expr(node.index), self.expr(node.value)))]
+        if var_type.startswith('MATRICE_CHAINE') or (
+                'POINTEUR_POINTEUR_CARACTERE' in var_type and node.value.type in ('CHAINE', 'CHAINE_TYPE')):
+            # Fill a word-row / the already-allocated char-array with the string value
+            return [ast.Expr(_call('_algo_assign_fixed_string', self._item(name, node.index),
+                                   self.expr(node.value)))]
+        if 'POINTEUR_POINTEUR_CARACTERE' in var_type:
+            # allouer(...) or pointer: store as-is
+            value = ast.IfExp(_call('hasattr', self.expr(node.value), ast.Constant('_clone')),
+                              _method(self.expr(node.value), '_clone'), self.expr(node.value))
+            return [ast.Assign([self._item(name, node.index, store=True)], value)]
+        if _plain_store(_element_type(var_type), node.value):
+            if _is_pointer(var_type) and name not in self.pointer_params:
+                return [ast.Expr(_method(self._var(name), '_set_at', self.expr(node.index), self.expr(node.value)))]
+            return [ast.Assign([self._item(name, node.index, store=True)], self.expr(node.value))]
+        return self._clone_assign(self._item(name, node.index, store=True), self.expr(node.value))
+
+    def stmt_MatrixAssign(self, node):
+        if node.blocked:
+            return [ast.Pass()]
+        name, mat_type = node.name, node.mat_type.upper()
+        if mat_type.startswith('MATRICE_CHAINE') or 'POINTEUR_POINTEUR_CARACTERE' in mat_type:
+            # Set one character inside a word-row / allocated word
+            return [ast.Expr(_call('_algo_set_char', self._item(name, node.row), self.expr(node.col),
+                                   self.expr(node.value)))]
+        if _plain_store(_element_type(mat_type), node.value):
+            return [ast.Assign([self._item(name, node.row, node.col, store=True)], self.expr(node.value))]
+        return self._clone_assign(self._item(name, node.row, node.col, store=True), self.expr(node.value))
+
+    def stmt_Liberer(self, node):
+        return [ast.Expr(_call('_algo_liberer', self.expr(node.pointer)))]
+
+    def stmt_Ecrire(self, node):
+        return [ast.Expr(_call('_algo_ecrire', *(self.expr(a) for a in node.args)))]
+
+    def stmt_Lire(self, node):
+        out = []
+        for target in node.targets:
+            name, read_type = target.name, ast.Constant(target.read_type)
+            reader = _typed_reader(target.read_type)
+            if reader is not None:
+                read = _call(reader)
+            elif target.deref:
+                read = _call('_algo_read_typed', _method(self._var(name), '_get'), _call('_algo_read'), read_type)
+            else:
+                read = _call('_algo_read_typed', self._item(name, *target.indices), _call('_algo_read'), read_type)
+            if target.deref:
+                out.append(ast.Expr(_method(self._var(name), '_set', read)))
+            else:
+                out.append(ast.Assign([self._item(name, *target.indices, store=True)], read))
+        return out
+
+    def stmt_If(self, node):
+        orelse = self._body(node.orelse) if node.orelse is not None else []
+        return [ast.If(self.expr(node.condition), self._body(node.body), orelse)]
+
+    def stmt_While(self, node):
+        return [ast.While(self.expr(node.condition), self._body(node.body), [])]
+
+    def stmt_For(self, node):
+        end = self._combine(self.expr(node.end), '+', ast.Constant(1))
+        return [ast.For(self._var_store(node.var), _call('range', self.expr(node.start), end), self._body(node.body), [])]
+
+    def stmt_Repeat(self, node):
+        until = ast.If(self.expr(node.condition), [ast.Break()], [])
+        return [ast.While(ast.Constant(True), self._body(node.body) + [until], [])]
+
+    # ── Expressions ──────────────────────────────────────────────────────
+
+    def expr(self, node):
+        if node is None:
+            return ast.Constant(None)
+        return getattr(self, 'expr_' + type(node).__name__)(node)
+
+    def expr_Literal(self, node):
+        return _const(node.value)
+
+    def expr_Name(self, node):
+        if node.name.isidentifier():
+            return self._var(node.name)
+        # The lexer accepts '-' inside identifiers, so `n-1` reaches codegen
+        # as one name and Python reads it as a subtraction
+        result = ast.parse(node.name, mode='eval').body
+        if isinstance(result, ast.BinOp):
+            result._prec = _PRECEDENCE['-']
+        return result
+
+    def expr_Constant(self, node):
+        return _name(node.name)
+
+    def expr_Paren(self, node):
+        while isinstance(node, nodes.Paren):
+            node = node.expr
+        inner = self.expr(node)
+        inner.__dict__.pop('_prec', None)
+        return inner
+
+    def expr_BinOp(self, node):
+        # Iterative over the left spine, like CodeGenerator.expr_BinOp
+        spine = []
+        while isinstance(node, nodes.BinOp):
+            spine.append(node)
+            node = node.left
+        result = self.expr(node)
+        for binop in reversed(spine):
+            result = self._combine(result, binop.op, self.expr(binop.right))
+        return result
+
+    def _combine(self, left, op, right):
+        """`left op right` grouped the way Python parses codegen's `{left} {op} {right}`."""
+        prec = _PRECEDENCE[op]
+        left_prec = getattr(left, '_prec', None)
+        if left_prec is not None and left_prec < prec:
+            # The unparenthesised left side binds looser: `op` takes its last operand
+            if isinstance(left, ast.UnaryOp):
+                left.operand = self._combine(left.operand, op, right)
+            elif isinstance(left, ast.BoolOp):
+                left.values[-1] = self._combine(left.values[-1], op, right)
+            elif isinstance(left, ast.Compare):
+                left.comparators[-1] = self._combine(left.comparators[-1], op, right)
+            else:
+                left.right = self._combine(left.right, op, right)
+            return left
+        if op in _CMPOPS:
+            if isinstance(left, ast.Compare) and left_prec == prec:
+                # a < b < c is a chained comparison
+                left.ops.append(_CMPOPS[op]())
+                left.comparators.append(right)
+                return left
+            result = ast.Compare(left, [_CMPOPS[op]()], [right])
+        elif op in _BOOLOPS:
+            if isinstance(left, ast.BoolOp) and left_prec == prec:
+                left.values.append(right)
+                return left
+            result = ast.BoolOp(_BOOLOPS[op](), [left, right])
+        else:
+            result = ast.BinOp(left, _BINOPS[op](), right)
+        result._prec = prec
+        return result
+
+    def expr_ArrayDecay(self, node):
+        return _call('Pointer', ast.Constant(self.source(node.array)), _call('locals'),
+                     index=ast.Constant(0), base_var=self.expr(node.array))
+
+    def expr_Not(self, node):
+        result = ast.UnaryOp(ast.Not(), self.expr(node.operand))
+        result._prec = _PRECEDENCE['not']
+        return result
+
+    def expr_Neg(self, node):
+        return ast.UnaryOp(ast.USub(), self.expr(node.operand))
+
+    def expr_Call(self, node):
+        return _call(node.name, *(self.expr(a) for a in node.args))
+
+    def _postfix_target(self, node):
+        target = self.expr(node)
+        if hasattr(target, '_prec'):
+            # `n-1[i]` subscripts the 1, not n-1: leave it to the source path
+            raise SyntaxError("subscript of an unparenthesised expression")
+        return target
+
+    def expr_Index(self, node):
+        if _pointer_variable(node.target, self.pointer_params):
+            return _method(self._postfix_target(node.target), '_get_at', self.expr(node.index))
+        return ast.Subscript(self._postfix_target(node.target), self.expr(node.index), ast.Load())
+
+    def expr_GetChar(self, node):
+        return _call('_algo_get_char', self.expr(node.target), self.expr(node.index))
+
+    def expr_FieldAccess(self, node):
+        return self._field_slot(node)
+
+    def expr_Deref(self, node):
+        if node.as_string:
+            # A pointer to characters reads the string up to its terminator
+            code = self.expr(node.pointer)
+            return ast.IfExp(_call('hasattr', code, ast.Constant('_get_string')),
+                             _method(code, '_get_string'), _method(code, '_get'))
+        arithmetic = _pointer_offset(node.pointer, self.pointer_params)
+        if arithmetic:
+            pointer, terms = arithmetic
+            (op, term), rest = terms[0], terms[1:]
+            offset = self.expr(term) if op == '+' else ast.UnaryOp(ast.USub(), self.expr(term))
+            for op, term in rest:
+                offset = self._combine(offset, op, self.expr(term))
+            offset.__dict__.pop('_prec', None)
+            return _method(self.expr(pointer), '_get_at', offset)
+        return _method(self.expr(node.pointer), '_get')
+
+    def expr_AddressOf(self, node):
+        name, ns = node.name, _namespace(node.local)
+        alloc_name = ast.Constant(node.alloc_name)
+        if not node.indices:
+            if name in self.cells:
+                return _call('Pointer', ast.Constant(name), cell=_name(name), alloc_name=alloc_name)
+            return _call('Pointer', ast.Constant(name), ns, alloc_name=alloc_name)
+        if len(node.indices) == 1:
+            return _call('Pointer', ast.Constant(name), ns, index=self.expr(node.indices[0]),
+                         base_var=self._var(name), alloc_name=alloc_name)
+        # To point to mat[i][j], the base_var is the specific row, index is j
+        row, col = node.indices
+        label = ast.BinOp(ast.Constant(f"{name}_row_"), ast.Add(), _call('str', self.expr(row)))
+        return _call('Pointer', label, ns, index=self.expr(col), base_var=self._item(name, row),
+                     alloc_name=alloc_name)
+
+    def expr_Longueur(self, node):
+        return _call('_algo_longueur', self.expr(node.operand))
+
+    def expr_Concat(self, node):
+        return _call('_algo_concat', self.expr(node.left), self.expr(node.right))
+
+    def expr_Taille(self, node):
+        return _call('_algo_taille', ast.Constant(node.type_name))
+
+    def expr_Allouer(self, node):
+        if node.element_size is None:
+            return _call('_algo_allouer', self.expr(node.size))
+        return _call('_algo_allouer', self.expr(node.size), element_size=ast.Constant(node.element_size))
+
+    def expr_AllouerRecord(self, node):
+        return _call('_algo_allouer_record', self.expr(node.init))
+
+    def expr_DefaultValue(self, node):
+        t = node.type_name.lower()
+        if t == 'entier': return ast.Constant(0)
+        if t == 'reel': return ast.Constant(0.0)
+        if t in ('chaine', 'caractere'): return ast.Constant('')
+        if t == 'booleen': return ast.Constant(False)
+        if 'pointeur' in t or t.startswith('^'): return ast.Constant(None)  # NIL pointer
+        # Fixed-size string field: TABLEAU_CHAINE_N
+        if t.startswith('tableau_chaine_'):
+            try:
+                return _nul_string(int(t.split('_')[-1]))
+            except ValueError:
+                return _nul_string(1)
+        if node.fields is not None:
+            return ast.Dict([ast.Constant(name) for name, _ in node.fields],
+                            [self.expr(default) for _, default in node.fields])
+        return ast.Dict([], [])
+
+    def expr_NewPointer(self, node):
+        return _call('Pointer', ast.Constant(node.name), _namespace(node.local))
+
+    def expr_ArrayInit(self, node):
+        if node.size is None:
+            return ast.List([], ast.Load())
+        if node.nul:
+            return _nul_string(node.size)
+        if node.type == 'CHAINE':
+            return _call('_algo_fixed_string', ast.Constant(node.size), ast.Constant(None))
+        return ast.BinOp(ast.List([ast.Constant(None)], ast.Load()), ast.Mult(), ast.Constant(node.size))
+
+    def expr_MatrixInit(self, node):
+        row = ast.BinOp(ast.List([ast.Constant(None)], ast.Load()), ast.Mult(), ast.Constant(node.cols))
+        return _range_comp(row, node.rows)
+
+    def expr_RecordArrayInit(self, node):
+        return _range_comp(self.expr(node.record), node.size)
+
+
+def relocate(module, line_map):
+    """Move the nodes of a module parsed from generated source to the Algo
+    lines of CodeGenerator.line_map; lines outside statements go to line 1."""
+    for node in ast.walk(module):
+        if 'lineno' in node._attributes:
+            line = node.lineno
+            node.lineno = node.end_lineno = (line_map[line - 1] if line <= len(line_map) else 0) or 1
+            node.col_offset = node.end_col_offset = 0
+    return module
+
+
+def build_module(program):
+    """ast.Module for a nodes.Program; statements carry their Algo line numbers."""
+    return AstGenerator().program(program)
+
+
+def link_libraries(code, program):
+    """`code`, the compiled module of `program`, with the stubs of its
+    libraries' subprograms replaced by their compiled functions, moved to
+    the line of their `Utiliser` clause."""
+    functions = {(name, use.lineno): (use.lineno, function)
+                 for use in program.uses or () for name, function in use.library.functions.items()}
+    if not functions:
+        return code
+    consts = []
+    for const in code.co_consts:
+        if isinstance(const, type(code)) and (const.co_name, const.co_firstlineno) in functions:
+            lineno, function = functions[(const.co_name, const.co_firstlineno)]
+            const = _shift(function, lineno - function.co_firstlineno)
+        consts.append(const)
+    return code.replace(co_consts=tuple(consts))
+
+
+def compile_program(program, filename='<string>'):
+    """Code object for a nodes.Program, compiled without generating source."""
+    return link_libraries(compile(build_module(program), filename, 'exec'), program)
@@ -0,0 +1,124 @@
+"""Compile many Algo sources at once over a process pool.
+
+Used by the admin batch endpoint and from the command line to check the
+whole content library (examples, course chapters) after a compiler
+change:
+
+    PYTHONPATH=src python -m compiler.batch examples src/web/static/course-chapters
+
+Each source is compiled in a worker process with compile_algo_code();
+results come back in input order with their diagnostics and timings.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Same test as the course page applies before offering "Charger"
+_DEBUT = re.compile(r'\bDebut\b', re.IGNORECASE)
+_FIN = re.compile(r'\bFin\.\s*$', re.IGNORECASE)
+
+
+def is_complete_program(code):
+    """True for a snippet that is a whole program, not a fragment."""
+    code = (code or '').strip()
+    return bool(code) and bool(_DEBUT.search(code)) and bool(_FIN.search(code))
+
+
+def compile_source(item):
+    """Compile one (name, code) pair; returns its result dict."""
+    from compiler.parser import compile_algo_code
+    name, code = item
+    start = time.perf_counter()
+    python_code, code_object, errors = compile_algo_code(code)
+    return {
+        'name': name,
+        'ok': not errors and code_object is not None,
+        'errors': errors,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def compile_batch(sources, workers=None):
+    """Compile [(name, code), ...]; returns (results, summary).
+
+    `workers` defaults to the CPU count; with 1 worker, or a single
+    source, everything runs in the calling process.
+    """
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1 or len(sources) <= 1:
+        results = [compile_source(item) for item in sources]
+    else:
+        # spawn: forking a threaded web worker is not safe
+        context = multiprocessing.get_context('spawn')
+        chunksize = max(1, len(sources) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(sources)), mp_context=context) as pool:
+            results = list(pool.map(compile_source, sources, chunksize=chunksize))
+    failed = sum(1 for result in results if not result['ok'])
+    summary = {
+        'total': len(results),
+        'passed': len(results) - failed,
+        'failed': failed,
+        'workers': workers,
+        'seconds': time.perf_counter() - start,
+    }
+    return results, summary
+
+
+# ── Content library ──────────────────────────────────────────────────────────
+
+def chapter_sources(path, name=None):
+    """(name, code) of every complete program in a course chapter JSON."""
+    name = name or path
+    with open(path, encoding='utf-8') as f:
+        chapter = json.load(f)
+    for index, section in enumerate(chapter.get('sections', [])):
+        code = section.get('code')
+        if isinstance(code, str) and is_complete_program(code):
+            yield f"{name}#sections[{index}]", code
+
+
+def collect_sources(paths):
+    """(name, code) for .algo files and course chapter .json files under `paths`."""
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names)
+        else:
+            files = [path]
+        for file in files:
+            if file.endswith('.algo'):
+                with open(file, encoding='utf-8') as f:
+                    yield file, f.read()
+            elif file.endswith('.json'):
+                yield from chapter_sources(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m compiler.batch',
+                                     description="Compile .algo files and course chapters in parallel.")
+    parser.add_argument('paths', nargs='+', help=".algo / chapter .json files or directories")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPUs)")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results, summary = compile_batch(collect_sources(args.paths), workers=args.workers)
+    if args.json:
+        print(json.dumps({'results': results, 'summary': summary}, ensure_ascii=False, indent=1))
+    else:
+        for result in results:
+            print(f"{'OK  ' if result['ok'] else 'FAIL'} {result['seconds'] * 1000:7.1f} ms  {result['name']}")
+            for error in result['errors']:
+                print(f"        ligne {error.get('line', 0)}: {error.get('message', '')}")
+        print(f"{summary['passed']}/{summary['total']} OK, {summary['failed']} en echec, "
+              f"{summary['seconds']:.2f} s sur {summary['workers']} processus")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Compiler benchmark: compile time and peak memory against program size.
+
+Generated programs grow along one dimension at a time (statement count,
+block nesting, number of subprograms, number of record types, expression
+length). For each size the suite records the best compile time over a
+few runs and the peak memory of one traced run, then fits the growth
+exponent of time against size: about 1 for a linear compiler, 2 once
+something like quadratic string building creeps in.
+
+    PYTHONPATH=src python -m compiler.bench
+    PYTHONPATH=src python -m compiler.bench --save tests/fixtures/compile_bench.json
+    PYTHONPATH=src python -m compiler.bench --check tests/fixtures/compile_bench.json
+
+--check exits with status 1 when a dimension regressed against the
+baseline: throughput (units per second, scaled by a calibration loop so
+baselines move between machines) or peak memory beyond the threshold,
+or a growth exponent noticeably steeper than before.
+"""
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+
+# ── Program generators ───────────────────────────────────────────────────────
+
+def statements_program(n):
+    body = "".join(f"    x <- x + {i % 7} * y;\n    Si x > {i} Alors\n        y <- y - 1;\n    FinSi\n"
+                   for i in range(n // 2))
+    return f"Algorithme Instructions;\nVar x, y : Entier;\nDebut\n    x <- 0;\n    y <- 1;\n{body}    Ecrire(x);\nFin.\n"
+
+
+def nesting_program(n):
+    opening = "".join(f"{'    ' * (d + 1)}Si x > {d} Alors\n" for d in range(n))
+    closing = "".join(f"{'    ' * (d + 1)}FinSi\n" for d in reversed(range(n)))
+    return (f"Algorithme Imbrication;\nVar x : Entier;\nDebut\n    x <- {n};\n"
+            f"{opening}{'    ' * (n + 1)}Ecrire(x);\n{closing}Fin.\n")
+
+
+def subprograms_program(n):
+    functions = "".join(f"Fonction f{i}(a : Entier) : Entier;\nVar t : Entier;\nDebut\n"
+                        f"    t <- a * {i + 1};\n    Retourner t + 1;\nFin;\n\n" for i in range(n))
+    calls = "".join(f"    s <- s + f{i}(s);\n" for i in range(n))
+    return f"{functions}Algorithme SousProgrammes;\nVar s : Entier;\nDebut\n    s <- 0;\n{calls}    Ecrire(s);\nFin.\n"
+
+
+def records_program(n):
+    types = "".join(f"Type R{i} = Enregistrement\nDebut\n    a : Entier;\n    b : Reel;\n    nom[10] : Chaine;\nFin;\n\n"
+                    for i in range(n))
+    variables = "".join(f"    v{i} : R{i};\n" for i in range(n))
+    uses = "".join(f"    v{i}.a <- {i};\n    v{i}.b <- v{i}.a * 2;\n" for i in range(n))
+    return f"{types}Algorithme Enregistrements;\nVar\n{variables}Debut\n{uses}Fin.\n"
+
+
+def expression_program(n):
+    terms = " + ".join(f"x * {i % 9 + 1}" if i % 2 else f"(y - {i})" for i in range(n))
+    return f"Algorithme Expression;\nVar x, y, r : Entier;\nDebut\n    x <- 1;\n    y <- 2;\n    r <- {terms};\n    Ecrire(r);\nFin.\n"
+
+
+# dimension -> (generator, sizes); the nesting sizes stay under the E6.3 limit
+DIMENSIONS = {
+    'statements': (statements_program, (250, 500, 1000, 2000)),
+    'nesting': (nesting_program, (10, 20, 40, 80)),
+    'subprograms': (subprograms_program, (25, 50, 100, 200)),
+    'records': (records_program, (25, 50, 100, 200)),
+    'expression': (expression_program, (100, 200, 400, 800)),
+}
+
+
+# ── Measurement ──────────────────────────────────────────────────────────────
+
+def _compile(code):
+    from compiler.parser import compile_algo_code
+    python_code, code_object, errors = compile_algo_code(code)
+    if errors or code_object is None:
+        raise RuntimeError(f"benchmark program does not compile: {errors[:3]}")
+
+
+def calibrate():
+    """Seconds taken by a fixed pure-Python workload on this machine."""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        table = {}
+        for i in range(200000):
+            table[i % 1000] = str(i) + 'x'
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(code, repeat=3):
+    """(best seconds, peak bytes) for compiling `code`."""
+    _compile(code)   # warm-up: parser tables, imports
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _compile(code)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        _compile(code)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def growth_exponent(points):
+    """Least-squares slope of log(seconds) against log(size)."""
+    xs = [math.log(p['size']) for p in points]
+    ys = [math.log(p['seconds']) for p in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def run_dimension(name, sizes=None, repeat=3):
+    generator, default_sizes = DIMENSIONS[name]
+    points = []
+    for size in sizes or default_sizes:
+        seconds, peak = measure(generator(size), repeat)
+        points.append({'size': size, 'seconds': seconds, 'peak_kib': peak / 1024,
+                       'per_second': size / seconds})
+    return {'points': points, 'exponent': growth_exponent(points)}
+
+
+def run_suite(dimensions=None, repeat=3, sizes=None):
+    """Results of every dimension; `sizes` overrides the sizes of all of them."""
+    return {
+        'python': platform.python_version(),
+        'calibration': calibrate(),
+        'dimensions': {name: run_dimension(name, sizes, repeat) for name in dimensions or DIMENSIONS},
+    }
+
+
+# ── Regression gate ──────────────────────────────────────────────────────────
+
+def compare(baseline, current, threshold=0.25, exponent_slack=0.3):
+    """Regressions of `current` against `baseline`, as messages (empty: OK).
+
+    Throughput and memory are compared at the largest size both runs
+    measured; throughput is scaled by the ratio of the calibration times.
+    """
+    problems = []
+    speed = baseline['calibration'] / current['calibration']
+    for name, base in baseline['dimensions'].items():
+        result = current['dimensions'].get(name)
+        if result is None:
+            continue
+        sizes = {p['size'] for p in base['points']} & {p['size'] for p in result['points']}
+        if sizes:
+            size = max(sizes)
+            old = next(p for p in base['points'] if p['size'] == size)
+            new = next(p for p in result['points'] if p['size'] == size)
+            expected = old['per_second'] * speed
+            if new['per_second'] < expected * (1 - threshold):
+                problems.append(f"{name}: {new['per_second']:,.0f}/s at size {size}, "
+                                f"baseline {expected:,.0f}/s (-{1 - new['per_second'] / expected:.0%})")
+            if new['peak_kib'] > old['peak_kib'] * (1 + threshold):
+                problems.append(f"{name}: peak {new['peak_kib']:,.0f} KiB at size {size}, "
+                                f"baseline {old['peak_kib']:,.0f} KiB")
+        if result['exponent'] > base['exponent'] + exponent_slack:
+            problems.append(f"{name}: compile time grows as size^{result['exponent']:.2f}, "
+                            f"baseline size^{base['exponent']:.2f}")
+    return problems
+
+
+def format_results(results):
+    lines = [f"Python {results['python']}, calibration {results['calibration'] * 1000:.1f} ms"]
+    for name, result in results['dimensions'].items():
+        lines.append(f"{name}  (time ~ size^{result['exponent']:.2f})")
+        for p in result['points']:
+            lines.append(f"  {p['size']:>6}  {p['seconds'] * 1000:8.1f} ms  {p['per_second']:>10,.0f}/s"
+                         f"  peak {p['peak_kib']:>9,.0f} KiB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m compiler.bench',
+                                     description="Measure compile time and memory on generated programs.")
+    parser.add_argument('dimensions', nargs='*',
+                        help=f"dimensions to run: {', '.join(DIMENSIONS)} (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per size (best is kept)")
+    parser.add_argument('--save', metavar='FILE', help="write the results as the new baseline")
+    parser.add_argument('--check', metavar='FILE', help="compare against a baseline, exit 1 on regression")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed throughput / memory regression (default 0.25)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.dimensions) - set(DIMENSIONS))
+    if unknown:
+        parser.error(f"unknown dimensions: {', '.join(unknown)}")
+
+    results = run_suite(args.dimensions or None, repeat=args.repeat)
+    print(format_results(results))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+            f.write('\n')
+    if args.check:
+        with open(args.check, encoding='utf-8') as f:
+            baseline = json.load(f)
+        problems = compare(baseline, results, args.threshold)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            return 1
+        print("Pas de régression par rapport à", args.check)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
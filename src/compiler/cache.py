@@ -0,0 +1,195 @@
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from compiler import library
+from compiler.stats import CompileStats
+
+_COMPILER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _compute_compiler_version():
+    """Hash the compiler sources so any change to them invalidates old entries."""
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(_COMPILER_DIR)):
+        if name.endswith('.py') and not name.startswith(('parsetab', 'lextab')):
+            with open(os.path.join(_COMPILER_DIR, name), 'rb') as f:
+                h.update(name.encode('utf-8'))
+                h.update(f.read())
+    # Marshalled code objects are only valid for the interpreter that wrote them
+    h.update(sys.implementation.cache_tag.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+COMPILER_VERSION = _compute_compiler_version()
+
+
+class CompiledProgram:
+    """Result of compiling one Algo source: generated Python, errors and code object.
+
+    `stats` is CompileStats.as_dict() of the compilation that built the
+    entry (a cache hit returns the stats of the original miss).
+    """
+
+    __slots__ = ('python_code', 'errors', 'code_object', 'stats')
+
+    def __init__(self, python_code, errors, code_object=None, stats=None):
+        self.python_code = python_code
+        self.errors = errors
+        self.code_object = code_object
+        self.stats = stats
+
+    def as_tuple(self):
+        """Same shape as compile_algo(): (python_code, errors)."""
+        return self.python_code, list(self.errors)
+
+
+# Misses reuse the unchanged subprograms of earlier compiles (incremental.py);
+# ALGO_INCREMENTAL_COMPILE=0 compiles every miss from scratch
+INCREMENTAL = os.environ.get('ALGO_INCREMENTAL_COMPILE', '1') != '0'
+
+
+def _build(code, optimize=True):
+    # Imported on first use so that importing the web app does not pay for
+    # building the parser before a worker can answer requests
+    # The code object's filename is '<string>', which TraceRunner filters on
+    stats = CompileStats()
+    if INCREMENTAL and isinstance(code, str):
+        from compiler.incremental import incremental_compiler
+        python_code, code_object, errors = incremental_compiler.compile(code, optimize=optimize, stats=stats)
+    else:
+        from compiler.parser import compile_algo_code
+        python_code, code_object, errors = compile_algo_code(code, optimize=optimize, stats=stats)
+    return CompiledProgram(python_code, errors, code_object, stats.as_dict())
+
+
+class CompilationCache:
+    """Content-addressed cache for compile_algo().
+
+    Entries are keyed by sha256(compiler version + options + source +
+    hashes of the libraries it uses). The first tier is a bounded
+    in-memory LRU; an optional directory holds marshalled entries so they
+    survive worker restarts and are shared between processes.
+    """
+
+    def __init__(self, maxsize=256, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        maxsize = int(os.environ.get('ALGO_COMPILE_CACHE_SIZE', 256))
+        disk_dir = os.environ.get('ALGO_COMPILE_CACHE_DIR') or None
+        return cls(maxsize=maxsize, disk_dir=disk_dir)
+
+    @staticmethod
+    def key_for(code, optimize=True):
+        h = hashlib.sha256()
+        h.update(COMPILER_VERSION.encode('utf-8'))
+        h.update(b'\0O' if optimize else b'\0-')
+        h.update(code.encode('utf-8'))
+        h.update(library.libraries.key(code).encode('utf-8'))
+        return h.hexdigest()
+
+    def get(self, code, optimize=True):
+        """Return the cached CompiledProgram for `code`, compiling it on a miss."""
+        if not isinstance(code, str):
+            # Let compile_algo report the bad payload; nothing to key on
+            return _build(code, optimize)
+        key = self.key_for(code, optimize)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._store(key, entry)
+            return entry
+
+        # Compile outside the lock; two threads racing on the same new
+        # source both compile it, which is harmless.
+        entry = _build(code, optimize)
+        with self._lock:
+            self.misses += 1
+            self._store(key, entry)
+        self._save(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.marshal')
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                python_code, errors, code_object, stats = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return CompiledProgram(python_code, errors, code_object, stats)
+
+    def _save(self, key, entry):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((entry.python_code, entry.errors, entry.code_object, entry.stats), f)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            # A read-only or full disk only costs us the second tier
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'compiler_version': COMPILER_VERSION,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+compilation_cache = CompilationCache.from_env()
+
+
+def compile_cached(code, optimize=True):
+    """Cached equivalent of compile_algo() returning a CompiledProgram."""
+    return compilation_cache.get(code, optimize)
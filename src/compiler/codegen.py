@@ -0,0 +1,693 @@
+"""Python code generation from the typed AST (see nodes.py).
+
+The generator is a visitor: one method per node class, named after it.
+Statements are emitted as lines into a list that is joined once, so the
+cost is linear in the size of the generated program.
+"""
+import json
+import os
+
+from compiler import nodes
+
+
+# Types whose values are never Pointers, so a store needs no _clone()
+_SCALAR_TYPES = frozenset(('ENTIER', 'REEL', 'BOOLEEN', 'CARACTERE'))
+
+# Lire into a variable of these types parses the token directly
+_TYPED_READERS = {'ENTIER': '_algo_read_entier', 'REEL': '_algo_read_reel', 'BOOLEEN': '_algo_read_booleen'}
+
+
+# The main body runs inside _algo_main(), so its variables are fast
+# locals; ALGO_MAIN_FUNCTION=0 emits it at module level instead
+MAIN_FUNCTION = os.environ.get('ALGO_MAIN_FUNCTION', '1') != '0'
+
+
+def _namespace(local):
+    return "locals()" if local else "globals()"
+
+
+def _element_type(type_name):
+    """Type of the items of a container: TABLEAU_Entier_10, MATRICE_Entier,
+    POINTEUR_Entier -> ENTIER."""
+    t = type_name.upper()
+    for prefix in ('TABLEAU_', 'MATRICE_', 'POINTEUR_'):
+        if t.startswith(prefix):
+            t = t[len(prefix):]
+            head, _, size = t.rpartition('_')
+            if head and size.isdigit():
+                t = head
+            break
+    return t
+
+
+def _plain_store(slot_type, value):
+    """True if `value` can be stored into a slot of `slot_type` as is.
+
+    Only slots of a scalar type holding a non-pointer value qualify; every
+    other store copies Pointers with _clone() so the slot does not alias.
+    """
+    if slot_type.upper() not in _SCALAR_TYPES:
+        return False
+    value_type = value.type.upper()
+    return not (value_type.startswith('POINTEUR') or value_type.startswith('^'))
+
+
+def _is_pointer(type_name):
+    return (type_name or '').upper().startswith('POINTEUR')
+
+
+def pointer_params(sub):
+    """Pointer parameters of a subprogram: a caller may pass an array there."""
+    return frozenset(name for name, type_name in sub.params if _is_pointer(type_name))
+
+
+def _pointer_variable(node, params):
+    """True when `node` names a pointer variable, which always holds a
+    Pointer. A pointer parameter (in `params`) may hold a plain list, so
+    it keeps the `[]` subscripts that lists and Pointers both accept."""
+    return isinstance(node, nodes.Name) and _is_pointer(node.type) and node.name not in params
+
+
+def _pointer_offset(node, params):
+    """(pointer, [(op, term), ...]) of a dereferenced `(p + i - j)`, or None.
+
+    Such a dereference compiles to p._get_at(i - j), which does not
+    build the intermediate Pointers of `p + i` and `(p + i) - j`.
+    """
+    if isinstance(node, nodes.Paren):
+        node = node.expr
+    terms = []
+    while isinstance(node, nodes.BinOp) and node.op in ('+', '-') and _is_pointer(node.type):
+        terms.append((node.op, node.right))
+        node = node.left
+    if not terms or not _pointer_variable(node, params):
+        return None
+    return node, terms[::-1]
+
+
+def _last_line(stmts):
+    return next((stmt.lineno for stmt in reversed(stmts) if stmt.lineno), 1)
+
+
+def _typed_reader(read_type):
+    """Name of the runtime reader for `read_type`, or None for _algo_read_typed."""
+    return _TYPED_READERS.get(read_type.upper())
+
+
+def _subprograms(program):
+    return list(program.subprograms) + [d for d in program.declarations if isinstance(d, nodes.Subprogram)]
+
+
+class Scope:
+    """What the generators need from one walk of a subprogram or of the
+    main program: the names it mentions, the names whose address it takes
+    as a whole (&x, not &t[i]), its pointer variables and statement lines."""
+
+    __slots__ = ('names', 'addressed', 'pointers', 'lines')
+
+    def __init__(self, roots):
+        names, addressed, pointers, lines = set(), set(), set(), set()
+        for root in roots:
+            for n in root.walk():
+                cls = type(n)
+                fields = _NAME_FIELDS.get(cls)
+                if fields is None:
+                    fields = _NAME_FIELDS[cls] = tuple(f for f in ('name', 'var', 'alloc_name') if f in cls._fields)
+                for field in fields:
+                    value = getattr(n, field)
+                    if isinstance(value, str):
+                        names.add(value)
+                if cls is nodes.AddressOf:
+                    if not n.indices:
+                        addressed.add(n.name)
+                elif cls is nodes.NewPointer:
+                    pointers.add(n.name)
+                elif n.lineno and isinstance(n, nodes.Stmt) and cls is not nodes.EmptyStmt:
+                    lines.add(n.lineno)
+        self.names, self.addressed, self.pointers, self.lines = names, addressed, pointers, lines
+
+
+# Node class -> which of its fields name a variable (for Scope.names)
+_NAME_FIELDS = {}
+
+
+class ProgramScopes:
+    """Scope of the main program (body and declarations) and of each subprogram."""
+
+    def __init__(self, program):
+        self.main = Scope(program.body + [d for d in program.declarations if not isinstance(d, nodes.Subprogram)])
+        self.subprograms = [(sub, Scope([sub])) for sub in _subprograms(program)]
+
+
+def main_locals(program, scopes=None):
+    """Main-program variables that can be locals of _algo_main().
+
+    A variable stays a module global when a subprogram names it or when it
+    is a pointer variable (initialised with a Pointer to its own name).
+    """
+    scopes = scopes or ProgramScopes(program)
+    shared = set(scopes.main.pointers)
+    for sub, scope in scopes.subprograms:
+        shared |= scope.names
+    return {item.name for item in _main_variables(program) if item.name not in shared}
+
+
+def statement_lines(program, main_function=True, scopes=None):
+    """Algo lines holding a statement, by name of the Python function that
+    runs them ('_algo_main', or '<module>' for a main body at module level).
+
+    The debugger stops only there: prelude, declarations and temporaries
+    of the generated program are not steps.
+    """
+    scopes = scopes or ProgramScopes(program)
+    table = {sub.name: sorted(scope.lines) for sub, scope in scopes.subprograms}
+    table['_algo_main' if main_function else '<module>'] = sorted(scopes.main.lines)
+    return table
+
+
+def subprogram_locals(sub):
+    """Parameters and local variables of a subprogram."""
+    names = {name for name, _ in sub.params}
+    for definition in sub.variables or ():
+        names.update(item.name for item in definition.items)
+    return names
+
+
+def global_cells(program, scopes=None):
+    """Main-program variables held in a _algo_cell: those whose address is
+    taken anywhere, so a Pointer to them keeps the cell, not the name."""
+    scopes = scopes or ProgramScopes(program)
+    names = set(scopes.main.addressed)
+    for sub, scope in scopes.subprograms:
+        names |= scope.addressed - subprogram_locals(sub)
+    return frozenset(names & {item.name for item in _main_variables(program)})
+
+
+def local_cells(sub, scope=None):
+    """Parameters and local variables of `sub` held in a _algo_cell."""
+    scope = scope or Scope([sub])
+    return frozenset(scope.addressed & subprogram_locals(sub))
+
+
+def _main_variables(program):
+    for decl in program.declarations:
+        if isinstance(decl, nodes.VarBlock):
+            for definition in decl.definitions:
+                yield from definition.items
+
+
+def main_globals(program, local_names):
+    """Module-level names _algo_main() declares `global`: the other
+    variables and the constants, which the main body may assign."""
+    names = [item.name for item in _main_variables(program) if item.name not in local_names]
+    for decl in program.declarations:
+        if isinstance(decl, nodes.ConstBlock):
+            names += [const.name for const in decl.constants]
+    return list(dict.fromkeys(names))
+
+
+def split_definition(definition, local_names):
+    """(module-level, _algo_main) parts of a VarDefinition."""
+    parts = ([], [])
+    for item in definition.items:
+        parts[item.name in local_names].append(item)
+    return [nodes.VarDefinition(items, lineno=definition.lineno) if items else None for items in parts]
+
+
+class CodeGenerator:
+    """Renders a nodes.Program as Python source."""
+
+    main_function = MAIN_FUNCTION
+    # Variables held in a _algo_cell: all of the program / in the current scope
+    global_cells = frozenset()
+    cells = frozenset()
+    pointer_params = frozenset()
+    scopes = {}     # id(subprogram) -> its Scope, once program() walked them
+
+    def __init__(self, main_function=None):
+        if main_function is not None:
+            self.main_function = main_function
+        # After program(): the Algo line of each generated line, 0 for the
+        # lines that are not part of a statement (prelude, declarations)
+        self.line_map = []
+        self._origins = []
+        self._line = 0
+        self._placements = []
+
+    def var(self, name):
+        """Python expression reading or assigning variable `name`."""
+        return f"{name}.value" if name in self.cells else name
+
+    def source(self, node):
+        """`node` as written in the program, for the names of Pointers."""
+        cells, self.cells = self.cells, frozenset()
+        try:
+            return self.expr(node)
+        finally:
+            self.cells = cells
+
+    # ── Program structure ────────────────────────────────────────────────
+
+    def program(self, node):
+        # The helpers live in compiler.runtime; install() binds them, with
+        # this program's heap and Pointer class, into its globals
+        scopes = ProgramScopes(node)
+        parts = [f"# Algo: {node.name}\n",
+                 "from compiler.runtime import install as _algo_install\n",
+                 f"_algo_record_sizes = {node.record_sizes!r}\n",
+                 f"_algo_vars_info = {json.dumps(node.vars_info)}\n",
+                 f"_algo_line_table = {json.dumps(statement_lines(node, self.main_function, scopes))}\n",
+                 "_algo_install(globals(), _algo_record_sizes, _algo_vars_info)\n"]
+        self.global_cells = self.cells = global_cells(node, scopes)
+        self.scopes = {id(sub): scope for sub, scope in scopes.subprograms}
+        self._placements = []
+        local_names = main_locals(node, scopes) if self.main_function else set()
+        main_definitions = []
+        # Library subprograms were generated once, with the library; their
+        # lines stay out of line_map
+        for use in node.uses or ():
+            parts.append("\n")
+            parts.append(use.library.python_code)
+        for decl in node.declarations:
+            parts.append("\n")
+            if isinstance(decl, nodes.Subprogram):
+                self._place(parts, self.subprogram(decl))
+            elif isinstance(decl, nodes.VarBlock) and local_names:
+                for definition in decl.definitions:
+                    module_part, main_part = split_definition(definition, local_names)
+                    if module_part is not None:
+                        parts.append(self.var_definition(module_part, 0))
+                    if main_part is not None:
+                        main_definitions.append(main_part)
+            else:
+                self._declaration(decl, 0, parts)
+        parts.append("\n\n")
+        for i, sub in enumerate(node.subprograms):
+            if i:
+                parts.append("\n")
+            self._place(parts, self.subprogram(sub))
+        parts.append("\n\n")
+        if self.main_function:
+            self._place(parts, self.main(node, main_definitions, main_globals(node, local_names)))
+        else:
+            # Ecrire output still buffered is written out however the body
+            # ends; the module returns from the line of the last statement
+            body = self.block(node.body, 1)
+            last = _last_line(node.body)
+            self._placement = (1, self._origins + [last, last])
+            self._place(parts, f"try:\n{body}\nfinally:\n    _algo_flush()")
+        parts.append("\n")
+        python_code = "".join(parts)
+        self._build_line_map(parts, python_code.count("\n") + 1)
+        return python_code
+
+    def _place(self, parts, text):
+        # The statement lines of the block just generated sit at
+        # self._placement's offset inside `text`
+        offset, origins = self._placement
+        self._placements.append((len(parts), offset, origins))
+        parts.append(text)
+
+    def _build_line_map(self, parts, count):
+        line_map = [0] * count
+        starts, line = [], 0
+        for part in parts:
+            starts.append(line)
+            line += part.count("\n")
+        for index, offset, origins in self._placements:
+            start = starts[index] + offset
+            line_map[start:start + len(origins)] = origins
+        self.line_map = line_map
+
+    def main(self, node, definitions, global_names):
+        header = "def _algo_main():\n"
+        if global_names:
+            header += f"    global {', '.join(global_names)}\n"
+        variables = "".join(self.var_definition(d, 1) for d in definitions)
+        body = self.block(node.body, 1)
+        self._placement = (header.count("\n") + variables.count("\n"), self._origins)
+        return f"{header}{variables}{body}\ntry:\n    _algo_main()\nfinally:\n    _algo_flush()"
+
+    def _declaration(self, node, level, out):
+        if isinstance(node, nodes.VarBlock):
+            for definition in node.definitions:
+                out.append(self.var_definition(definition, level))
+        elif isinstance(node, nodes.ConstBlock):
+            for const in node.constants:
+                out.append(f"{const.name} = {self.expr(const.value)}\n")
+
+    def var_definition(self, node, level):
+        indent = "    " * level
+        lines = []
+        for item in node.items:
+            init = self.expr(item.init)
+            if item.name in self.cells:
+                init = f"_algo_cell({init})"
+            line = f"{indent}{item.name} = {init}"
+            if item.comment is not None:
+                line += f" # {item.comment}"
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    def subprogram(self, node):
+        outer = self.cells
+        self.cells = local_cells(node, self.scopes.get(id(node))) | (self.global_cells - subprogram_locals(node))
+        self.pointer_params = pointer_params(node)
+        try:
+            header = f"def {node.name}({', '.join(name for name, _ in node.params)}):\n"
+            if node.global_names:
+                header += f"    global {', '.join(node.global_names)}\n"
+            for name in node.cloned_params:
+                header += f"    {name} = {name}._clone() if hasattr({name}, '_clone') else {name}\n"
+            for name, _ in node.params:
+                if name in self.cells:
+                    header += f"    {name} = _algo_cell({name})\n"
+            body = self.block(node.body, 1)
+            offset = header.count("\n")
+            if node.variables is not None:
+                variables = "".join(self.var_definition(d, 1) for d in node.variables)
+                body = f"{variables}\n{body}"
+                offset += variables.count("\n") + 1
+            self._placement = (offset, self._origins)
+            return f"{header}{body}\n"
+        finally:
+            self.cells = outer
+            self.pointer_params = frozenset()
+
+    # ── Statements ───────────────────────────────────────────────────────
+
+    def block(self, stmts, level):
+        # self._origins gets the Algo line of each line of the block
+        out = []
+        self._origins, self._line = [], 0
+        self._block(stmts, level, out)
+        return "\n".join(out)
+
+    def _block(self, stmts, level, out):
+        outer = self._line
+        if not stmts:
+            # Only the optimizer leaves a block empty
+            out.append(f"{'    ' * level}pass")
+        for stmt in stmts:
+            self._mark(out)
+            self._line = stmt.lineno
+            getattr(self, 'stmt_' + type(stmt).__name__)(stmt, level, out)
+        self._mark(out)
+        self._line = outer
+
+    def _mark(self, out):
+        # Lines emitted since the last mark belong to the current statement
+        self._origins.extend([self._line] * (len(out) - len(self._origins)))
+
+    def stmt_EmptyStmt(self, node, level, out):
+        out.append("")
+
+    def stmt_ExprStmt(self, node, level, out):
+        out.append(f"{'    ' * level}{self.expr(node.expr)}")
+
+    def stmt_Return(self, node, level, out):
+        out.append(f"{'    ' * level}return {self.expr(node.value)}")
+
+    def stmt_Assign(self, node, level, out):
+        indent = "    " * level
+        name, value, var_type = self.var(node.name), node.value, node.var_type
+        code = self.expr(value)
+        if var_type == 'CHAINE':
+            # Fill the fixed string in place; a dereference is copied from the
+            # pointer itself so the whole terminated string is read
+            if isinstance(value, nodes.Deref):
+                code = self.expr(value.pointer)
+            out.append(f"{indent}{name} = _algo_assign_fixed_string({name}, {code})")
+        elif 'POINTEUR' in var_type.upper() or var_type.startswith('^'):
+            ns = _namespace(node.local)
+            if value.type.startswith('TABLEAU_') or value.type == 'CHAINE':
+                # Array decay: assign array to pointer directly
+                out.append(f"{indent}{name}._assign(Pointer(\"{self.source(value)}\", {ns}, index=0, base_var={code}))")
+            else:
+                # Evaluate, then mutate the existing pointer object via _assign
+                tmp = f"_tmp_{node.name}"
+                out.append(f"{indent}{tmp} = {code}")
+                out.append(f"{indent}{name}._assign(Pointer(\"{node.name}_ptr_src\", {ns}, index=0, base_var={tmp}) "
+                           f"if isinstance({tmp}, list) and not hasattr({tmp}, '_get_target_container') else {tmp})")
+        else:
+            out.append(f"{indent}{name} = {code}")
+
+    def stmt_DerefAssign(self, node, level, out):
+        out.append(f"{'    ' * level}{self.var(node.name)}._set({self.expr(node.value)})")
+
+    def stmt_FieldAssign(self, node, level, out):
+        indent = "    " * level
+        target = self.expr(node.target)
+        if node.arrow:
+            target = f"({target})._get()"
+        slot = f"{target}['{node.field}']"
+        value = self.expr(node.value)
+        field_type = node.field_type
+        if field_type == 'CHAINE' or field_type.startswith('TABLEAU_CHAINE_'):
+            out.append(f"{indent}{slot} = _algo_assign_fixed_string({slot}, {value})")
+        elif _plain_store(field_type, node.value):
+            out.append(f"{indent}{slot} = {value}")
+        else:
+            self._clone_assign(slot, value, indent, out)
+
+    def _clone_assign(self, slot, value, indent, out):
+        # Pointers are copied so the slot does not alias the source variable
+        out.append(f"{indent}_tmp_val = {value}")
+        out.append(f"{indent}{slot} = _tmp_val._clone() if hasattr(_tmp_val, '_clone') else _tmp_val")
+
+    def stmt_IndexAssign(self, node, level, out):
+        indent = "    " * level
+        name, var_type = self.var(node.name), node.var_type.upper()
+        index, value = self.expr(node.index), self.expr(node.value)
+        if var_type in ('CHAINE', 'CHAINE_TYPE'):
+            out.append(f"{indent}{name} = _algo_set_char({name}, {index}, {value})")
+        elif var_type.startswith('MATRICE_CHAINE'):
+            # mots[i] <- "word": assign a whole row of the word-matrix
+            out.append(f"{indent}_algo_assign_fixed_string({name}[{index}], {value})")
+        elif 'POINTEUR_POINTEUR_CARACTERE' in var_type:
+            if node.value.type in ('CHAINE', 'CHAINE_TYPE'):
+                # Fill the already-allocated char-array with the string value
+                out.append(f"{indent}_algo_assign_fixed_string({name}[{index}], {value})")
+            else:
+                # allouer(...) or pointer: store as-is
+                out.append(f"{indent}{name}[{index}] = ({value})._clone() if hasattr({value}, '_clone') else {value}")
+        elif _plain_store(_element_type(var_type), node.value):
+            if _is_pointer(var_type) and node.name not in self.pointer_params:
+                out.append(f"{indent}{name}._set_at({index}, {value})")
+            else:
+                out.append(f"{indent}{name}[{index}] = {value}")
+        else:
+            self._clone_assign(f"{name}[{index}]", value, indent, out)
+
+    def stmt_MatrixAssign(self, node, level, out):
+        indent = "    " * level
+        if node.blocked:
+            out.append(f"{indent}pass  # blocked: string assigned to char slot")
+            return
+        name, mat_type = self.var(node.name), node.mat_type.upper()
+        row, col, value = self.expr(node.row), self.expr(node.col), self.expr(node.value)
+        if mat_type.startswith('MATRICE_CHAINE') or 'POINTEUR_POINTEUR_CARACTERE' in mat_type:
+            # Set one character inside a word-row / allocated word
+            out.append(f"{indent}_algo_set_char({name}[{row}], {col}, {value})")
+        elif _plain_store(_element_type(mat_type), node.value):
+            out.append(f"{indent}{name}[{row}][{col}] = {value}")
+        else:
+            self._clone_assign(f"{name}[{row}][{col}]", value, indent, out)
+
+    def stmt_Liberer(self, node, level, out):
+        out.append(f"{'    ' * level}_algo_liberer({self.expr(node.pointer)})")
+
+    def stmt_Ecrire(self, node, level, out):
+        # Print without automatic newline; \n and \t are interpreted at runtime
+        out.append(f"{'    ' * level}_algo_ecrire({', '.join(self.expr(a) for a in node.args)})")
+
+    def stmt_Lire(self, node, level, out):
+        indent = "    " * level
+        for target in node.targets:
+            name, read_type = self.var(target.name), target.read_type
+            reader = _typed_reader(read_type)
+            access = name + "".join(f"[{self.expr(i)}]" for i in target.indices)
+            if reader is not None:
+                read = f"{reader}()"
+            elif target.deref:
+                read = f"_algo_read_typed({name}._get(), _algo_read(), '{read_type}')"
+            else:
+                read = f"_algo_read_typed({access}, _algo_read(), '{read_type}')"
+            if target.deref:
+                out.append(f"{indent}{name}._set({read})")
+            else:
+                out.append(f"{indent}{access} = {read}")
+
+    def stmt_If(self, node, level, out):
+        indent = "    " * level
+        out.append(f"{indent}if {self.expr(node.condition)}:")
+        self._block(node.body, level + 1, out)
+        if node.orelse is not None:
+            out.append(f"{indent}else:")
+            self._block(node.orelse, level + 1, out)
+
+    def stmt_While(self, node, level, out):
+        out.append(f"{'    ' * level}while {self.expr(node.condition)}:")
+        self._block(node.body, level + 1, out)
+
+    def stmt_For(self, node, level, out):
+        out.append(f"{'    ' * level}for {self.var(node.var)} in range({self.expr(node.start)}, {self.expr(node.end)} + 1):")
+        self._block(node.body, level + 1, out)
+
+    def stmt_Repeat(self, node, level, out):
+        indent = "    " * level
+        out.append(f"{indent}while True:")
+        self._block(node.body, level + 1, out)
+        out.append(f"{indent}    if {self.expr(node.condition)}:")
+        out.append(f"{indent}        break")
+
+    # ── Expressions ──────────────────────────────────────────────────────
+
+    def expr(self, node):
+        if node is None:
+            return "None"
+        return getattr(self, 'expr_' + type(node).__name__)(node)
+
+    def expr_Literal(self, node):
+        return repr(node.value)
+
+    def expr_Name(self, node):
+        return self.var(node.name)
+
+    def expr_Constant(self, node):
+        return node.name
+
+    def expr_Paren(self, node):
+        # Iterative too: `((((x))))` is not limited by the E6.6 depth
+        depth = 0
+        while isinstance(node, nodes.Paren):
+            depth += 1
+            node = node.expr
+        return f"{'(' * depth}{self.expr(node)}{')' * depth}"
+
+    def expr_BinOp(self, node):
+        # Walk the left spine iteratively: `1 + 1 + ... + 1` nests as deep
+        # as it is long and would otherwise exhaust the recursion limit
+        spine = []
+        while isinstance(node, nodes.BinOp):
+            spine.append(node)
+            node = node.left
+        code = self.expr(node)
+        for binop in reversed(spine):
+            code = f"{code} {binop.op} {self.expr(binop.right)}"
+        return code
+
+    def expr_ArrayDecay(self, node):
+        return f"Pointer(\"{self.source(node.array)}\", locals(), index=0, base_var={self.expr(node.array)})"
+
+    def expr_Not(self, node):
+        return f"not ({self.expr(node.operand)})"
+
+    def expr_Neg(self, node):
+        return f"-({self.expr(node.operand)})"
+
+    def expr_Call(self, node):
+        return f"{node.name}({', '.join(self.expr(a) for a in node.args)})"
+
+    def expr_Index(self, node):
+        if _pointer_variable(node.target, self.pointer_params):
+            return f"{self.expr(node.target)}._get_at({self.expr(node.index)})"
+        return f"{self.expr(node.target)}[{self.expr(node.index)}]"
+
+    def expr_GetChar(self, node):
+        return f"_algo_get_char({self.expr(node.target)}, {self.expr(node.index)})"
+
+    def expr_FieldAccess(self, node):
+        target = self.expr(node.target)
+        if node.arrow:
+            # ->field is shorthand for (ptr^).field
+            return f"({target})._get()['{node.field}']"
+        return f"{target}['{node.field}']"
+
+    def expr_Deref(self, node):
+        if node.as_string:
+            # A pointer to characters reads the string up to its terminator
+            code = self.expr(node.pointer)
+            return f'(({code})._get_string() if hasattr({code}, "_get_string") else ({code})._get())'
+        arithmetic = _pointer_offset(node.pointer, self.pointer_params)
+        if arithmetic:
+            pointer, terms = arithmetic
+            (op, term), rest = terms[0], terms[1:]
+            offset = self.expr(term) if op == '+' else f"-({self.expr(term)})"
+            for op, term in rest:
+                offset = f"{offset} {op} {self.expr(term)}"
+            return f"{self.expr(pointer)}._get_at({offset})"
+        return f'({self.expr(node.pointer)})._get()'
+
+    def expr_AddressOf(self, node):
+        name, ns = node.name, _namespace(node.local)
+        indices = [self.expr(i) for i in node.indices]
+        if not indices:
+            if name in self.cells:
+                return f"Pointer(\"{name}\", cell={name}, alloc_name=\"{node.alloc_name}\")"
+            return f"Pointer(\"{name}\", {ns}, alloc_name=\"{node.alloc_name}\")"
+        if len(indices) == 1:
+            return (f"Pointer(\"{name}\", {ns}, index={indices[0]}, base_var={self.var(name)}, "
+                    f"alloc_name=\"{node.alloc_name}\")")
+        # To point to mat[i][j], the base_var is the specific row, index is j
+        row, col = indices
+        return (f"Pointer(\"{name}_row_\" + str({row}), {ns}, index={col}, base_var={self.var(name)}[{row}], "
+                f"alloc_name=\"{node.alloc_name}\")")
+
+    def expr_Longueur(self, node):
+        return f"_algo_longueur({self.expr(node.operand)})"
+
+    def expr_Concat(self, node):
+        return f"_algo_concat({self.expr(node.left)}, {self.expr(node.right)})"
+
+    def expr_Taille(self, node):
+        return f"_algo_taille('{node.type_name}')"
+
+    def expr_Allouer(self, node):
+        if node.element_size is None:
+            return f"_algo_allouer({self.expr(node.size)})"
+        return f"_algo_allouer({self.expr(node.size)}, element_size={node.element_size})"
+
+    def expr_AllouerRecord(self, node):
+        return f"_algo_allouer_record({self.expr(node.init)})"
+
+    def expr_DefaultValue(self, node):
+        t = node.type_name.lower()
+        if t == 'entier': return '0'
+        if t == 'reel': return '0.0'
+        if t == 'chaine': return '""'
+        if t == 'booleen': return 'False'
+        if t == 'caractere': return "''"
+        if 'pointeur' in t or t.startswith('pointeur_') or t.startswith('^'): return 'None'  # NIL pointer
+        # Fixed-size string field: TABLEAU_CHAINE_N
+        if t.startswith('tableau_chaine_'):
+            try:
+                return f"_algo_fixed_string({int(t.split('_')[-1])})"
+            except ValueError:
+                return "_algo_fixed_string(1)"
+        if node.fields is not None:
+            return '{' + ', '.join(f"'{name}': {self.expr(default)}" for name, default in node.fields) + '}'
+        return '{}'
+
+    def expr_NewPointer(self, node):
+        return f"Pointer(\"{node.name}\", {_namespace(node.local)})"
+
+    def expr_ArrayInit(self, node):
+        if node.size is None:
+            return "[]"
+        if node.nul:
+            return f"_algo_fixed_string({node.size})"
+        if node.type == 'CHAINE':
+            return f"_algo_fixed_string({node.size}, None)"
+        return f"[None] * {node.size}"
+
+    def expr_MatrixInit(self, node):
+        return f"[[None] * {node.cols} for _ in range({node.rows})]"
+
+    def expr_RecordArrayInit(self, node):
+        return f"[{self.expr(node.record)} for _ in range({node.size})]"
+
+
+def generate(program):
+    """Python source for a nodes.Program."""
+    return CodeGenerator().program(program)
@@ -0,0 +1,115 @@
+import threading
+from contextlib import contextmanager
+
+# Per-thread pointer to the compilation currently being parsed.
+# Grammar actions are plain functions called by PLY, so they reach their
+# state through get_context() instead of module globals.
+_local = threading.local()
+
+
+class MemoryAllocator:
+    def __init__(self, start_address=1000, record_types=None):
+        self.next_address = start_address
+        self.vars_info = {} # name -> {'addr': int, 'size': int, 'type': str}
+        self.record_types = record_types if record_types is not None else {}
+
+    def allocate(self, name, type_name, count=1):
+        size = self.get_type_size(type_name) * count
+        addr = self.next_address
+        self.next_address += size
+        self.vars_info[name] = {'addr': addr, 'size': size, 'element_size': self.get_type_size(type_name), 'type': type_name}
+        return addr
+
+    def import_vars(self, vars_info):
+        """Allocate the variables of a separately compiled unit (a library) after ours."""
+        for name, info in vars_info.items():
+            self.vars_info[name] = dict(info, addr=self.next_address)
+            self.next_address += info['size']
+
+    def get_type_size(self, type_name):
+        t = type_name.upper()
+        # 1. Check if it's a known record type
+        if type_name in self.record_types:
+            fields = self.record_types[type_name]
+            return sum(self.get_type_size(ft) for ft in fields.values())
+
+        # 2. Handle pointer types
+        if t.startswith('POINTEUR') or t.startswith('^'):
+            return 1 # Algorithmic address unit
+
+        # 3. Handle base types
+        if t in ('ENTIER', 'ENTIER_TYPE'): return 4
+        if t in ('REEL', 'REEL_TYPE'): return 8
+        if t in ('BOOLEEN', 'BOOLEEN_TYPE'): return 1
+        if t in ('CARACTERE', 'CARACTERE_TYPE'): return 1
+
+        # 4. Handle Chaine and Arrays
+        if t.startswith('TABLEAU_CHAINE_'):
+            try: return int(t.split('_')[-1])
+            except: return 1
+        if 'CHAINE' in t: return 1
+
+        if t.startswith('TABLEAU_'):
+            parts = t.split('_')
+            try:
+                # Format: TABLEAU_ELEMENTTYPE_SIZE
+                n = int(parts[-1])
+                elem_type = '_'.join(parts[1:-1])
+                return n * self.get_type_size(elem_type)
+            except:
+                return 4
+
+        return 4 # Default
+
+
+class CompilationContext:
+    """All mutable state of one compile_algo() run.
+
+    A fresh context is created per compilation, so concurrent requests on
+    different threads never see each other's symbols, errors or memory map.
+    """
+
+    def __init__(self):
+        # Registry for record (Enregistrement) type definitions
+        # { 'TypeName': { 'field_name': 'FieldType', ... } }  (ordered dict preserves field order)
+        self.record_types = {}
+
+        # Symbol Table with scoping
+        # symbol_table = { 'global': {}, 'func_name': {} }
+        self.symbol_table = {'global': {}}
+        self.scope_stack = ['global']
+        self.function_return_types = {}
+        self.globals_modified_in_subprogram = {}
+        self.current_subprogram_type = None # 'function' or 'procedure'
+        self.current_subprogram_var_params = set()
+        # Const declarations: { 'NAME': nodes.Literal }
+        self.constants = {}
+        # Subprograms of the imported libraries: { 'name': 'LibraryName' }
+        self.library_subprograms = {}
+        # Record types of the imported libraries: { 'Name': 'LibraryName' }
+        self.library_types = {}
+
+        self.parser_errors = []
+        self.lexer_errors = []
+        self.mem_alloc = MemoryAllocator(record_types=self.record_types)
+
+    @property
+    def errors(self):
+        return self.lexer_errors + self.parser_errors
+
+    @contextmanager
+    def activate(self):
+        """Make this the current context of the calling thread."""
+        previous = getattr(_local, 'context', None)
+        _local.context = self
+        try:
+            yield self
+        finally:
+            _local.context = previous
+
+
+def get_context():
+    ctx = getattr(_local, 'context', None)
+    if ctx is None:
+        raise RuntimeError("No active CompilationContext; call compile_algo()")
+    return ctx
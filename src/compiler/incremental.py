@@ -0,0 +1,241 @@
+"""Incremental compilation: per-subprogram reuse of generated code.
+
+While a student edits one Fonction/Procedure, every other subprogram of
+the program compiles to exactly the same Python. RegionCache keeps the
+generated source and the compiled function code object of each
+subprogram, keyed by a fingerprint of its typed AST. The typed nodes
+already carry everything the subprogram depends on (resolved types of
+records and variables, return types of the functions it calls, which
+globals it assigns, constant values), so an edit to a Type block or to
+another subprogram's signature changes the fingerprint of every
+dependent subprogram and only those are rebuilt.
+
+The whole program is still parsed on every compile: parsing is what
+resolves those symbols and reports errors. After that, only the changed
+subprograms are optimized, generated and compiled. The module skeleton
+(header, globals, main body) is small and always rebuilt; each cached
+function code object is spliced into it in place of a stub.
+
+Line numbers are stored relative to the subprogram's first line, so an
+edit above a subprogram only shifts its code object.
+"""
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+
+from compiler import nodes
+from compiler.astgen import AstGenerator, _shift, _stub, link_libraries
+from compiler.codegen import CodeGenerator, global_cells
+from compiler.limits import LimitExceeded, limits
+from compiler.optimizer import Optimizer
+from compiler.parser import _critical_error, compile_parsed, parse_algo
+
+_END = object()
+
+
+def _fingerprint(node, optimizer=None):
+    """Key of a subprogram: its typed AST with lines relative to its header."""
+    h = hashlib.sha256()
+    constants = set()
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if value is _END:
+            h.update(b')')
+        elif isinstance(value, nodes.Node):
+            if isinstance(value, nodes.Constant):
+                constants.add(value.name)
+            # Some nodes carry no line (lineno 0)
+            line = value.lineno - node.lineno if value.lineno else None
+            h.update(f"({type(value).__name__}:{line}".encode('utf-8'))
+            stack.append(_END)
+            stack.extend(reversed([getattr(value, name) for name in value._fields]))
+        elif isinstance(value, (list, tuple)):
+            h.update(b'[')
+            stack.append(_END)
+            stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            h.update(b'{')
+            stack.append(_END)
+            stack.extend(reversed([item for pair in value.items() for item in pair]))
+        else:
+            h.update(repr(value).encode('utf-8') + b'\0')
+    # Constants assigned anywhere in the program are not folded
+    if optimizer is not None:
+        h.update(b'O' + repr(sorted(constants & optimizer.assigned)).encode('utf-8'))
+    return h.hexdigest()
+
+
+class _Region:
+    __slots__ = ('python_code', 'code_object', 'lineno')
+
+    def __init__(self, python_code, code_object, lineno):
+        self.python_code = python_code
+        self.code_object = code_object
+        self.lineno = lineno
+
+
+class RegionCache:
+    """Bounded LRU of compiled subprograms, shared by all compilations."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class _RegionOptimizer(Optimizer):
+    # Cached subprograms were stored already optimized
+    def __init__(self, program, cached):
+        super().__init__(program)
+        self.cached = cached
+
+    def subprogram(self, node):
+        if id(node) not in self.cached:
+            super().subprogram(node)
+
+
+class _RegionCodeGenerator(CodeGenerator):
+    def __init__(self, regions):
+        super().__init__()
+        self.regions = regions
+
+    def subprogram(self, node):
+        region = self.regions.get(id(node))
+        if region is None:
+            return super().subprogram(node)
+        # Cached text: its lines stay out of line_map
+        self._placement = (0, [])
+        return region.python_code
+
+
+class _RegionAstGenerator(AstGenerator):
+    # Every subprogram becomes `def name(): pass`; its real code object is
+    # spliced in after the module is compiled
+    def __init__(self):
+        super().__init__()
+        self.stubs = {}
+
+    def subprogram(self, node):
+        self.stubs[(node.name, node.lineno)] = node
+        return _stub(node, node.lineno)
+
+
+class IncrementalCompiler:
+    """compile_algo_code() that reuses unchanged subprograms across calls."""
+
+    def __init__(self, regions=None):
+        self.regions = regions if regions is not None else RegionCache()
+
+    def compile(self, code, optimize=True, stats=None):
+        """Same result as compile_algo_code(code, optimize)."""
+        try:
+            deadline = limits.deadline()
+            program, errors = parse_algo(code, deadline, stats)
+            if not isinstance(program, nodes.Program) or errors:
+                return compile_parsed(program, errors, optimize, deadline=deadline, stats=stats)
+            try:
+                return self._compile(program, optimize, deadline, stats)
+            except SyntaxError:
+                # Names the AST backend cannot express: the regular path
+                # falls back to compiling source text
+                return compile_parsed(program, errors, optimize, deadline=deadline, stats=stats)
+            except LimitExceeded as e:
+                return None, None, [e.error]
+        except Exception as e:
+            return _critical_error(e)
+
+    def _compile(self, program, optimize, deadline=None, stats=None):
+        subprograms = list(program.subprograms)
+        subprograms += [d for d in program.declarations if isinstance(d, nodes.Subprogram)]
+        keys, regions = {}, {}
+        optimizer = _RegionOptimizer(program, regions) if optimize else None
+        # Which globals are cells changes how a subprogram reads them
+        cells = global_cells(program)
+        suffix = ('O' if optimize else '-') + ','.join(sorted(cells))
+        for sub in subprograms:
+            keys[id(sub)] = key = _fingerprint(sub, optimizer) + suffix
+            region = self.regions.get(key)
+            if region is not None:
+                regions[id(sub)] = region
+        if stats is not None:
+            stats.sizes['reused_subprograms'] = len(regions)
+        if optimize:
+            optimizer.program(program)
+            limits.check_deadline(deadline)
+            if stats is not None:
+                stats.lap('optimize')
+
+        # Build and store the subprograms that were not cached
+        for sub in subprograms:
+            if id(sub) in regions:
+                continue
+            limits.check_deadline(deadline)
+            ast_generator, code_generator = AstGenerator(), CodeGenerator()
+            ast_generator.global_cells = code_generator.global_cells = cells
+            python_code = code_generator.subprogram(sub)
+            if stats is not None:
+                stats.lap('codegen')
+            function = ast_generator.subprogram(sub)
+            module = compile(ast.Module([function], []), '<string>', 'exec')
+            code_object = next(c for c in module.co_consts if isinstance(c, type(module)))
+            if stats is not None:
+                stats.lap('compile')
+            region = _Region(python_code, code_object, sub.lineno)
+            regions[id(sub)] = region
+            self.regions.put(keys[id(sub)], region)
+
+        python_code = _RegionCodeGenerator(regions).program(program)
+        if stats is not None:
+            stats.lap('codegen')
+            stats.sizes['generated_bytes'] = len(python_code)
+        limits.check_generated(python_code)
+        limits.check_deadline(deadline)
+        generator = _RegionAstGenerator()
+        module = compile(generator.program(program), '<string>', 'exec')
+        consts = []
+        for const in module.co_consts:
+            if isinstance(const, type(module)) and (const.co_name, const.co_firstlineno) in generator.stubs:
+                sub = generator.stubs[(const.co_name, const.co_firstlineno)]
+                region = regions[id(sub)]
+                const = _shift(region.code_object, sub.lineno - region.lineno)
+            consts.append(const)
+        code_object = link_libraries(module.replace(co_consts=tuple(consts)), program)
+        if stats is not None:
+            stats.lap('compile')
+        return python_code, code_object, []
+
+
+incremental_compiler = IncrementalCompiler()
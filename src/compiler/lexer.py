@@ -1,4 +1,5 @@
 import ply.lex as lex
+from compiler import tables
 
 # List of token names
 tokens = (
@@ -17,7 +18,8 @@ tokens = (
     'LONGUEUR', 'CONCAT',
     'VRAI', 'FAUX',
     'CARET', 'AMPERSAND', 'NIL',  # Pointer support
-    'TYPE', 'ENREGISTREMENT', 'ARROW'  # Record support
+    'TYPE', 'ENREGISTREMENT', 'ARROW',  # Record support
+    'UTILISER', 'BIBLIOTHEQUE'  # Libraries
 )
 
 # Regular expression rules for simple tokens
@@ -101,6 +103,8 @@ reserved = {
     'nil': 'NIL',  # Null pointer
     'type': 'TYPE',  # Record type declaration
     'enregistrement': 'ENREGISTREMENT',  # Record keyword
+    'utiliser': 'UTILISER',  # Import a library
+    'bibliotheque': 'BIBLIOTHEQUE',  # Library unit header
 }
 
 def t_ASSIGN(t):
@@ -156,15 +160,13 @@ def t_comment(t):
     pass
 
 # Error handling
-errors = []
-
 def find_column(input, token):
     line_start = input.rfind('\n', 0, token.lexpos) + 1
     return (token.lexpos - line_start) + 1
 
 def t_error(t):
     error_msg = f"Illegal character '{t.value[0]}'"
-    errors.append({
+    t.lexer.errors.append({
         "line": t.lexer.lineno,
         "column": find_column(t.lexer.lexdata, t),
         "message": error_msg,
@@ -174,14 +176,17 @@ def t_error(t):
     t.lexer.skip(1)
 
 # Build the lexer
-lexer = lex.lex()
-
-def get_lexer_errors():
-    return errors
-
-def clear_lexer_errors():
-    global errors
-    errors = []
+# Lexical errors are collected on the lexer instance. compile_algo() works on
+# a clone and gives it a private `errors` list; this shared instance only
+# serves as the clone template and for test_lexer() below.
+# Pregenerated tables (python -m compiler.tables) skip the regex
+# validation/assembly; without them the lexer is built in memory.
+_lextab = tables.load('lextab')
+if _lextab is not None:
+    lexer = lex.lex(optimize=1, lextab=_lextab)
+else:
+    lexer = lex.lex()
+lexer.errors = []
 
 # Helper function to test
 def test_lexer(data):
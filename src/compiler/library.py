@@ -0,0 +1,205 @@
+"""Algo libraries: Type / Fonction / Procedure declarations compiled once.
+
+A library is a source file holding only declarations:
+
+    Bibliotheque Piles;
+    Type Pile = Enregistrement ... Fin;
+    Procedure Empiler(Var P : Pile, v : Entier) ... Fin;
+    Fin.
+
+A program imports it with `Utiliser Piles;` before its own declarations.
+The file is looked up as Piles.algo (in any case) in the directories of
+ALGO_LIBRARY_PATH (default: bibliotheques/ at the root of the project),
+then parsed, optimized, generated and compiled once per hash of its
+source. Importing it merges its record types, function return types and
+memory map into the program's symbols (parser._use_library); the
+generated source of its subprograms is pasted into the program's, and
+their compiled functions are linked into its code object in place of
+stubs (astgen.link_libraries).
+
+The debugger steps over library calls; an error raised inside one is
+reported on the `Utiliser` line.
+
+    E7.1  library not found
+    E7.2  library does not compile
+    E7.3  name defined by two libraries, or by a library and the program
+    E7.4  library compiled as a program
+"""
+import ast
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from compiler import astgen, nodes
+from compiler.codegen import CodeGenerator
+from compiler.optimizer import Optimizer
+
+_DEFAULT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'bibliotheques'))
+
+# Names a source may import; a comment mentioning one only costs a lookup
+_USE = re.compile(r'\butiliser\s+([A-Za-z_]\w*)', re.IGNORECASE)
+
+
+def error(code, message, line=0):
+    return {"line": line, "column": 0, "message": message, "type": "Library Error", "error_code": code}
+
+
+class LibraryError(Exception):
+    """A library that cannot be imported; `error` is its E7.x error."""
+
+    def __init__(self, error):
+        super().__init__(error["message"])
+        self.error = error
+
+
+class CompiledLibrary:
+    """A library parsed, generated and compiled once.
+
+    `python_code` is the source of its subprograms as codegen emits them;
+    `functions` maps each subprogram name to its function code object,
+    located entirely on line 1 so that linking it moves it to the
+    `Utiliser` line.
+    """
+
+    __slots__ = ('name', 'digest', 'subprograms', 'return_types', 'record_types', 'vars_info',
+                 'python_code', 'functions')
+
+    def __init__(self, unit, digest, python_code, functions):
+        self.name = unit.name
+        self.digest = digest
+        self.subprograms = unit.subprograms
+        self.return_types = unit.return_types
+        self.record_types = unit.record_types
+        self.vars_info = unit.vars_info
+        self.python_code = python_code
+        self.functions = functions
+
+
+def _function_code(sub, python_code):
+    try:
+        module = ast.Module([astgen.AstGenerator().subprogram(sub)], [])
+    except SyntaxError:
+        # Names the AST backend cannot express, as in compile_parsed()
+        module = ast.parse(python_code)
+    module = compile(astgen.relocate(module, []), '<string>', 'exec')
+    return next(c for c in module.co_consts if isinstance(c, type(module)))
+
+
+def compile_library(code, name, digest=None):
+    """CompiledLibrary of library source `code`; LibraryError if it does not compile."""
+    from compiler.parser import parse_algo   # the parser imports this module
+    unit, errors = parse_algo(code)
+    if errors:
+        first = errors[0]
+        raise LibraryError(error("E7.2", f"Bibliothèque '{name}' invalide, ligne {first['line']}: "
+                                         f"{first['message']}"))
+    if not isinstance(unit, nodes.Library):
+        raise LibraryError(error("E7.2", f"'{name}' n'est pas une bibliothèque: "
+                                         f"elle doit commencer par 'Bibliotheque {name};'."))
+    optimizer = Optimizer(unit)
+    texts, functions = [], {}
+    for sub in unit.subprograms:
+        optimizer.subprogram(sub)
+        text = CodeGenerator().subprogram(sub)
+        texts.append(text)
+        functions[sub.name] = _function_code(sub, text)
+    return CompiledLibrary(unit, digest, "\n".join(texts), functions)
+
+
+class LibraryLoader:
+    """Finds libraries on the search path and keeps them compiled, keyed
+    by the hash of their source, so an edited file is compiled again."""
+
+    def __init__(self, path=None, maxsize=64):
+        self.path = list(path) if path is not None else [_DEFAULT_PATH]
+        self.maxsize = maxsize
+        self._sources = {}              # file -> (mtime_ns, size, digest, source)
+        self._compiled = OrderedDict()  # digest -> CompiledLibrary
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get('ALGO_LIBRARY_PATH')
+        return cls([p for p in path.split(os.pathsep) if p] if path else None)
+
+    def find(self, name):
+        """Path of library `name` (file name compared without case), or None."""
+        target = name.lower() + '.algo'
+        for directory in self.path:
+            try:
+                entries = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.lower() == target:
+                    return os.path.join(directory, entry)
+        return None
+
+    def source(self, name):
+        """(digest, source) of library `name`; LibraryError if there is none."""
+        path = self.find(name)
+        try:
+            if path is None:
+                raise OSError(name)
+            st = os.stat(path)
+            with self._lock:
+                cached = self._sources.get(path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                return cached[2], cached[3]
+            with open(path, encoding='utf-8') as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError):
+            raise LibraryError(error("E7.1", f"Bibliothèque '{name}' introuvable.")) from None
+        digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._sources[path] = (st.st_mtime_ns, st.st_size, digest, code)
+        return digest, code
+
+    def digest(self, name):
+        """Hash of library `name`'s current source, None if there is none."""
+        try:
+            return self.source(name)[0]
+        except LibraryError:
+            return None
+
+    def load(self, name):
+        """CompiledLibrary of library `name`; LibraryError if it cannot be used."""
+        digest, code = self.source(name)
+        with self._lock:
+            entry = self._compiled.get(digest)
+            if entry is not None:
+                self._compiled.move_to_end(digest)
+                self.hits += 1
+                return entry
+        # Compiled outside the lock, like CompilationCache misses
+        entry = compile_library(code, name, digest)
+        with self._lock:
+            self.misses += 1
+            self._compiled[digest] = entry
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+        return entry
+
+    def key(self, code):
+        """Digests of the libraries program `code` may import, for the
+        compilation cache: a program is not reused once they change."""
+        names = sorted({name.lower() for name in _USE.findall(code)})
+        return ''.join(f"{name}={self.digest(name)};" for name in names)
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+            self._compiled.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._compiled), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+libraries = LibraryLoader.from_env()
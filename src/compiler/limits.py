@@ -0,0 +1,161 @@
+"""Compile-time resource limits.
+
+compile_algo() runs on shared web workers, so one pathological paste
+(megabytes of source, thousands of nested Si, a program that expands to
+a huge module) must not hold a worker for long. Every compilation checks
+the limits below and stops with an E6.x error instead:
+
+    E6.1  source too large             ALGO_MAX_SOURCE_BYTES      (256 KiB)
+    E6.2  too many tokens              ALGO_MAX_TOKENS            (50 000)
+    E6.3  blocks nested too deeply     ALGO_MAX_NESTING           (100)
+    E6.4  generated code too large     ALGO_MAX_GENERATED_BYTES   (4 MiB)
+    E6.5  compile deadline exceeded    ALGO_COMPILE_TIMEOUT       (5 s)
+    E6.6  expression nested too deeply ALGO_MAX_EXPRESSION_DEPTH  (100)
+
+The code generators recurse into expressions, so E6.6 keeps nested
+`-`, `non`, calls and operands well below the Python recursion limit.
+
+A value of 0 disables that limit.
+"""
+import os
+import time
+from functools import partial
+
+from compiler import nodes
+
+
+def _error(code, message):
+    return {"line": 0, "column": 0, "message": message, "type": "Limit Error", "error_code": code}
+
+
+class LimitExceeded(Exception):
+    """A compilation went over one of the limits; `error` is its E6.x error."""
+
+    def __init__(self, error):
+        super().__init__(error["message"])
+        self.error = error
+
+
+class CompileLimits:
+    __slots__ = ('max_source_bytes', 'max_tokens', 'max_nesting', 'max_generated_bytes', 'timeout',
+                 'max_expression_depth')
+
+    def __init__(self, max_source_bytes=256 * 1024, max_tokens=50000, max_nesting=100,
+                 max_generated_bytes=4 * 1024 * 1024, timeout=5.0, max_expression_depth=100):
+        self.max_source_bytes = max_source_bytes
+        self.max_tokens = max_tokens
+        self.max_nesting = max_nesting
+        self.max_generated_bytes = max_generated_bytes
+        self.timeout = timeout
+        self.max_expression_depth = max_expression_depth
+
+    @classmethod
+    def from_env(cls):
+        defaults = cls()
+        return cls(
+            max_source_bytes=int(os.environ.get('ALGO_MAX_SOURCE_BYTES', defaults.max_source_bytes)),
+            max_tokens=int(os.environ.get('ALGO_MAX_TOKENS', defaults.max_tokens)),
+            max_nesting=int(os.environ.get('ALGO_MAX_NESTING', defaults.max_nesting)),
+            max_generated_bytes=int(os.environ.get('ALGO_MAX_GENERATED_BYTES', defaults.max_generated_bytes)),
+            timeout=float(os.environ.get('ALGO_COMPILE_TIMEOUT', defaults.timeout)),
+            max_expression_depth=int(os.environ.get('ALGO_MAX_EXPRESSION_DEPTH', defaults.max_expression_depth)),
+        )
+
+    def deadline(self):
+        """perf_counter() value after which the compilation stops (None: no deadline)."""
+        return time.perf_counter() + self.timeout if self.timeout > 0 else None
+
+    def check_deadline(self, deadline):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise LimitExceeded(_error(
+                "E6.5", f"Compilation trop longue: interrompue après {self.timeout:g} s."))
+
+    def check_source(self, code):
+        if self.max_source_bytes > 0 and isinstance(code, str):
+            size = len(code.encode('utf-8', 'surrogatepass'))
+            if size > self.max_source_bytes:
+                raise LimitExceeded(_error(
+                    "E6.1", f"Programme trop volumineux: {size} octets "
+                            f"(maximum {self.max_source_bytes})."))
+
+    def check_tokens(self, tokens):
+        if 0 < self.max_tokens < len(tokens):
+            raise LimitExceeded(_error(
+                "E6.2", f"Programme trop long: {len(tokens)} lexèmes (maximum {self.max_tokens})."))
+
+    def check_nesting(self, program):
+        if self.max_nesting > 0:
+            depth = nesting_depth(program)
+            if depth > self.max_nesting:
+                raise LimitExceeded(_error(
+                    "E6.3", f"Blocs trop imbriqués: profondeur {depth} (maximum {self.max_nesting})."))
+        if self.max_expression_depth > 0:
+            depth = expression_depth(program)
+            if depth > self.max_expression_depth:
+                raise LimitExceeded(_error(
+                    "E6.6", f"Expression trop imbriquée: profondeur {depth} "
+                            f"(maximum {self.max_expression_depth})."))
+
+    def check_generated(self, python_code):
+        if self.max_generated_bytes > 0 and python_code and len(python_code) > self.max_generated_bytes:
+            raise LimitExceeded(_error(
+                "E6.4", f"Code généré trop volumineux: {len(python_code)} caractères "
+                        f"(maximum {self.max_generated_bytes})."))
+
+    def token_feed(self, tokens, deadline):
+        """A lexer.token replacement over `tokens` that checks the deadline as it goes."""
+        if deadline is None:
+            return partial(next, iter(tokens), None)
+        return partial(next, self._guarded(tokens, deadline), None)
+
+    def _guarded(self, tokens, deadline):
+        for start in range(0, len(tokens), 512):
+            self.check_deadline(deadline)
+            yield from tokens[start:start + 512]
+
+
+_BLOCKS = (nodes.If, nodes.While, nodes.For, nodes.Repeat)
+
+
+def nesting_depth(program):
+    """Deepest nesting of Si/TantQue/Pour/Repeter blocks in the program (or library)."""
+    bodies = [sub.body for sub in program.subprograms]
+    if isinstance(program, nodes.Program):
+        bodies.append(program.body)
+        bodies += [d.body for d in program.declarations if isinstance(d, nodes.Subprogram)]
+    deepest = 0
+    stack = [(body, 0) for body in bodies if body]
+    while stack:
+        body, depth = stack.pop()
+        for stmt in body:
+            if isinstance(stmt, _BLOCKS):
+                deepest = max(deepest, depth + 1)
+                if stmt.body:
+                    stack.append((stmt.body, depth + 1))
+                if isinstance(stmt, nodes.If) and stmt.orelse:
+                    stack.append((stmt.orelse, depth + 1))
+    return deepest
+
+
+def expression_depth(program):
+    """Deepest nesting of expressions in the program (or library).
+
+    Parentheses and the left operand of a binary operator do not count:
+    the generators walk `((x))` and `a + b + ... + z` iteratively,
+    however long they are.
+    """
+    deepest = 0
+    stack = [(program, 0)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        for child in node.children():
+            if isinstance(child, nodes.Expr) and not isinstance(node, nodes.Paren) \
+                    and not (isinstance(node, nodes.BinOp) and child is node.left):
+                stack.append((child, depth + 1))
+            else:
+                stack.append((child, depth))
+    return deepest
+
+
+limits = CompileLimits.from_env()
@@ -0,0 +1,409 @@
+"""Language Server Protocol server for Algo.
+
+    PYTHONPATH=src python -m compiler.lsp
+
+speaks LSP (JSON-RPC over stdin/stdout) to an editor: VS Code, or a web
+client bridged to a subprocess. Documents are synced incrementally (the
+client sends only the edited ranges). Each text is analysed once by the
+parser itself, so diagnostics are exactly the errors compile_algo() would
+report, and the analysis is cached by content hash: switching back to a
+previous text, or asking for completion and hover on the current one,
+does not parse again.
+
+Completion offers the keywords, the variables visible at the cursor (from
+the parser's symbol tables), the subprograms and record types, and after
+`x.` or `p->` the fields of x's record type. Hover shows the type of a
+variable as find_variable() resolves it in the scope of the cursor, the
+signature of a subprogram or the fields of a record type. While the text
+does not parse, completion and hover use the last text that did.
+"""
+import hashlib
+import json
+import re
+import sys
+from collections import OrderedDict
+
+from compiler import nodes
+from compiler.context import CompilationContext
+from compiler.lexer import reserved, t_ID
+from compiler.parser import find_variable, parse_algo
+
+_IDENT = re.compile(t_ID.__doc__)
+# `name.` or `name->` (possibly a chain of them) just before the cursor
+_MEMBER = re.compile(r'((?:' + t_ID.__doc__ + r')(?:\s*(?:\.|->)\s*(?:' + t_ID.__doc__ + r'))*)\s*(?:\.|->)\s*\w*$')
+
+_KEYWORD_SPELLING = {'tantque': 'TantQue', 'fintantque': 'FinTantQue', 'finsi': 'FinSi', 'finpour': 'FinPour',
+                     'nil': 'NIL', 'enregistrement': 'Enregistrement', 'bibliotheque': 'Bibliotheque'}
+KEYWORDS = sorted(_KEYWORD_SPELLING.get(word, word.capitalize()) for word in reserved)
+
+# LSP constants
+_SYNC_INCREMENTAL = 2
+_SEVERITY_ERROR = 1
+_KIND_FUNCTION, _KIND_FIELD, _KIND_VARIABLE, _KIND_CLASS, _KIND_KEYWORD, _KIND_CONSTANT = 3, 5, 6, 7, 14, 21
+
+
+def display_type(type_name):
+    """Algo spelling of a parser type string: POINTEUR_Element -> ^Element,
+    TABLEAU_Entier_10 -> Entier[10]."""
+    if type_name is None:
+        return ''
+    upper = type_name.upper()
+    if upper.startswith('POINTEUR_'):
+        return '^' + display_type(type_name[len('POINTEUR_'):])
+    if upper.startswith('TABLEAU_'):
+        element, _, size = type_name[len('TABLEAU_'):].rpartition('_')
+        if size.isdigit():
+            return f"{display_type(element)}[{size}]"
+        return f"Tableau de {display_type(type_name[len('TABLEAU_'):])}"
+    if upper.startswith('MATRICE_'):
+        return f"Matrice de {display_type(type_name[len('MATRICE_'):])}"
+    if upper.endswith('_TYPE'):
+        type_name = type_name[:-len('_TYPE')]
+    return type_name.capitalize() if type_name.isupper() else type_name
+
+
+def signature(sub):
+    params = ', '.join(f"{name} : {display_type(type_name)}" for name, type_name in sub.params)
+    if sub.kind == 'function':
+        return f"Fonction {sub.name}({params}) : {display_type(sub.return_type)}"
+    return f"Procedure {sub.name}({params})"
+
+
+# ── Text positions ───────────────────────────────────────────────────────────
+
+def _utf16_offset(line, character):
+    """Index into `line` of LSP `character`, counted in UTF-16 code units."""
+    units = 0
+    for index, ch in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def offset_at(text, position):
+    """Index into `text` of an LSP {line, character} position."""
+    lines = text.split('\n')
+    line = min(position['line'], len(lines) - 1)
+    start = sum(len(l) + 1 for l in lines[:line])
+    return start + _utf16_offset(lines[line], position['character'])
+
+
+def apply_change(text, change):
+    """`text` after one TextDocumentContentChangeEvent."""
+    if 'range' not in change:
+        return change['text']
+    start = offset_at(text, change['range']['start'])
+    end = offset_at(text, change['range']['end'])
+    return text[:start] + change['text'] + text[end:]
+
+
+# ── Analysis ─────────────────────────────────────────────────────────────────
+
+class Analysis:
+    """What the parser knows about one text: its errors and symbol tables."""
+
+    def __init__(self, text):
+        ctx = CompilationContext()
+        unit, self.errors = parse_algo(text, context=ctx)
+        self.context = ctx
+        self.unit = unit if isinstance(unit, (nodes.Program, nodes.Library)) else None
+        self.subprograms = {}
+        # (first line, scope name) of each region; the main body is 'global'
+        self.scopes = [(1, 'global')]
+        if self.unit is not None:
+            subs = list(self.unit.subprograms)
+            if isinstance(self.unit, nodes.Program):
+                subs += [d for d in self.unit.declarations if isinstance(d, nodes.Subprogram)]
+                self.scopes.append((self.unit.lineno, 'global'))
+                self.scopes += [(stmt.lineno, 'global') for stmt in self.unit.body[:1] if stmt.lineno]
+                for use in self.unit.uses or ():
+                    self.subprograms.update((sub.name, sub) for sub in use.library.subprograms)
+            for sub in subs:
+                self.subprograms[sub.name] = sub
+                self.scopes.append((sub.lineno, sub.name))
+            self.scopes.sort()
+
+    @property
+    def parsed(self):
+        return self.unit is not None
+
+    def diagnostics(self):
+        result = []
+        for error in self.errors:
+            line = max(error.get('line', 1) - 1, 0)
+            column = max(error.get('column', 0) - 1, 0)
+            result.append({
+                'range': {'start': {'line': line, 'character': column},
+                          'end': {'line': line + (column == 0), 'character': 0 if column == 0 else column + 1}},
+                'severity': _SEVERITY_ERROR,
+                'code': error.get('error_code'),
+                'source': 'algo',
+                'message': error['message'],
+            })
+        return result
+
+    def scope_at(self, line):
+        """Scope (subprogram name or 'global') of 1-based `line`."""
+        name = 'global'
+        for start, scope in self.scopes:
+            if start > line:
+                break
+            name = scope
+        return name
+
+    def variable_type(self, name, line):
+        """Type of variable `name` seen from `line`, as find_variable() resolves it."""
+        ctx = self.context
+        scope = self.scope_at(line)
+        ctx.scope_stack = ['global'] if scope == 'global' else ['global', scope]
+        with ctx.activate():
+            var_type, _ = find_variable(name)
+        return None if var_type == 'UNKNOWN' else var_type
+
+    def visible_variables(self, line):
+        scope = self.scope_at(line)
+        names = dict(self.context.symbol_table.get('global', {}))
+        if scope != 'global':
+            names.update(self.context.symbol_table.get(scope, {}))
+        return names
+
+    def member_type(self, chain, line):
+        """Record type reached by `a.b->c`, or None."""
+        parts = re.split(r'\s*(\.|->)\s*', chain.strip())
+        current = self.variable_type(parts[0], line)
+        for i in range(1, len(parts), 2):
+            current = self._record(current)
+            fields = self.context.record_types.get(current) if current else None
+            if not fields or parts[i + 1] not in fields:
+                return None
+            current = fields[parts[i + 1]]
+        return self._record(current)
+
+    def _record(self, type_name):
+        # Both `.` and `->` reach the fields of a pointed-to record
+        while type_name and type_name.upper().startswith('POINTEUR_'):
+            type_name = type_name[len('POINTEUR_'):]
+        return type_name if type_name in self.context.record_types else None
+
+
+# ── Server ───────────────────────────────────────────────────────────────────
+
+class Document:
+    __slots__ = ('uri', 'text', 'version', 'analysis', 'symbols')
+
+    def __init__(self, uri, text, version):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.analysis = None
+        self.symbols = None     # last Analysis that parsed
+
+
+class AlgoLanguageServer:
+    """LSP request handlers; handle() takes and returns JSON-RPC messages."""
+
+    def __init__(self, send=None, cache_size=32):
+        self.send = send or (lambda message: None)
+        self.documents = {}
+        self.cache_size = cache_size
+        self._analyses = OrderedDict()   # sha256(text) -> Analysis
+        self.shutdown_requested = False
+        self.analysed = 0
+
+    # -- JSON-RPC --
+
+    def handle(self, message):
+        """Dispatch one message; returns the response of a request, else None."""
+        method = message.get('method')
+        handler = getattr(self, 'on_' + method.replace('/', '_').replace('$', '_'), None) if method else None
+        if 'id' not in message:
+            if handler is not None:
+                handler(message.get('params') or {})
+            return None
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': message['id'],
+                    'error': {'code': -32601, 'message': f"Method not found: {method}"}}
+        try:
+            result = handler(message.get('params') or {})
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': message['id'], 'error': {'code': -32603, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': message['id'], 'result': result}
+
+    def analyse(self, text):
+        key = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        analysis = self._analyses.get(key)
+        if analysis is None:
+            analysis = Analysis(text)
+            self.analysed += 1
+            self._analyses[key] = analysis
+            while len(self._analyses) > self.cache_size:
+                self._analyses.popitem(last=False)
+        else:
+            self._analyses.move_to_end(key)
+        return analysis
+
+    def _refresh(self, document):
+        analysis = self.analyse(document.text)
+        if analysis is not document.analysis:
+            document.analysis = analysis
+            if analysis.parsed:
+                document.symbols = analysis
+            self.send({'jsonrpc': '2.0', 'method': 'textDocument/publishDiagnostics',
+                       'params': {'uri': document.uri, 'version': document.version,
+                                  'diagnostics': analysis.diagnostics()}})
+
+    # -- Lifecycle --
+
+    def on_initialize(self, params):
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': _SYNC_INCREMENTAL},
+                'completionProvider': {'triggerCharacters': ['.', '>']},
+                'hoverProvider': True,
+            },
+            'serverInfo': {'name': 'algo-lsp'},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    # -- Document sync --
+
+    def on_textDocument_didOpen(self, params):
+        item = params['textDocument']
+        document = self.documents[item['uri']] = Document(item['uri'], item['text'], item.get('version'))
+        self._refresh(document)
+
+    def on_textDocument_didChange(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return
+        for change in params['contentChanges']:
+            document.text = apply_change(document.text, change)
+        document.version = params['textDocument'].get('version')
+        self._refresh(document)
+
+    def on_textDocument_didClose(self, params):
+        self.documents.pop(params['textDocument']['uri'], None)
+
+    # -- Language features --
+
+    def _context(self, params):
+        """(document, its last parsed analysis, text of the line up to the cursor, 1-based line)."""
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None, None, '', 0
+        position = params['position']
+        lines = document.text.split('\n')
+        line = lines[position['line']] if position['line'] < len(lines) else ''
+        prefix = line[:_utf16_offset(line, position['character'])]
+        return document, document.symbols, prefix, position['line'] + 1
+
+    def on_textDocument_completion(self, params):
+        document, analysis, prefix, line = self._context(params)
+        if document is None:
+            return []
+        member = _MEMBER.search(prefix)
+        if member:
+            record = analysis.member_type(member.group(1), line) if analysis else None
+            fields = analysis.context.record_types.get(record, {}) if record else {}
+            return [{'label': name, 'kind': _KIND_FIELD, 'detail': display_type(type_name)}
+                    for name, type_name in fields.items()]
+        items = [{'label': word, 'kind': _KIND_KEYWORD} for word in KEYWORDS]
+        if analysis is not None:
+            ctx = analysis.context
+            items += [{'label': name, 'kind': _KIND_VARIABLE, 'detail': display_type(type_name)}
+                      for name, type_name in sorted(analysis.visible_variables(line).items())]
+            items += [{'label': name, 'kind': _KIND_CONSTANT, 'detail': display_type(value.type)}
+                      for name, value in sorted(ctx.constants.items())]
+            items += [{'label': name, 'kind': _KIND_FUNCTION, 'detail': signature(sub)}
+                      for name, sub in sorted(analysis.subprograms.items())]
+            items += [{'label': name, 'kind': _KIND_CLASS, 'detail': 'Enregistrement'}
+                      for name in sorted(ctx.record_types)]
+        return items
+
+    def on_textDocument_hover(self, params):
+        document, analysis, prefix, line = self._context(params)
+        if analysis is None:
+            return None
+        full_line = document.text.split('\n')[line - 1]
+        cursor = len(prefix)
+        word = next((m for m in _IDENT.finditer(full_line) if m.start() <= cursor <= m.end()), None)
+        if word is None:
+            return None
+        name = word.group()
+        before = full_line[:word.start()]
+        member = _MEMBER.search(before)
+        if member:
+            record = analysis.member_type(member.group(1), line)
+            field_type = analysis.context.record_types.get(record, {}).get(name) if record else None
+            text = f"{name} : {display_type(field_type)}" if field_type else None
+        elif name in analysis.subprograms:
+            text = signature(analysis.subprograms[name])
+        elif name in analysis.context.record_types:
+            fields = analysis.context.record_types[name]
+            text = f"Type {name} = Enregistrement\n" + ''.join(
+                f"    {field} : {display_type(type_name)};\n" for field, type_name in fields.items()) + "Fin;"
+        else:
+            var_type = analysis.variable_type(name, line)
+            if var_type is None and name in analysis.context.constants:
+                var_type = analysis.context.constants[name].type
+            text = f"{name} : {display_type(var_type)}" if var_type else None
+        if text is None:
+            return None
+        start = len(full_line[:word.start()].encode('utf-16-le')) // 2
+        end = len(full_line[:word.end()].encode('utf-16-le')) // 2
+        return {'contents': {'kind': 'markdown', 'value': f"```algo\n{text}\n```"},
+                'range': {'start': {'line': line - 1, 'character': start},
+                          'end': {'line': line - 1, 'character': end}}}
+
+
+# ── stdio transport ──────────────────────────────────────────────────────────
+
+def read_message(stream):
+    """Next JSON-RPC message from a binary stream (None at end of input)."""
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode('ascii').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    if length is None:
+        return None
+    return json.loads(stream.read(length).decode('utf-8'))
+
+
+def write_message(stream, message):
+    body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def serve(instream, outstream):
+    """Run a server until `exit`; returns the process exit code."""
+    server = AlgoLanguageServer(send=lambda message: write_message(outstream, message))
+    while True:
+        message = read_message(instream)
+        if message is None or message.get('method') == 'exit':
+            return 0 if server.shutdown_requested else 1
+        response = server.handle(message)
+        if response is not None:
+            write_message(outstream, response)
+
+
+def main():
+    return serve(sys.stdin.buffer, sys.stdout.buffer)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Typed AST produced by the parser.
+
+Grammar actions in parser.py do the semantic work (symbol table, type
+checks, memory map) and build these nodes; codegen.py turns them into
+Python source. Expression nodes carry the resolved Algo type string
+('ENTIER', 'POINTEUR_REEL', 'TABLEAU_ENTIER_10', 'UNKNOWN', ...) in `type`,
+exactly as the actions computed it. Scope-dependent details the generator
+needs (locals() vs globals() namespace, allocation names) are resolved at
+parse time and stored on the node as well.
+"""
+
+
+class Node:
+    _fields = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self._fields, args):
+            setattr(self, name, value)
+        for name in self._fields[len(args):]:
+            setattr(self, name, kwargs.pop(name, None))
+        self.lineno = kwargs.pop('lineno', 0)
+        if kwargs:
+            raise TypeError(f"{type(self).__name__}: unexpected fields {sorted(kwargs)}")
+
+    def children(self):
+        """Direct child nodes, in source order."""
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+
+    def walk(self):
+        """This node and all its descendants, pre-order, left to right."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            children = []
+            for name in node._fields:
+                value = getattr(node, name)
+                if isinstance(value, Node):
+                    children.append(value)
+                elif isinstance(value, list):
+                    children.extend(item for item in value if isinstance(item, Node))
+            if children:
+                children.reverse()
+                stack.extend(children)
+
+    def __repr__(self):
+        args = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({args})"
+
+
+# ── Program structure ────────────────────────────────────────────────────────
+
+class Program(Node):
+    # declarations: VarBlock / ConstBlock / Subprogram, in source order
+    # vars_info / record_sizes: memory map injected into the generated program
+    # uses: Use nodes of the `Utiliser` clauses
+    _fields = ('name', 'declarations', 'subprograms', 'body', 'vars_info', 'record_sizes', 'uses')
+
+
+class Library(Node):
+    # A `Bibliotheque` unit; its Type blocks are registered, not kept
+    # return_types / record_types / vars_info: what an importing program
+    # merges into its own symbols
+    _fields = ('name', 'subprograms', 'return_types', 'record_types', 'vars_info')
+
+
+class Use(Node):
+    # library: the compiler.library.CompiledLibrary imported (not a Node)
+    _fields = ('name', 'library')
+
+
+class VarBlock(Node):
+    _fields = ('definitions',)          # list of VarDefinition
+
+
+class VarDefinition(Node):
+    _fields = ('items',)                # list of VarItem, one `a, b : T;` line
+
+
+class VarItem(Node):
+    # init: initialiser expression; comment: trailing "# ..." (last item only)
+    _fields = ('name', 'type', 'init', 'comment')
+
+
+class ConstBlock(Node):
+    _fields = ('constants',)            # list of ConstDefinition
+
+
+class ConstDefinition(Node):
+    _fields = ('name', 'value')         # value: Literal
+
+
+class Subprogram(Node):
+    # kind: 'function' or 'procedure'; params: list of (name, type)
+    # cloned_params: pointer parameters passed by value, copied on entry
+    # global_names: globals assigned inside the body
+    _fields = ('kind', 'name', 'params', 'return_type', 'cloned_params', 'global_names',
+               'variables', 'body')
+
+
+# ── Statements ───────────────────────────────────────────────────────────────
+
+class Stmt(Node):
+    pass
+
+
+class EmptyStmt(Stmt):
+    """Placeholder left by syntax error recovery."""
+
+
+class ExprStmt(Stmt):
+    _fields = ('expr',)
+
+
+class Return(Stmt):
+    _fields = ('value',)
+
+
+class Assign(Stmt):
+    # var_type: declared type of `name`; local: assignment inside a subprogram
+    _fields = ('name', 'value', 'var_type', 'local')
+
+
+class DerefAssign(Stmt):
+    _fields = ('name', 'value')         # p^ <- value
+
+
+class FieldAssign(Stmt):
+    # arrow: p->field <- value instead of record.field <- value
+    _fields = ('target', 'field', 'value', 'field_type', 'arrow')
+
+
+class IndexAssign(Stmt):
+    _fields = ('name', 'index', 'value', 'var_type')
+
+
+class MatrixAssign(Stmt):
+    # blocked: a Chaine assigned to a character slot (reported as E3.3)
+    _fields = ('name', 'row', 'col', 'value', 'mat_type', 'blocked')
+
+
+class Liberer(Stmt):
+    _fields = ('pointer',)
+
+
+class Ecrire(Stmt):
+    _fields = ('args',)
+
+
+class Lire(Stmt):
+    _fields = ('targets',)              # list of ReadTarget
+
+
+class ReadTarget(Node):
+    # indices: [] / [i] / [i, j]; deref: Lire(p^); read_type: type name for _algo_read_typed
+    _fields = ('name', 'indices', 'deref', 'read_type')
+
+
+class If(Stmt):
+    _fields = ('condition', 'body', 'orelse')   # orelse is None without Sinon
+
+
+class While(Stmt):
+    _fields = ('condition', 'body')
+
+
+class For(Stmt):
+    _fields = ('var', 'start', 'end', 'body')
+
+
+class Repeat(Stmt):
+    _fields = ('body', 'condition')
+
+
+# ── Expressions ──────────────────────────────────────────────────────────────
+
+class Expr(Node):
+    pass
+
+
+class Literal(Expr):
+    _fields = ('value', 'type')
+
+
+class Name(Expr):
+    _fields = ('name', 'type')
+
+
+class Constant(Expr):
+    # A reference to a Const declaration; value is its Literal
+    _fields = ('name', 'value', 'type')
+
+
+class Paren(Expr):
+    _fields = ('expr', 'type')
+
+
+class BinOp(Expr):
+    # op is the Python operator ('+', '==', 'and', '//', ...)
+    _fields = ('op', 'left', 'right', 'type')
+
+
+class Not(Expr):
+    _fields = ('operand', 'type')
+
+
+class Neg(Expr):
+    _fields = ('operand', 'type')
+
+
+class Call(Expr):
+    _fields = ('name', 'args', 'type')
+
+
+class Index(Expr):
+    _fields = ('target', 'index', 'type')
+
+
+class GetChar(Expr):
+    _fields = ('target', 'index', 'type')
+
+
+class FieldAccess(Expr):
+    _fields = ('target', 'field', 'type', 'arrow')
+
+
+class Deref(Expr):
+    # as_string: pointer to characters, read up to the terminator
+    _fields = ('pointer', 'type', 'as_string')
+
+
+class AddressOf(Expr):
+    # indices: [] for &x, [i] for &t[i], [i, j] for &m[i][j]
+    _fields = ('name', 'indices', 'local', 'alloc_name', 'type')
+
+
+class ArrayDecay(Expr):
+    """An array operand of pointer arithmetic, viewed as a pointer to its first element."""
+    _fields = ('array', 'type')
+
+
+class Longueur(Expr):
+    _fields = ('operand', 'type')
+
+
+class Concat(Expr):
+    _fields = ('left', 'right', 'type')
+
+
+class Taille(Expr):
+    _fields = ('type_name', 'type')
+
+
+class Allouer(Expr):
+    # element_size is filled in when the target pointer type is known
+    _fields = ('size', 'element_size', 'type')
+
+
+class AllouerRecord(Expr):
+    _fields = ('init', 'type')          # init: DefaultValue of the record
+
+
+# Initialisers of declared variables
+
+class DefaultValue(Expr):
+    # fields: list of (name, DefaultValue) for a record, None otherwise
+    _fields = ('type_name', 'fields', 'type')
+
+
+class NewPointer(Expr):
+    _fields = ('name', 'local', 'type')
+
+
+class ArrayInit(Expr):
+    # size None is the empty dynamic array; nul fills with '\0' instead of None
+    _fields = ('size', 'nul', 'type')
+
+
+class MatrixInit(Expr):
+    _fields = ('rows', 'cols', 'type')
+
+
+class RecordArrayInit(Expr):
+    _fields = ('size', 'record', 'type')
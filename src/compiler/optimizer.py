@@ -0,0 +1,205 @@
+"""Constant folding and dead-code elimination on the typed AST.
+
+Runs between parsing and code generation (compile_algo(optimize=True)).
+Folding follows the semantics of the Python that codegen.py would emit for
+the unfolded tree, so an optimized program prints exactly what the
+unoptimized one does; anything that would raise (division by zero, mixed
+types) or has no literal form (inf, nan) is left for the runtime.
+"""
+import math
+import operator
+
+from compiler import nodes
+from compiler.runtime import _algo_concat, _algo_longueur
+
+_BINOPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '//': operator.floordiv,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'and': lambda a, b: a and b,
+    'or': lambda a, b: a or b,
+}
+
+_COMPARISONS = frozenset(('==', '!=', '<', '<=', '>', '>='))
+_BOOLEAN_OPS = frozenset(('and', 'or'))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _literal(value, type_name, lineno):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return nodes.Literal(value, type_name, lineno=lineno)
+
+
+class Optimizer:
+    """Folds constant expressions and drops statically dead statements."""
+
+    def __init__(self, program):
+        # A Const that is ever written to (or has its address taken) keeps
+        # being read at runtime
+        self.assigned = set()
+        for node in program.walk():
+            if isinstance(node, (nodes.Assign, nodes.DerefAssign, nodes.IndexAssign,
+                                 nodes.MatrixAssign, nodes.ReadTarget, nodes.AddressOf)):
+                self.assigned.add(node.name)
+            elif isinstance(node, nodes.For):
+                self.assigned.add(node.var)
+
+    def program(self, program):
+        for decl in program.declarations:
+            if isinstance(decl, nodes.Subprogram):
+                self.subprogram(decl)
+            elif isinstance(decl, nodes.VarBlock):
+                for definition in decl.definitions:
+                    self._fold_fields(definition)
+        for sub in program.subprograms:
+            self.subprogram(sub)
+        program.body = self.block(program.body)
+        return program
+
+    def subprogram(self, node):
+        if node.variables is not None:
+            for definition in node.variables:
+                self._fold_fields(definition)
+        node.body = self.block(node.body)
+
+    # ── Statements ───────────────────────────────────────────────────────
+
+    def block(self, stmts):
+        out = []
+        for stmt in stmts:
+            out.extend(self.statement(stmt))
+        return out
+
+    def statement(self, stmt):
+        """The statements that replace `stmt` (possibly none)."""
+        for name in stmt._fields:
+            value = getattr(stmt, name)
+            if isinstance(value, list) and value and isinstance(value[0], nodes.Stmt):
+                setattr(stmt, name, self.block(value))
+        self._fold_fields(stmt)
+
+        if isinstance(stmt, nodes.If) and isinstance(stmt.condition, nodes.Literal):
+            if stmt.condition.value:
+                return stmt.body
+            return stmt.orelse or []
+        if isinstance(stmt, nodes.While) and isinstance(stmt.condition, nodes.Literal):
+            if not stmt.condition.value:
+                return []
+        if isinstance(stmt, nodes.Repeat) and isinstance(stmt.condition, nodes.Literal):
+            if stmt.condition.value:
+                # Repeter ... Jusqua Vrai runs its body exactly once
+                return stmt.body
+        return [stmt]
+
+    def _fold_fields(self, node):
+        # Fold the expressions held by a non-expression node
+        for name in node._fields:
+            value = getattr(node, name)
+            if isinstance(value, nodes.Node) and not isinstance(value, nodes.Stmt):
+                setattr(node, name, self.expr(value))
+            elif isinstance(value, list):
+                setattr(node, name, [self.expr(item) if isinstance(item, nodes.Node)
+                                     and not isinstance(item, nodes.Stmt) else item
+                                     for item in value])
+
+    # ── Expressions ──────────────────────────────────────────────────────
+
+    def expr(self, root):
+        """Fold `root` bottom-up; iterative, so 1000-term chains are fine."""
+        results = {}
+        # Nodes whose emitted Python groups differently from the tree:
+        # `not (a) == b` is `not (a == b)` and `a < b < c` is a chained
+        # comparison. They are not folded into literals.
+        opaque = set()
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if not ready:
+                if isinstance(node, nodes.BinOp) and node.op not in _BOOLEAN_OPS:
+                    for child in (node.left, node.right):
+                        if isinstance(child, nodes.Not) or (
+                                node.op in _COMPARISONS and isinstance(child, nodes.BinOp)
+                                and child.op in _COMPARISONS):
+                            opaque.add(id(child))
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children())
+                continue
+            for name in node._fields:
+                value = getattr(node, name)
+                if isinstance(value, nodes.Node):
+                    setattr(node, name, results[id(value)])
+                elif isinstance(value, list):
+                    setattr(node, name, [results[id(item)] if isinstance(item, nodes.Node) else item
+                                         for item in value])
+            folded = None if id(node) in opaque else self._fold(node)
+            results[id(node)] = node if folded is None else folded
+        return results[id(root)]
+
+    def _fold(self, node):
+        """The Literal `node` evaluates to, or None to keep it."""
+        if isinstance(node, nodes.Constant):
+            if node.name in self.assigned:
+                return None
+            return nodes.Literal(node.value.value, node.value.type, lineno=node.lineno)
+        if isinstance(node, nodes.Paren):
+            if isinstance(node.expr, nodes.Literal):
+                return node.expr
+            return None
+        if isinstance(node, nodes.Not):
+            if isinstance(node.operand, nodes.Literal):
+                return nodes.Literal(not node.operand.value, node.type, lineno=node.lineno)
+            return None
+        if isinstance(node, nodes.Neg):
+            if isinstance(node.operand, nodes.Literal) and _is_number(node.operand.value):
+                return _literal(-node.operand.value, node.type, node.lineno)
+            return None
+        if isinstance(node, nodes.BinOp):
+            return self._fold_binop(node)
+        # String helpers on literals are evaluated with the runtime's own code
+        if isinstance(node, nodes.Longueur):
+            if isinstance(node.operand, nodes.Literal):
+                return nodes.Literal(_algo_longueur(node.operand.value), node.type, lineno=node.lineno)
+            return None
+        if isinstance(node, nodes.Concat):
+            if isinstance(node.left, nodes.Literal) and isinstance(node.right, nodes.Literal):
+                return nodes.Literal(_algo_concat(node.left.value, node.right.value), node.type,
+                                     lineno=node.lineno)
+            return None
+        return None
+
+    def _fold_binop(self, node):
+        left, right = node.left, node.right
+        if not (isinstance(left, nodes.Literal) and isinstance(right, nodes.Literal)):
+            return None
+        a, b = left.value, right.value
+        if node.op not in _COMPARISONS and node.op not in _BOOLEAN_OPS:
+            # Only arithmetic on numbers: "ab" * 10**9 would be built here
+            if not (_is_number(a) and _is_number(b)):
+                return None
+        try:
+            value = _BINOPS[node.op](a, b)
+        except (ArithmeticError, TypeError, KeyError):
+            return None
+        if node.op in _BOOLEAN_OPS:
+            # `a and b` evaluates to one of its operands
+            return left if value is a else right
+        type_name = node.type if node.type != 'UNKNOWN' else left.type
+        return _literal(value, type_name, node.lineno)
+
+
+def optimize(program):
+    """Fold constants and remove dead branches of a nodes.Program in place."""
+    return Optimizer(program).program(program)
@@ -0,0 +1,608 @@
+"""Runtime support imported by every generated program.
+
+Generated code starts with
+
+    from compiler.runtime import install as _algo_install
+    _algo_record_sizes = {...}
+    _algo_vars_info = {...}
+    _algo_install(globals(), _algo_record_sizes, _algo_vars_info)
+
+install() binds the `_algo_*` helpers and a Pointer class into the
+program's globals. Stateless helpers are plain functions shared by every
+program; the heap, the input and output buffers and the Pointer class are
+created per program, so concurrent executions in one worker never share
+memory. The module is imported once per worker or sandbox process.
+
+Ecrire is buffered: the text is written out before a Lire that needs more
+input, when the buffer is full, and when the program ends or fails (the
+generated code calls _algo_flush() in a `finally`).
+"""
+import builtins
+import sys
+from collections import deque
+
+# Characters of Ecrire output held before they are written out
+OUTPUT_BUFFER_SIZE = 8192
+
+
+# ── Strings ──────────────────────────────────────────────────────────────────
+
+def _terminated_length(chars, start=0):
+    """Index of the first terminator (None, '\\0' or '#0') of a char list."""
+    for i in range(start, len(chars)):
+        char = chars[i]
+        if char is None or char == '\0' or char == '#0':
+            return i
+    return len(chars)
+
+
+class FixedString(list):
+    """A `s[N] : Chaine`: N character slots, the text ending at the first
+    terminator.
+
+    It is a list, so pointers into it (&s[i], p^ on a ^Caractere) and the
+    debugger see the slots as before; it also tracks the position of the
+    terminator, so Longueur(s) does not scan the string every time. The
+    position is kept up to date by single-slot writes and recomputed on
+    the next length() after any other mutation.
+    """
+
+    __slots__ = ('_length',)
+
+    def __init__(self, chars=()):
+        list.__init__(self, chars)
+        self._length = None
+
+    def length(self):
+        n = self._length
+        if n is None:
+            n = self._length = _terminated_length(self)
+        return n
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        n = self._length
+        if n is None:
+            return
+        if type(index) is not int:
+            self._length = None
+            return
+        if index < 0:
+            index += len(self)
+        if value is None or value == '\0' or value == '#0':
+            if index < n:
+                self._length = index
+        elif index == n:
+            # The terminator was overwritten: the text runs to the next one
+            self._length = _terminated_length(self, n + 1)
+
+    def assign(self, text):
+        """Store `text` (at most N - 1 characters), its terminator and
+        empty slots after it."""
+        n = len(text)
+        list.__setitem__(self, slice(0, n), text)
+        list.__setitem__(self, n, '#0')
+        list.__setitem__(self, slice(n + 1, None), [None] * (len(self) - n - 1))
+        self._length = n
+
+
+def _forget_length(method):
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._length = None
+        return result
+    return mutate
+
+
+for _name in ('__delitem__', '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop', 'remove',
+              'clear', 'sort', 'reverse'):
+    setattr(FixedString, _name, _forget_length(getattr(list, _name)))
+
+
+def _algo_fixed_string(size, fill='\0'):
+    return FixedString([fill] * size)
+
+
+def _algo_to_string(val):
+    if val is None: return 'NIL'
+    if isinstance(val, bool): return 'Vrai' if val else 'Faux'
+    if isinstance(val, list):
+        n = val.length() if isinstance(val, FixedString) else _terminated_length(val)
+        return ''.join(map(str, val[:n]))
+    return str(val)
+
+
+def _ecrire_text(args):
+    # Ecrire without auto-newline; interprets \n and \t
+    parts = []
+    for a in args:
+        s = _algo_to_string(a)
+        # Display #0 as the visible null sentinel
+        s = s.replace('#0', chr(0))
+        s = s.replace('\\n', '\n').replace('\\t', '\t')
+        parts.append(s)
+    return ' '.join(parts)
+
+
+def _algo_deref_to_list(target):
+    # Dereference a Pointer to get its backing list
+    if hasattr(target, 'base_var') and target.base_var is not None:
+        return target.base_var
+    if hasattr(target, 'get_target_container'):
+        try: return target.get_target_container()
+        except: pass
+    return target
+
+
+def _algo_assign_fixed_string(target_list, source_val):
+    target_list = _algo_deref_to_list(target_list)
+    if not isinstance(target_list, list):
+        raise TypeError('Variable Chaine non initialisee. Declarez avec s[N]: Chaine.')
+    limit = len(target_list)
+    s_val = ''
+    if hasattr(source_val, '_get_target_container'):
+        targ = source_val._get_target_container()
+        while hasattr(targ, '_get_target_container'): targ = targ._get_target_container()
+        if isinstance(targ, list):
+            s_val = _algo_to_string(targ[source_val.index:])
+        else:
+            s_val = _algo_to_string(source_val._get_string() if hasattr(source_val, '_get_string') else source_val._get())
+    else:
+        s_val = _algo_to_string(source_val)
+    if limit > 0:
+        s_val = s_val[:limit-1]
+        if isinstance(target_list, FixedString):
+            target_list.assign(s_val)
+        else:
+            n = len(s_val)
+            target_list[:n] = s_val
+            target_list[n] = '#0'
+            target_list[n+1:] = [None] * (limit - n - 1)
+    return target_list
+
+
+def _algo_longueur(val):
+    if isinstance(val, FixedString):
+        return val.length()
+    return len(_algo_to_string(val))
+
+
+def _algo_set_char(target_list, index, char_val):
+    # Set a character at 0-based index in a fixed string
+    target_list = _algo_deref_to_list(target_list)
+    if not isinstance(target_list, list):
+        raise TypeError(f'Cannot set char: not a list (got {type(target_list).__name__})')
+    idx = int(index)  # 0-based index
+    if 0 <= idx < len(target_list):
+        if char_val == '#0' or char_val is None:
+            target_list[idx] = '#0'
+        else:
+            target_list[idx] = str(char_val)[0]
+    return target_list
+
+
+def _algo_get_char(target_list, index):
+    # Get a character at 0-based index from a fixed string
+    target_list = _algo_deref_to_list(target_list)
+    if isinstance(target_list, list):
+        idx = int(index)  # 0-based index
+        if 0 <= idx < len(target_list):
+            c = target_list[idx]
+            return c if c is not None and c != '#0' else '#0'
+        return ''
+    s = str(target_list)
+    idx = int(index)
+    return s[idx] if 0 <= idx < len(s) else ''
+
+
+def _algo_concat(val1, val2):
+    s1 = _algo_to_string(val1)
+    s2 = _algo_to_string(val2)
+    # Stop at #0 null terminator in plain strings
+    s1 = s1.split('#0')[0] if '#0' in s1 else s1
+    s2 = s2.split('#0')[0] if '#0' in s2 else s2
+    return s1 + s2
+
+
+def _algo_make_string(s, max_size=256):
+    # Create a fresh char-list from a string (for ^^Caractere slot)
+    s = str(s) if not isinstance(s, str) else s
+    arr = FixedString([None] * max_size)
+    arr.assign(s[:max_size - 1])  # leave room for #0
+    return arr
+
+
+def _algo_taille(type_name, record_sizes=None):
+    t = type_name.lower()
+    if 'pointeur' in t or t.startswith('^'): return 1
+    if 'entier' in t: return 4
+    if 'reel' in t: return 8
+    if 'booleen' in t: return 1
+    if 'caractere' in t: return 1
+    if 'chaine' in t: return 1
+    # User-defined record type — uses precomputed sizes
+    if record_sizes and type_name in record_sizes: return record_sizes[type_name]
+    return 4
+
+
+def _parse_booleen(value):
+    s = str(value).lower()
+    if s in ['vrai', 'true', '1']: return True
+    if s in ['faux', 'false', '0']: return False
+    raise ValueError(f"Type mismatch: '{value}' n'est pas un Booleen valide.")
+
+
+def _parse_entier(value):
+    try: return int(value)
+    except:
+        raise ValueError(f"Type mismatch: '{value}' n'est pas un Entier valide.")
+
+
+def _parse_reel(value):
+    try: return float(value)
+    except:
+        raise ValueError(f"Type mismatch: '{value}' n'est pas un Reel valide.")
+
+
+# ── Pointers ─────────────────────────────────────────────────────────────────
+
+class Cell:
+    """Storage of a variable whose address is taken (&x).
+
+    Generated code reads and writes such a variable as `x.value`; a Pointer
+    to it keeps the cell, so a dereference is one attribute access instead
+    of a lookup of the name in locals()/globals().
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Cell({self.value!r})"
+
+
+class Pointer:
+    # Bound per program by install(): the program's globals (lookup of
+    # variables outside `namespace`) and its memory map (addresses)
+    _globals = {}
+    _vars_info = {}
+
+    # Programs create thousands of pointers: no per-instance __dict__.
+    # _heap_addr is the address of an Allouer'd block, None for a pointer
+    # to a variable and for NIL
+    __slots__ = ('var_name', 'namespace', 'index', 'base_var', 'alloc_name', 'cell', '_heap_addr')
+
+    def __init__(self, var_name=None, namespace=None, index=0, base_var=None, alloc_name=None, cell=None,
+                 heap_addr=None):
+        self.var_name = var_name
+        self.namespace = namespace if namespace is not None else _NO_NAMESPACE
+        self.index = index
+        self.base_var = base_var
+        self.alloc_name = alloc_name if alloc_name is not None else var_name
+        self.cell = cell
+        self._heap_addr = heap_addr
+
+    def _get_target_container(self):
+        # base_var takes priority — used for record-backed pointers from _algo_allouer_record
+        if self.base_var is not None:
+            return self.base_var
+        if self.cell is not None:
+            return self.cell.value
+        # Only after checking base_var do we apply the NIL check on var_name
+        if self.var_name is None:
+            raise ValueError("Cannot dereference NIL pointer")
+        if self.var_name in self.namespace:
+            return self.namespace[self.var_name]
+        elif self.var_name in self._globals:
+            return self._globals[self.var_name]
+        else:
+            raise NameError(f"Variable '{self.var_name}' not found")
+
+    def _get(self):
+        if self.cell is not None and self.base_var is None:
+            target = self.cell.value
+        else:
+            target = self._get_target_container()
+        if isinstance(target, list):
+            if not (0 <= self.index < len(target)):
+                raise IndexError(f"Segmentation fault: Access out of bounds at index {self.index}")
+            return target[self.index]
+        if self.index != 0:
+             raise IndexError("Segmentation fault: Pointer arithmetic on scalar variable out of bounds")
+        return target
+
+    def _get_at(self, offset):
+        # (self + offset)._get() without creating the intermediate Pointer
+        index = self.index + int(offset)
+        if self.cell is not None and self.base_var is None:
+            target = self.cell.value
+        else:
+            target = self._get_target_container()
+        if isinstance(target, list):
+            if not (0 <= index < len(target)):
+                raise IndexError(f"Segmentation fault: Access out of bounds at index {index}")
+            return target[index]
+        if index != 0:
+             raise IndexError("Segmentation fault: Pointer arithmetic on scalar variable out of bounds")
+        return target
+
+    def _get_string(self):
+        target = self._get_target_container()
+        if isinstance(target, list):
+            if not (0 <= self.index < len(target)): return ""
+            return _algo_to_string(target[self.index:])
+        return str(target)
+
+    def _set(self, value):
+        target = self._get_target_container()
+        if isinstance(target, list):
+            if not (0 <= self.index < len(target)):
+                raise IndexError(f"Segmentation fault: Write out of bounds at index {self.index}")
+            target[self.index] = value
+        else:
+            if self.index != 0:
+                 raise IndexError("Segmentation fault: Pointer arithmetic on scalar variable out of bounds")
+            if self.cell is not None:
+                self.cell.value = value
+            elif self.var_name in self.namespace:
+                self.namespace[self.var_name] = value
+            else:
+                self._globals[self.var_name] = value
+
+    def _set_at(self, offset, value):
+        # (self + offset)._set(value) without creating the intermediate Pointer
+        index = self.index + int(offset)
+        target = self._get_target_container()
+        if isinstance(target, list):
+            if not (0 <= index < len(target)):
+                raise IndexError(f"Segmentation fault: Write out of bounds at index {index}")
+            target[index] = value
+        else:
+            if index != 0:
+                 raise IndexError("Segmentation fault: Pointer arithmetic on scalar variable out of bounds")
+            if self.cell is not None:
+                self.cell.value = value
+            elif self.var_name in self.namespace:
+                self.namespace[self.var_name] = value
+            else:
+                self._globals[self.var_name] = value
+
+    def _assign(self, other):
+        # Mutates this pointer to point to what 'other' points to (used for Var parameters)
+        if isinstance(other, Pointer):
+            self.var_name = other.var_name
+            self.namespace = other.namespace
+            self.index = other.index
+            self.base_var = other.base_var
+            self.alloc_name = other.alloc_name
+            self.cell = other.cell
+            self._heap_addr = other._heap_addr
+        elif other is None:
+            self.var_name = None
+            self.namespace = _NO_NAMESPACE
+            self.index = 0
+            self.base_var = None
+            self.alloc_name = None
+            self.cell = None
+            self._heap_addr = None
+        else:
+             raise TypeError("Cannot assign non-pointer to pointer via _assign")
+
+    def _clone(self):
+        return type(self)(self.var_name, self.namespace, self.index, self.base_var,
+                          self.alloc_name, self.cell, self._heap_addr)
+
+    def __add__(self, offset):
+        return type(self)(self.var_name, self.namespace, self.index + int(offset), self.base_var,
+                          self.alloc_name, self.cell)
+
+    def __sub__(self, offset):
+        return type(self)(self.var_name, self.namespace, self.index - int(offset), self.base_var,
+                          self.alloc_name, self.cell)
+
+    def __eq__(self, other):
+        if other is None:
+            # If it has a heap address or base_var, it's not NIL
+            if self._heap_addr is not None or self.base_var is not None:
+                return False
+            return self.var_name is None
+        if isinstance(other, Pointer):
+            # Check for heap address equality if both have it
+            if self._heap_addr is not None and other._heap_addr is not None:
+                return self._heap_addr + self.index == other._heap_addr + other.index
+            return (self.var_name == other.var_name and
+                    self.index == other.index and
+                    id(self.base_var) == id(other.base_var) and
+                    self.cell is other.cell)
+        return False
+
+    def __str__(self):
+        if self._heap_addr is not None:
+            return f"@{self._heap_addr + self.index}"
+        if self.var_name is None:
+            return "NIL"
+        try:
+            lookup_name = self.alloc_name or self.var_name
+            if lookup_name in self._vars_info:
+                info = self._vars_info[lookup_name]
+                base = info['addr']
+                stride = info.get('element_size', 1)
+                addr = base + (self.index * stride)
+                return f"@{addr}"
+            else:
+                return f"@{lookup_name}+{self.index}"
+
+        except:
+            return "UNKNOWN"
+
+    def __repr__(self):
+        return str(self)
+
+    def __getitem__(self, i):
+        return self._get_at(i)
+
+    def __setitem__(self, i, value):
+        self._set_at(i, value)
+
+
+# Namespace of the pointers created without one; never written to, as
+# _set() only stores into a namespace that already holds the variable
+_NO_NAMESPACE = {}
+
+
+# ── Per-program state: input and heap ────────────────────────────────────────
+
+def _interactive_stdin():
+    try:
+        return sys.stdin is None or sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        return True
+
+
+class _Program:
+    """Input and output buffers and heap of one running program."""
+
+    def __init__(self, namespace, record_sizes, vars_info):
+        self.namespace = namespace
+        self.record_sizes = record_sizes
+        self.vars_info = vars_info
+        self.input_buffer = deque()
+        self.stdin_read = False
+        self.output = []
+        self.output_size = 0
+        self.heap = {}
+        self.heap_next_addr = 50000
+        self.Pointer = type('Pointer', (Pointer,), {'__slots__': (), '_globals': namespace, '_vars_info': vars_info})
+
+    def read(self):
+        """Next whitespace-separated token of the input, '' at its end."""
+        buffer = self.input_buffer
+        while not buffer:
+            if not self._fill():
+                return ''
+        return buffer.popleft()
+
+    def _fill(self):
+        # The program's own `input` (the web debugger supplies one) and a
+        # terminal are read one line at a time, as the user types; piped
+        # input (the sandbox's test cases) is read whole, at the first Lire
+        self.flush()   # the prompt is shown before waiting for the answer
+        read_line = self.namespace.get('input')
+        if read_line is None and not _interactive_stdin():
+            if self.stdin_read:
+                return False
+            self.stdin_read = True
+            self.input_buffer.extend(sys.stdin.read().split())
+            return True
+        try:
+            line = (read_line or builtins.input)()
+        except EOFError:
+            return False
+        if line is None:
+            return False
+        self.input_buffer.extend(str(line).split())
+        return True
+
+    def ecrire(self, *args):
+        text = _ecrire_text(args)
+        self.output.append(text)
+        self.output_size += len(text)
+        if self.output_size >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered Ecrire output."""
+        if self.output:
+            text = ''.join(self.output)
+            self.output.clear()
+            self.output_size = 0
+            print(text, end='')
+
+    def read_typed(self, current_val, input_val=None, target_type_name='CHAINE'):
+        if input_val is None: input_val = self.read()
+        t = target_type_name.upper()
+        if 'CHAINE' in t:
+            if isinstance(current_val, list):
+                _algo_assign_fixed_string(current_val, input_val)
+                return current_val
+            return str(input_val)
+        if 'BOOLEEN' in t or isinstance(current_val, bool):
+            return _parse_booleen(input_val)
+        elif 'ENTIER' in t or isinstance(current_val, int):
+            return _parse_entier(input_val)
+        elif 'REEL' in t or isinstance(current_val, float):
+            return _parse_reel(input_val)
+        return input_val
+
+    # Lire into a variable whose type is known at compile time
+    def read_entier(self):
+        return _parse_entier(self.read())
+
+    def read_reel(self):
+        return _parse_reel(self.read())
+
+    def read_booleen(self):
+        return _parse_booleen(self.read())
+
+    def allouer(self, size_in_bytes, element_size=1):
+        addr = self.heap_next_addr
+        self.heap_next_addr += size_in_bytes
+        num_elements = size_in_bytes // element_size if element_size > 0 else size_in_bytes
+        allocated_list = [None] * max(1, num_elements)
+        self.heap[addr] = allocated_list
+        self.vars_info[f'_heap_{addr}'] = {'addr': addr, 'size': size_in_bytes, 'element_size': element_size}
+        return self.Pointer(var_name=f'_heap_{addr}', namespace=self.heap, index=0, base_var=allocated_list,
+                            heap_addr=addr)
+
+    def allouer_record(self, record_dict):
+        # Wraps an initialised dict in a Pointer; index=0 and base_var=record_dict
+        # so Pointer._get() returns the dict directly
+        addr = self.heap_next_addr
+        self.heap_next_addr += 1
+        self.heap[addr] = record_dict
+        return self.Pointer(var_name=None, namespace=None, index=0, base_var=record_dict, heap_addr=addr)
+
+    def liberer(self, ptr):
+        if isinstance(ptr, Pointer) and ptr._heap_addr is not None:
+            addr = ptr._heap_addr
+            if addr in self.heap:
+                del self.heap[addr]
+                ptr.base_var = None
+                ptr.var_name = None
+
+    def taille(self, type_name):
+        return _algo_taille(type_name, self.record_sizes)
+
+
+def install(namespace, record_sizes, vars_info):
+    """Bind the runtime into a generated program's globals `namespace`."""
+    program = _Program(namespace, record_sizes, vars_info)
+    namespace.update({
+        '_algo_read': program.read,
+        '_algo_ecrire': program.ecrire,
+        '_algo_flush': program.flush,
+        '_algo_to_string': _algo_to_string,
+        '_algo_deref_to_list': _algo_deref_to_list,
+        '_algo_assign_fixed_string': _algo_assign_fixed_string,
+        '_algo_longueur': _algo_longueur,
+        '_algo_set_char': _algo_set_char,
+        '_algo_get_char': _algo_get_char,
+        '_algo_concat': _algo_concat,
+        '_algo_make_string': _algo_make_string,
+        '_algo_fixed_string': _algo_fixed_string,
+        '_algo_cell': Cell,
+        '_algo_read_typed': program.read_typed,
+        '_algo_read_entier': program.read_entier,
+        '_algo_read_reel': program.read_reel,
+        '_algo_read_booleen': program.read_booleen,
+        '_algo_allouer': program.allouer,
+        '_algo_allouer_record': program.allouer_record,
+        '_algo_liberer': program.liberer,
+        '_algo_taille': program.taille,
+        # The debugger reads the heap from the program's globals
+        '_algo_heap': program.heap,
+        'Pointer': program.Pointer,
+    })
+    return program
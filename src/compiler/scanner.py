@@ -0,0 +1,145 @@
+"""Fast scanner producing the same token stream as the PLY lexer.
+
+PLY's lexer (lexer.py) matches one token at a time and calls a Python
+rule function for each ID, NUMBER, string, newline and comment. Scanner
+uses the same rules, in the same priority order, combined into one
+master regex that skips the ignored characters in front of each token
+and ends with a one-character error fallback. It scans the whole input with a single finditer() pass
+and converts values inline.
+
+The rules are read from lexer.py, so both lexers always agree on the
+patterns; tests/test_scanner.py checks that the token streams match on
+the examples corpus. parse_algo() uses Scanner unless ALGO_LEXER=ply.
+"""
+import re
+from functools import partial
+
+from compiler import lexer as _rules
+
+# Rule functions whose conversion Scanner does inline (see _scan)
+_FUNCTION_RULES = ('t_MINUS', 't_ASSIGN', 't_CHAR_LITERAL', 't_STRING_LITERAL', 't_NUMBER',
+                   't_JUSQUA', 't_ID', 't_newline', 't_comment')
+
+# Equivalent patterns that backtrack less than the lexer.py ones
+_FASTER = {
+    'ID': r'[a-zA-Z_][a-zA-Z_0-9]*(?:-(?!>)[a-zA-Z_0-9]*)*',
+    'NUMBER': r'\d+(?:\.\d+)?',
+    'comment': r'//[^\n]*|\#(?!\d)[^\n]*',
+}
+
+# The most frequent rules are tried first. No other rule can match a
+# letter or a newline, so this does not change which rule wins.
+_FIRST = ('JUSQUA', 'ID', 'newline')
+
+
+def _master_pattern():
+    """PLY's rule order: functions in definition order, then strings by length."""
+    functions = sorted((value for name, value in vars(_rules).items()
+                        if name.startswith('t_') and callable(value) and name != 't_error'),
+                       key=lambda f: f.__code__.co_firstlineno)
+    missing = {f.__name__ for f in functions} ^ set(_FUNCTION_RULES)
+    if missing:
+        raise RuntimeError(f"scanner.py does not know the lexer rules {sorted(missing)}")
+    strings = [(name, value) for name, value in vars(_rules).items()
+               if name.startswith('t_') and isinstance(value, str) and name != 't_ignore']
+    strings.sort(key=lambda item: len(item[1]), reverse=True)
+
+    rules = [(f.__name__[2:], _FASTER.get(f.__name__[2:], f.__doc__)) for f in functions]
+    rules += [(name[2:], value) for name, value in strings]
+    rules.sort(key=lambda rule: _FIRST.index(rule[0]) if rule[0] in _FIRST else len(_FIRST))
+
+    # Ignored characters are skipped in front of every token. The error
+    # fallback never matches one of them, so trailing ignored characters
+    # produce no match instead of an error.
+    ignore = ''.join(re.escape(c) for c in _rules.t_ignore)
+    parts = [f"(?P<{name}>{pattern})" for name, pattern in rules]
+    parts.append(f"(?P<error>[^{ignore}])")
+    # PLY compiles its master regex in verbose mode
+    return re.compile(f"[{ignore}]*(?:{'|'.join(parts)})", re.VERBOSE)
+
+
+_MASTER = _master_pattern()
+
+
+class Token:
+    """Same attributes as ply.lex.LexToken."""
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __str__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __repr__ = __str__
+
+
+class Scanner:
+    """Drop-in replacement for the PLY lexer object used by the parser."""
+
+    def __init__(self):
+        self.errors = []
+        self.lineno = 1
+        self.lexpos = 0
+        self.lexdata = ''
+        self.token = partial(next, iter(()), None)
+
+    def clone(self):
+        scanner = Scanner()
+        scanner.errors = self.errors
+        scanner.lineno = self.lineno
+        return scanner
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        tokens = self._scan(data)
+        self.lexpos = len(data)
+        # token() is called once per token by the parser: next() with a
+        # default returns None at the end without a Python-level frame
+        self.token = partial(next, iter(tokens), None)
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def _scan(self, data):
+        reserved = _rules.reserved
+        tokens = []
+        append = tokens.append
+        lineno = self.lineno
+        for m in _MASTER.finditer(data):
+            kind = m.lastgroup
+            if kind == 'newline':
+                lineno += m.end() - m.start(kind)
+                continue
+            if kind == 'comment':
+                continue
+            value = m.group(kind)
+            pos = m.start(kind)
+            if kind == 'ID':
+                kind = reserved.get(value.lower(), 'ID')
+            elif kind == 'NUMBER':
+                value = float(value) if '.' in value else int(value)
+            elif kind == 'STRING_LITERAL':
+                value = value[1:-1].replace('\\n', '\n').replace('\\t', '\t')
+            elif kind == 'CHAR_LITERAL':
+                if value != '#0':
+                    value = value[1:-1]
+            elif kind == 'error':
+                self.errors.append({
+                    "line": lineno,
+                    "column": pos - data.rfind('\n', 0, pos),
+                    "message": f"Illegal character '{value}'",
+                    "type": "Lexical Error",
+                    "error_code": "E1.1"
+                })
+                continue
+            token = Token()
+            token.type = kind
+            token.value = value
+            token.lineno = lineno
+            token.lexpos = pos
+            append(token)
+        self.lineno = lineno
+        return tokens
+
+
+scanner = Scanner()
@@ -0,0 +1,44 @@
+"""Per-phase compile timing.
+
+A CompileStats passed to compile_algo() / compile_algo_code() (or to the
+incremental compiler) records how long each phase took and how big its
+output was, so a slow Run can be attributed to one of them:
+
+    lex        tokenising the source                  tokens
+    parse      LALR parse; the grammar actions do     nodes (typed AST)
+               the semantic checks as they reduce
+    optimize   constant folding, dead branches
+    codegen    generating the Python source           generated_bytes
+    compile    building the ast.Module and compile()
+
+Durations are milliseconds; a phase that did not run is absent.
+"""
+import time
+
+
+class CompileStats:
+    __slots__ = ('durations', 'sizes', '_mark')
+
+    def __init__(self):
+        self.durations = {}
+        self.sizes = {}
+        self._mark = time.perf_counter()
+
+    def start(self):
+        """Start timing the next phase now."""
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Add the time since the previous lap (or start()) to `phase`."""
+        now = time.perf_counter()
+        self.durations[phase] = self.durations.get(phase, 0.0) + (now - self._mark) * 1000
+        self._mark = now
+
+    def as_dict(self):
+        durations = {phase: round(ms, 3) for phase, ms in self.durations.items()}
+        return {'durations_ms': durations, 'total_ms': round(sum(self.durations.values()), 3),
+                'sizes': dict(self.sizes)}
+
+
+def count_nodes(program):
+    return sum(1 for _ in program.walk())
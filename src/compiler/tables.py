@@ -0,0 +1,79 @@
+"""Pregenerated PLY tables.
+
+`python -m compiler.tables` writes lextab.py and parsetab.py next to this
+file (run it once at build time, see Dockerfile / render.yaml). At import,
+lexer.py and parser.py load them in PLY's optimize mode instead of
+rebuilding the LALR tables. Each table records a hash of the sources it was
+built from; a stale or missing table falls back to an in-memory build, and
+nothing is ever written at runtime.
+"""
+import hashlib
+import importlib
+import os
+import sys
+
+_COMPILER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Table module -> compiler sources it is generated from
+TABLE_SOURCES = {
+    'lextab': ('lexer.py',),
+    'parsetab': ('lexer.py', 'parser.py'),
+}
+
+
+def source_hash(name):
+    h = hashlib.sha256()
+    for source in TABLE_SOURCES[name]:
+        with open(os.path.join(_COMPILER_DIR, source), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def load(name):
+    """Return the generated table module `name` if it matches the current sources, else None."""
+    try:
+        module = importlib.import_module('compiler.' + name)
+    except ImportError:
+        return None
+    if getattr(module, '_source_hash', None) != source_hash(name):
+        return None
+    return module
+
+
+def build():
+    """(Re)generate lextab.py and parsetab.py in the compiler package."""
+    import ply.lex as lex
+    import ply.yacc as yacc
+
+    for name in TABLE_SOURCES:
+        path = os.path.join(_COMPILER_DIR, name + '.py')
+        if os.path.exists(path):
+            os.remove(path)
+        sys.modules.pop('compiler.' + name, None)
+
+    # Importing the modules builds their tables in memory; PLY then writes
+    # them out from the same rule definitions.
+    from compiler import lexer as lexer_module
+    from compiler import parser as parser_module
+    lex.lex(module=lexer_module, optimize=1, lextab='compiler.lextab', outputdir=_COMPILER_DIR)
+    yacc.yacc(module=parser_module, tabmodule='compiler.parsetab', outputdir=_COMPILER_DIR,
+              debug=False, write_tables=True)
+
+    for name in TABLE_SOURCES:
+        with open(os.path.join(_COMPILER_DIR, name + '.py'), 'a', encoding='utf-8') as f:
+            f.write("_source_hash = %r\n" % source_hash(name))
+
+
+def measure_import():
+    """Import time of compiler.parser in a fresh interpreter, in milliseconds."""
+    import subprocess
+    probe = ("import time; t = time.perf_counter(); import compiler.parser; "
+             "print((time.perf_counter() - t) * 1000)")
+    out = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True,
+                         env=dict(os.environ, PYTHONPATH=os.path.dirname(_COMPILER_DIR)))
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    build()
+    print("PLY tables written to %s (compiler import: %.0f ms)" % (_COMPILER_DIR, measure_import()))
@@ -15,6 +15,8 @@ from sqlalchemy import case, func
 from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash
 
+from compiler.batch import chapter_sources, collect_sources, compile_batch
+from compiler.cache import compilation_cache
 from web.models import (
     Chapter, Choice, ChallengeSubmission, Problem,
     Question, QuizAttempt, TestCase, User, UserBadge, UserProgress, db
@@ -165,6 +167,48 @@ def stats_overview():
     })
 
 
+# ── Analytics: Compiler cache ─────────────────────────────────────────────────
+@admin_bp.route('/api/stats/compiler')
+@admin_required
+def stats_compiler():
+    return jsonify(compilation_cache.stats())
+
+
+# ── Batch compilation of the content library ──────────────────────────────────
+_WEB_DIR = os.path.dirname(os.path.abspath(__file__))
+_EXAMPLES_DIR = os.path.abspath(os.path.join(_WEB_DIR, '..', '..', 'examples'))
+_CHAPTERS_DIR = os.path.join(_WEB_DIR, 'static', 'course-chapters')
+
+
+def _library_sources():
+    """Examples, course chapter programs and problem templates."""
+    sources = [(os.path.relpath(name, _EXAMPLES_DIR), code) for name, code in collect_sources([_EXAMPLES_DIR])]
+    for name in sorted(os.listdir(_CHAPTERS_DIR)) if os.path.isdir(_CHAPTERS_DIR) else []:
+        if name.endswith('.json'):
+            sources.extend(chapter_sources(os.path.join(_CHAPTERS_DIR, name), name))
+    for p in Problem.query.order_by(Problem.id).all():
+        if (p.template_code or '').strip():
+            sources.append((f"problem:{p.id} {p.title}", p.template_code))
+    return sources
+
+
+@admin_bp.route('/api/compile/batch', methods=['POST'])
+@admin_required
+def compile_batch_sources():
+    """Compile the given sources, or the whole content library, over a process pool."""
+    payload = request.get_json(silent=True) or {}
+    items = payload.get('sources')
+    if items is None:
+        sources = _library_sources()
+    elif isinstance(items, list) and all(isinstance(i, dict) and isinstance(i.get('code'), str) for i in items):
+        sources = [(str(i.get('name', index)), i['code']) for index, i in enumerate(items)]
+    else:
+        return jsonify({'error': "'sources' doit etre une liste de {name, code}"}), 400
+    workers = payload.get('workers')
+    results, summary = compile_batch(sources, workers=int(workers) if workers else None)
+    return jsonify({'results': results, 'summary': summary})
+
+
 # ── Analytics: Activity ───────────────────────────────────────────────────────
 @admin_bp.route('/api/stats/activity')
 @admin_required
@@ -11,7 +11,7 @@ from flask import Flask, render_template, request, jsonify, Response
 from flask_login import current_user, login_required
 import io
 import contextlib
-from compiler.parser import parser, compile_algo
+from compiler.cache import compile_cached
 print(">>> [DEBUG] PARSER IMPORTED", flush=True)
 
 from web.debugger import TraceRunner
@@ -67,6 +67,9 @@ def update_last_seen():
 
 # Basic Config
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(16))
+# ALGO_DEBUG_TIMINGS=1 adds compile phase timings and run time to the
+# /start_execution and /api/submissions responses
+app.config['DEBUG_TIMINGS'] = os.environ.get('ALGO_DEBUG_TIMINGS', '0') == '1'
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 database_url = os.environ.get('DATABASE_URL')
 if database_url:
@@ -358,18 +361,10 @@ def validate_algo():
         if not code.strip():
             return jsonify({'ok': False, 'errors': [{'message': 'Code vide'}]}), 200
 
-        result = compile_algo(code)
-
-        # Modern parser returns (python_code, errors)
-        if isinstance(result, tuple):
-            python_code, errors = result
-            if errors:
-                return jsonify({'ok': False, 'errors': errors}), 200
-                
-            return jsonify({'ok': bool(python_code), 'errors': []}), 200
-
-        # Backward compatibility
-        return jsonify({'ok': bool(result), 'errors': [] if result else [{'message': 'Compilation failed'}]}), 200
+        # Front end only: the snippet is not run, so no code is generated
+        from compiler.parser import check_algo
+        ok, errors = check_algo(code)
+        return jsonify({'ok': ok, 'errors': errors}), 200
     except Exception as e:
         return jsonify({'ok': False, 'errors': [{'message': str(e)}]}), 200
 
@@ -584,6 +579,19 @@ def stop_execution_route():
 def doc_errors():
     return render_template('errors.html')
 
+def _respond(payload, compiled, lookup_ms, execution_ms=None):
+    """jsonify(payload), with the timings when DEBUG_TIMINGS is on.
+
+    `compile` holds the phases of the compilation that produced `compiled`
+    (see compiler/stats.py); `lookup_ms` is this request's compile_cached()
+    call, close to zero on a cache hit.
+    """
+    if app.config['DEBUG_TIMINGS']:
+        payload['timings'] = {'compile': compiled.stats, 'lookup_ms': round(lookup_ms, 3)}
+        if execution_ms is not None:
+            payload['timings']['execution_ms'] = round(execution_ms, 3)
+    return jsonify(payload)
+
 @app.route('/start_execution', methods=['POST'])
 def start_execution():
     global session
@@ -600,26 +608,20 @@ def start_execution():
 
     try:
         # Transpile to Python
-        # Use compile_algo to ensure indent_level is reset
-        result = compile_algo(code)
-        
-        # Handle tuple return (code, errors)
-        if isinstance(result, tuple):
-            python_code, errors = result
-            if errors:
-                # Return structured errors
-                return jsonify({'success': False, 'error': 'Compilation failed', 'details': errors})
-        else:
-             python_code = result # Fallback for backward compatibility if parser didn't update (shouldn't happen)
+        # Cached by source hash; each miss compiles in its own CompilationContext
+        started = time.perf_counter()
+        compiled = compile_cached(code)
+        lookup_ms = (time.perf_counter() - started) * 1000
+        python_code, errors = compiled.as_tuple()
+        if errors:
+            # Return structured errors
+            return _respond({'success': False, 'error': 'Compilation failed', 'details': errors},
+                            compiled, lookup_ms)
 
         if not python_code:
-            return jsonify({'success': False, 'error': 'Compilation failed (Syntax Error)'})
+            return _respond({'success': False, 'error': 'Compilation failed (Syntax Error)'}, compiled, lookup_ms)
 
-        print(f"\n--- DEBUG: GENERATED PYTHON CODE (LIVE EXECUTION) ---\n{python_code}\n-----------------------------------------------------\n")
-
-        # Save to file (optional, for debug)
-        with open('output.py', 'w', encoding='utf-8') as f:
-            f.write(python_code)
+        logging.debug("Generated Python code (live execution):\n%s", python_code)
 
         # Reset Session
         session.reset()
@@ -644,6 +646,7 @@ def start_execution():
 
         # Thread Target
         def run_script():
+            run_started = time.perf_counter()
             try:
                 # Mock Input
                 def mock_input(prompt=''):
@@ -721,98 +724,6 @@ def start_execution():
                             except:
                                 pass
 
-                    # Helper to convert Algo types (like char lists) to string for display
-                    def _algo_to_string(val):
-                        if isinstance(val, bool): return "Vrai" if val else "Faux"
-                        if isinstance(val, list):
-                            res = ""
-                            for char in val:
-                                if char is None or char == "\0": break
-                                res += str(char)
-                            return res
-                        return str(val)
-
-                    def _algo_longueur(val):
-                        """Calculate length of a string (stops at null terminator for fixed strings)"""
-                        if isinstance(val, list):
-                            return len(_algo_to_string(val))
-                        return len(str(val))
-                
-                    def _algo_concat(val1, val2):
-                        """Concatenate two strings, handling fixed-size string arrays"""
-                        # Convert both values to strings
-                        s1 = _algo_to_string(val1) if isinstance(val1, list) else str(val1)
-                        s2 = _algo_to_string(val2) if isinstance(val2, list) else str(val2)
-                        return s1 + s2
-                        
-                    def _algo_assign_fixed_string(target_list, source_val):
-                        # Update target_list in-place to match source_val (string or list)
-                        if not isinstance(target_list, list): return target_list
-                        limit = len(target_list)
-                        s_val = ''
-                        if hasattr(source_val, '_get_target_container'):
-                            targ = source_val._get_target_container()
-                            while hasattr(targ, '_get_target_container'): 
-                                targ = targ._get_target_container()
-                            if isinstance(targ, list):
-                                s_val = _algo_to_string(targ[source_val.index:])
-                            else:
-                                s_val = str(source_val._get_string() if hasattr(source_val, '_get_string') else source_val._get())
-                        elif isinstance(source_val, list):
-                             s_val = _algo_to_string(source_val)
-                        else:
-                             s_val = str(source_val)
-                        
-                        if limit > 0:
-                            s_val = s_val[:limit-1]
-                            for i in range(len(s_val)):
-                                target_list[i] = s_val[i]
-                            target_list[len(s_val)] = '\0'
-                            for i in range(len(s_val)+1, limit):
-                                target_list[i] = None
-                        return target_list
-
-                    # Mock input for LIRE if needed
-                    def _algo_read_typed(current_val, raw_val, target_type_name='CHAINE'):
-                        type_to_check = target_type_name.upper()
-                        if 'CHAINE' in type_to_check:
-                            if isinstance(current_val, list):
-                                 _algo_assign_fixed_string(current_val, raw_val)
-                                 return current_val
-                            return str(raw_val)
-                        if 'BOOLEEN' in type_to_check or isinstance(current_val, bool):
-                            val_str = str(raw_val).lower()
-                            if val_str in ['vrai', 'true', '1']: return True
-                            if val_str in ['faux', 'false', '0']: return False
-                            raise ValueError(f"Type mismatch: '{raw_val}' n'est pas un Booléen valide.")
-                        if 'ENTIER' in type_to_check or isinstance(current_val, int):
-                            try: return int(raw_val)
-                            except: raise ValueError(f"Type mismatch: '{raw_val}' n'est pas un Entier valide.")
-                        if 'REEL' in type_to_check or isinstance(current_val, float):
-                            try: return float(raw_val)
-                            except: raise ValueError(f"Type mismatch: '{raw_val}' n'est pas un Reel valide.")
-                        if isinstance(current_val, list): return raw_val 
-                        return str(raw_val)
-
-                    def _algo_set_char(target_list, index, char_val):
-                        if not isinstance(target_list, list): return target_list
-                        idx = int(index)
-                        if 0 <= idx < len(target_list):
-                            c = str(char_val)[0] if char_val else "\0"
-                            target_list[idx] = c
-                        return target_list
-
-                    def _algo_get_char(target_list, index):
-                        if isinstance(target_list, list):
-                            idx = int(index)
-                            if 0 <= idx < len(target_list):
-                                c = target_list[idx]
-                                return c if c is not None and c != "\0" else ""
-                            return ""
-                        s = str(target_list)
-                        idx = int(index)
-                        return s[idx] if 0 <= idx < len(s) else ""
-
                     # Prepare builtins
                     safe_builtins = {}
                     if isinstance(__builtins__, dict):
@@ -820,14 +731,10 @@ def start_execution():
                     else:
                         safe_builtins = __builtins__.__dict__.copy()
 
+                    # The program installs its helpers from compiler.runtime;
+                    # its reads go through `input`
                     exec_globals = {
-                        '_algo_to_string': _algo_to_string,
-                        '_algo_longueur': _algo_longueur,
-                        '_algo_concat': _algo_concat,
-                        '_algo_assign_fixed_string': _algo_assign_fixed_string,
-                        '_algo_set_char': _algo_set_char,
-                        '_algo_get_char': _algo_get_char,
-                            'input': mock_input, 
+                        'input': mock_input,
                         '__builtins__': safe_builtins
                     }
 
@@ -848,7 +755,7 @@ def start_execution():
                              pass
                     
                     # Run execution
-                    tracer.run(python_code, exec_globals, stdout_capture=stream, on_step=on_log_step)
+                    tracer.run(compiled.code_object or python_code, exec_globals, stdout_capture=stream, on_step=on_log_step)
 
 
             except SystemExit:
@@ -888,7 +795,10 @@ def start_execution():
                 # If we stopped manually, we might have already sent 'stopped'
                 # But to be safe, let's mark finished if we were running
                 if session.is_running:
-                     session.output_queue.put({'type': 'finished'})
+                     finished = {'type': 'finished'}
+                     if app.config['DEBUG_TIMINGS']:
+                         finished['timings'] = {'execution_ms': round((time.perf_counter() - run_started) * 1000, 3)}
+                     session.output_queue.put(finished)
                      session.is_running = False
 
         # Start Thread
@@ -897,7 +807,7 @@ def start_execution():
         t.start()
         session.current_thread = t
 
-        return jsonify({'success': True})
+        return _respond({'success': True}, compiled, lookup_ms)
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -1035,18 +945,15 @@ def submit_custom_code():
     custom_input = data.get('input', '')
     
     # 1. Compile Algo code to Python
-    result = compile_algo(code)
-    
-    # Handle tuple return (code, errors)
-    if isinstance(result, tuple):
-        python_code, errors = result
-        if errors:
-            return jsonify({'success': False, 'error': 'Compilation failed', 'details': errors})
-    else:
-        python_code = result
+    started = time.perf_counter()
+    compiled = compile_cached(code)
+    lookup_ms = (time.perf_counter() - started) * 1000
+    python_code, errors = compiled.as_tuple()
+    if errors:
+        return _respond({'success': False, 'error': 'Compilation failed', 'details': errors}, compiled, lookup_ms)
         
     if not python_code:
-        return jsonify({'success': False, 'error': 'Compilation failed (Syntax Error)'})
+        return _respond({'success': False, 'error': 'Compilation failed (Syntax Error)'}, compiled, lookup_ms)
         
         
     tc_data = [{
@@ -1056,13 +963,15 @@ def submit_custom_code():
     }]
     
     
-    results = execute_code(python_code, tc_data)
+    started = time.perf_counter()
+    results = execute_code(python_code, tc_data, code_object=compiled.code_object)
+    execution_ms = (time.perf_counter() - started) * 1000
     
-    return jsonify({
+    return _respond({
         'success': True,
         'all_passed': results[0]['passed'],
         'results': results
-    })
+    }, compiled, lookup_ms, execution_ms)
 
 @app.route('/api/submissions', methods=['POST'])
 def submit_code():
@@ -1077,19 +986,16 @@ def submit_code():
         return jsonify({'success': False, 'error': 'Problem not found'}), 404
     
     # 1. Compile Algo code to Python
-    result = compile_algo(code)
-    
-    # Handle tuple return (code, errors)
-    if isinstance(result, tuple):
-        python_code, errors = result
-        if errors:
-            # Return structured errors exactly as expected by frontend mapping
-            return jsonify({'success': False, 'error': 'Compilation failed', 'details': errors})
-    else:
-        python_code = result
+    started = time.perf_counter()
+    compiled = compile_cached(code)
+    lookup_ms = (time.perf_counter() - started) * 1000
+    python_code, errors = compiled.as_tuple()
+    if errors:
+        # Return structured errors exactly as expected by frontend mapping
+        return _respond({'success': False, 'error': 'Compilation failed', 'details': errors}, compiled, lookup_ms)
         
     if not python_code:
-        return jsonify({'success': False, 'error': 'Compilation failed (Syntax Error)'})
+        return _respond({'success': False, 'error': 'Compilation failed (Syntax Error)'}, compiled, lookup_ms)
     
     
     # 2. Select test cases
@@ -1106,7 +1012,9 @@ def submit_code():
     } for tc in test_cases]
     
     # 4. Execute in sandbox
-    raw_results = execute_code(python_code, tc_data)
+    started = time.perf_counter()
+    raw_results = execute_code(python_code, tc_data, code_object=compiled.code_object)
+    execution_ms = (time.perf_counter() - started) * 1000
     
     # Merge original tc_data with execution results
     results = []
@@ -1154,12 +1062,12 @@ def submit_code():
                 'xp_to_next': new_xp_to_next
             }
 
-    return jsonify({
+    return _respond({
         'success': True,
         'all_passed': all_passed,
         'results': results,
         **(level_up_info or {})
-    })
+    }, compiled, lookup_ms, execution_ms)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
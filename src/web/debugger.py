@@ -1,5 +1,9 @@
+import ast
 import sys
 import copy
+import types
+
+from compiler import astgen
 
 class TraceRunner:
     def __init__(self):
@@ -7,10 +11,33 @@ class TraceRunner:
         self.stdout_capture = None
         self.step_count = 0
         self.max_steps = 1000000  # Protect against infinite loops
+        # Frame of the generated _algo_main(), whose locals are the
+        # program's global variables (see compiler.codegen.main_locals)
+        self.main_frame = None
+        # Statement lines of the running program, by function name (see
+        # compiler.codegen.statement_lines); None until it has loaded them
+        self.line_table = None
+        # False when the table's Algo lines do not match the frames' lines
+        self.use_line_table = True
     
+    def statement_lines(self, frame):
+        """Lines of `frame`'s function that are Algo statements: None when the
+        program carries no line table (every line is a step), an empty set
+        for generated code that is never a step."""
+        if not self.use_line_table:
+            return None
+        if self.line_table is None:
+            table = frame.f_globals.get('_algo_line_table')
+            if table is None:
+                return None
+            self.line_table = {name: frozenset(lines) for name, lines in table.items()}
+        return self.line_table.get(frame.f_code.co_name, frozenset())
+
     def trace_calls(self, frame, event, arg):
         if event != 'call':
             return
+        if self.statement_lines(frame) == frozenset():
+            return  # e.g. a list comprehension of a declaration
         return self.trace_lines
 
     def trace_lines(self, frame, event, arg):
@@ -20,9 +47,19 @@ class TraceRunner:
             
         if event not in ['line', 'return']:
             return
+
+        lines = self.statement_lines(frame)
+        if lines is None and self.use_line_table and '_algo_line_table' in frame.f_code.co_names:
+            return self.trace_lines  # the prelude, before it defines the table
+        if lines is not None:
+            if not lines:
+                return  # the module body around _algo_main(): stop tracing it
+            if event == 'line' and frame.f_lineno not in lines:
+                return self.trace_lines
         
         # Skip internal helper functions (like _algo_read)
-        if frame.f_code.co_name.startswith('_'):
+        is_main = frame.f_code.co_name == '_algo_main'
+        if frame.f_code.co_name.startswith('_') and not is_main:
              return None
 
         # Filter out system/library frames
@@ -48,6 +85,7 @@ class TraceRunner:
             
             # Try to import Pointer class and address helper dynamically
             Pointer = None
+            Cell = None
             get_simulated_address = None
             try:
                 import sys
@@ -56,7 +94,7 @@ class TraceRunner:
                 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
                 if parent_dir not in sys.path:
                     sys.path.insert(0, parent_dir)
-                from compiler.parser import Pointer
+                from compiler.runtime import Cell, Pointer
             except ImportError:
                 pass  # Pointer class not available
             
@@ -68,14 +106,20 @@ class TraceRunner:
             mem_map = frame.f_globals.get('_algo_vars_info', {})
             
             func_name = frame.f_code.co_name
-            is_global = (func_name == '<module>')
+            is_global = (func_name == '<module>') or is_main
+            if is_main:
+                self.main_frame = frame
+            # Global variables: the module's, plus the locals of _algo_main()
+            global_vars = dict(frame.f_globals)
+            if self.main_frame is not None and self.main_frame is not frame:
+                global_vars.update(self.main_frame.f_locals)
             
             vars_to_process = []
             if is_global:
-                for k, v in frame.f_locals.items():
+                for k, v in {**global_vars, **frame.f_locals}.items():
                     vars_to_process.append((k, v, k, k))
             else:
-                for k, v in frame.f_globals.items():
+                for k, v in global_vars.items():
                     if k in mem_map and '.' not in k:
                         vars_to_process.append((k, v, k, k))
                 for k, v in frame.f_locals.items():
@@ -85,6 +129,8 @@ class TraceRunner:
                 if original_k.startswith('_'): continue # Hide internal vars like _raw_input, __builtins__
                 if original_k in ['builtins', '__builtins__', 'sys', 'Pointer']: continue
                 if callable(v): continue
+                if Cell is not None and isinstance(v, Cell):
+                    v = v.value  # a variable whose address is taken
                 
                 var_address = '-'
                 python_type = type(v).__name__
@@ -173,8 +219,10 @@ class TraceRunner:
             # Infer types for heap chunks by tracing pointers in globals and locals
             ptr_types = {}
             # 1. Start from named variables
-            all_vars = {**frame.f_globals, **frame.f_locals}
+            all_vars = {**global_vars, **frame.f_locals}
             for k, v in all_vars.items():
+                if Cell is not None and isinstance(v, Cell):
+                    v = v.value
                 if hasattr(v, '_heap_addr') and v._heap_addr:
                     if k in mem_map:
                         ptype = mem_map[k].get('type', '')
@@ -282,7 +330,10 @@ class TraceRunner:
                 }
 
 
-            # Capture Output so far
+            # Capture Output so far; the program buffers Ecrire, write it out first
+            flush = frame.f_globals.get('_algo_flush')
+            if flush is not None:
+                flush()
             output_so_far = ""
             if self.stdout_capture and hasattr(self.stdout_capture, 'getvalue'):
                  output_so_far = self.stdout_capture.getvalue()
@@ -309,13 +360,27 @@ class TraceRunner:
             
         return self.trace_lines
 
-    def run(self, code, exec_globals, stdout_capture=None, on_step=None):
+    def run(self, code, exec_globals, stdout_capture=None, on_step=None, line_map=None):
         self.steps = []
         self.step_count = 0
+        self.main_frame = None
+        self.line_table = None
+        self.use_line_table = True
         self.stdout_capture = stdout_capture
         self.on_step = on_step
-        # Compile code with filename <string> to match filter
-        compiled = compile(code, '<string>', 'exec')
+        # Compile code with filename <string> to match filter; callers holding
+        # a cached code object (compiled the same way) can pass it directly
+        if isinstance(code, types.CodeType):
+            compiled = code
+        elif line_map is not None:
+            # Generated source plus its CodeGenerator.line_map: move it to the
+            # Algo lines, like the code objects of compile_algo_code()
+            compiled = compile(astgen.relocate(ast.parse(code), line_map), '<string>', 'exec')
+        else:
+            # Plain source reports its own line numbers, not the Algo lines
+            # of its line table: every line is a step
+            compiled = compile(code, '<string>', 'exec')
+            self.use_line_table = False
         
         sys.settrace(self.trace_calls)
         try:
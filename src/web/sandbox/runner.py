@@ -3,8 +3,21 @@ import sys
 import tempfile
 import os
 import json
+import marshal
 import time
 
+# Runs a marshalled code object; skips re-parsing the generated source per test case
+_MARSHAL_LOADER = "import marshal,sys\nwith open(sys.argv[1],'rb') as f: c=marshal.load(f)\nsys.argv=sys.argv[1:]\nexec(c,{'__name__':'__main__'})"
+
+# Generated programs import compiler.runtime; make the src directory importable
+_SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+def _subprocess_env():
+    env = dict(os.environ)
+    paths = [_SRC_DIR] + [p for p in env.get('PYTHONPATH', '').split(os.pathsep) if p]
+    env['PYTHONPATH'] = os.pathsep.join(paths)
+    return env
+
 def _normalize_output(value):
     """Normalize outputs before comparison to avoid false negatives on whitespace."""
     text = '' if value is None else str(value)
@@ -12,18 +25,28 @@ def _normalize_output(value):
     lines = [line.rstrip() for line in text.split('\n')]
     return '\n'.join(lines).strip()
 
-def execute_code(python_code, test_cases):
+def execute_code(python_code, test_cases, code_object=None):
     """
     Executes the provided Python code against a list of test cases in a restricted subprocess.
     Requires python_code to read from stdin and write to stdout.
+    If code_object (the same program compiled by this interpreter) is given,
+    it is marshalled and run instead of the source.
     """
     results = []
     
     # Write the compiled python code to a temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as temp_script:
-        temp_script.write(python_code)
-        script_path = temp_script.name
+    if code_object is not None:
+        with tempfile.NamedTemporaryFile(mode='wb', suffix='.marshal', delete=False) as temp_script:
+            marshal.dump(code_object, temp_script)
+            script_path = temp_script.name
+        command = [sys.executable, '-c', _MARSHAL_LOADER, script_path]
+    else:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as temp_script:
+            temp_script.write(python_code)
+            script_path = temp_script.name
+        command = [sys.executable, script_path]
 
+    env = _subprocess_env()
     try:
         for tc in test_cases:
             tc_id = tc['id']
@@ -34,10 +57,11 @@ def execute_code(python_code, test_cases):
                 # Run the subprocess with a tight timeout
                 start_time = time.time()
                 process = subprocess.run(
-                    [sys.executable, script_path],
+                    command,
                     input=input_data,
                     text=True,
                     capture_output=True,
+                    env=env,
                     timeout=2.0 # 2 seconds max execution time per test
                 )
                 
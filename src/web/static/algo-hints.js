@@ -19,7 +19,8 @@
         "Ecrire", "Lire",
         "Retourner", "Fonction", "Procedure",
         "Tableau", "NIL",
-        "Type", "Enregistrement"  // Record support
+        "Type", "Enregistrement",  // Record support
+        "Utiliser", "Bibliotheque"  // Libraries
     ];
 
     var algoTypes = [
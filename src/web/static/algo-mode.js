@@ -21,7 +21,8 @@
             "fonction": true, "procedure": true, "tableau": true,
             "nil": true,          // Null pointer
             "type": true,         // Record type declaration keyword
-            "enregistrement": true  // Record body keyword
+            "enregistrement": true, // Record body keyword
+            "utiliser": true, "bibliotheque": true  // Libraries
         };
 
         // Built-in types (primitives)
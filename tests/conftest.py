@@ -0,0 +1,50 @@
+import contextlib
+import io
+
+import pytest
+
+from compiler.parser import compile_algo
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true', help="also run the timing-dependent tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: timing-dependent test, only run with --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-slow'):
+        return
+    skip = pytest.mark.skip(reason="timing-dependent: run with --run-slow")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
+
+
+# Helpers shared by the test modules: `from conftest import compile_ok, run`
+
+def compile_ok(code, optimize=True):
+    """Generated Python of a program that must compile without errors."""
+    python_code, errors = compile_algo(code, optimize=optimize)
+    assert not errors, errors
+    return python_code
+
+
+def run(code, stdin='', out=None):
+    """Output of running `code`, a code object or generated Python source.
+
+    Lire reads the lines of `stdin`, or calls `stdin` when it is a
+    function. Pass a StringIO as `out` to keep the output of a program
+    that raises.
+    """
+    if callable(stdin):
+        read = stdin
+    else:
+        lines = iter(stdin.splitlines())
+        read = lambda prompt='': next(lines)
+    out = io.StringIO() if out is None else out
+    with contextlib.redirect_stdout(out):
+        exec(code, {'input': read})
+    return out.getvalue()
@@ -0,0 +1,31 @@
+from compiler import nodes
+from compiler.parser import parse_algo, compile_algo
+
+SRC = """Algorithme T;
+Var
+    x : Entier;
+Debut
+    x <- 1 + 2 * 3;
+    Si x > 2 Alors
+        Ecrire(x);
+    Fsi
+Fin.
+"""
+
+def test_parse_builds_typed_ast():
+    program, errors = parse_algo(SRC)
+    assert errors == []
+    assert isinstance(program, nodes.Program)
+    assert program.name == 'T'
+    assign, cond = program.body
+    assert isinstance(assign, nodes.Assign) and assign.var_type == 'Entier'
+    assert isinstance(assign.value, nodes.BinOp) and assign.value.type == 'ENTIER'
+    assert isinstance(cond, nodes.If) and cond.condition.type == 'BOOLEEN'
+    assert cond.lineno == 6
+
+def test_long_expression_chain_compiles(capsys):
+    chain = " + ".join(["1"] * 1000)
+    code, errors = compile_algo(f"Algorithme T;\nVar\n    x : Entier;\nDebut\n    x <- {chain};\n    Ecrire(x);\nFin.\n")
+    assert errors == []
+    exec(code, {})
+    assert capsys.readouterr().out == '1000'
@@ -0,0 +1,47 @@
+import json
+import os
+
+import pytest
+
+from compiler.batch import collect_sources, compile_batch, is_complete_program
+from web.app import app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GOOD = "Algorithme A;\nDebut\n    Ecrire(1);\nFin.\n"
+BAD = "Algorithme B;\nDebut\n    Ecrire(1)\nFin.\n"
+
+@pytest.fixture
+def admin_client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        with client.session_transaction() as session:
+            session['admin_logged_in'] = True
+        yield client
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_results_keep_input_order(workers):
+    results, summary = compile_batch([('a', GOOD), ('b', BAD), ('c', GOOD)], workers=workers)
+    assert [r['name'] for r in results] == ['a', 'b', 'c']
+    assert [r['ok'] for r in results] == [True, False, True]
+    assert results[1]['errors'] and results[0]['errors'] == []
+    assert all(r['seconds'] >= 0 for r in results)
+    assert (summary['total'], summary['passed'], summary['failed']) == (3, 2, 1)
+
+def test_collects_examples_and_chapter_programs():
+    sources = dict(collect_sources([os.path.join(ROOT, 'examples'),
+                                    os.path.join(ROOT, 'src', 'web', 'static', 'course-chapters')]))
+    assert any(name.endswith('.algo') for name in sources)
+    chapter_items = [name for name in sources if '#sections[' in name]
+    assert chapter_items
+    assert all(is_complete_program(sources[name]) for name in chapter_items)
+
+def test_batch_endpoint(admin_client):
+    response = admin_client.post('/admin/api/compile/batch',
+                                 json={'sources': [{'name': 'a', 'code': GOOD}, {'name': 'b', 'code': BAD}],
+                                       'workers': 1})
+    data = json.loads(response.data)
+    assert [r['ok'] for r in data['results']] == [True, False]
+    assert data['summary']['failed'] == 1
+    response = admin_client.post('/admin/api/compile/batch', json={'sources': 'nope'})
+    assert response.status_code == 400
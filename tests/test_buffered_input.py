@@ -0,0 +1,56 @@
+import contextlib
+import io
+import sys
+
+from compiler import runtime
+from compiler.parser import compile_algo_code
+from web.sandbox.runner import execute_code
+
+SOMME = """Algorithme Somme;
+Var
+    n, i, x, s : Entier;
+Debut
+    Lire(n);
+    s := 0;
+    Pour i := 1 a n Faire
+        Lire(x);
+        s := s + x;
+    FinPour
+    Ecrire(s);
+Fin.
+"""
+
+def test_piped_input_is_read_whole(monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO("3 10\n20\n\n30 extra\n"))
+    program = runtime.install({}, {}, {})
+    assert [program.read() for _ in range(5)] == ['3', '10', '20', '30', 'extra']
+    assert program.read() == '' and program.read() == ''
+
+def test_program_input_is_read_line_by_line(monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO("ignored"))
+    lines = iter(["1 2", "", "3"])
+    calls = []
+
+    def mock_input(prompt=''):
+        calls.append(prompt)
+        return next(lines)
+    program = runtime.install({'input': mock_input}, {}, {})
+    assert program.read() == '1' and len(calls) == 1
+    assert program.read() == '2' and len(calls) == 1
+    assert program.read() == '3' and len(calls) == 3
+
+def test_large_input_in_the_sandbox():
+    python_code, code_object, errors = compile_algo_code(SOMME)
+    assert not errors
+    n = 20000
+    data = f"{n}\n" + "\n".join(" ".join(str(i + j) for j in range(10)) for i in range(0, n, 10))
+    expected = str(sum(range(n)))
+    [result] = execute_code(python_code, [{'id': 1, 'input': data, 'expected_output': expected}], code_object)
+    assert result['passed'], result
+
+def test_exec_with_piped_stdin(monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO("2 5 7"))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        exec(compile_algo_code(SOMME)[1], {})
+    assert out.getvalue().strip() == "12"
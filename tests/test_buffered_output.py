@@ -0,0 +1,67 @@
+import contextlib
+import io
+import sys
+
+import pytest
+
+from compiler import runtime
+from compiler.parser import compile_algo_code
+from conftest import run
+from web.debugger import TraceRunner
+
+SRC = """Algorithme Sortie;
+Var
+    x, i : Entier;
+Debut
+    Ecrire("Entrez x : ");
+    Lire(x);
+    Pour i := 1 a 3 Faire
+        Ecrire(i, "\\n");
+    FinPour
+    Ecrire(10 div (x - 2));
+Fin.
+"""
+
+def test_writes_are_buffered_until_flush():
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        program = runtime.install({}, {}, {})
+        program.ecrire("a", 1)
+        program.ecrire("\\n")
+        assert out.getvalue() == ""
+        program.flush()
+    assert out.getvalue() == "a 1\n"
+
+def test_full_buffer_is_written_out(monkeypatch):
+    monkeypatch.setattr(runtime, 'OUTPUT_BUFFER_SIZE', 10)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        program = runtime.install({}, {}, {})
+        program.ecrire("12345")
+        assert out.getvalue() == ""
+        program.ecrire("67890")
+    assert out.getvalue() == "1234567890"
+
+def test_flushed_before_lire_and_at_the_end():
+    seen = []
+
+    def read(prompt=''):
+        seen.append(sys.stdout.getvalue())
+        return "7"
+    assert run(compile_algo_code(SRC)[1], read) == "Entrez x : 1 \n2 \n3 \n2"
+    assert seen == ["Entrez x : "]
+
+def test_flushed_when_the_program_fails():
+    out = io.StringIO()
+    with pytest.raises(ZeroDivisionError):
+        run(compile_algo_code(SRC)[1], "2", out)
+    assert out.getvalue() == "Entrez x : 1 \n2 \n3 \n"
+
+def test_debugger_steps_see_the_output():
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        steps = TraceRunner().run(compile_algo_code(SRC)[1], {'input': lambda prompt='': "7"},
+                                  stdout_capture=out)
+    # The step after each Ecrire(i) shows its line
+    outputs = [s['output'] for s in steps if s['event'] == 'line' and s['line'] == 8]
+    assert outputs == ["Entrez x : ", "Entrez x : 1 \n", "Entrez x : 1 \n2 \n"]
@@ -0,0 +1,41 @@
+import glob
+import json
+import os
+
+import pytest
+
+from compiler.parser import check_algo, compile_algo
+from web.app import app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, 'examples', '**', '*.algo'), recursive=True))
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.mark.parametrize('path', EXAMPLES, ids=lambda p: os.path.relpath(p, ROOT))
+def test_check_reports_what_compile_reports(path):
+    with open(path, encoding='utf-8') as f:
+        code = f.read()
+    python_code, errors = compile_algo(code)
+    assert check_algo(code) == (bool(python_code) and not errors, errors)
+
+def test_semantic_errors_are_reported():
+    code = ("Type P = Enregistrement\nDebut\n    x : Entier;\nFin;\n"
+            "Algorithme T;\nVar a : P;\nDebut\n    Ecrire(a.z);\n    Retourner 1;\nFin.\n")
+    ok, errors = check_algo(code)
+    assert not ok
+    messages = " ".join(e['message'] for e in errors)
+    assert "Champ inconnu" in messages
+
+def test_validate_endpoint_uses_check_mode(client, monkeypatch):
+    import compiler.cache
+    monkeypatch.setattr(compiler.cache, '_build', lambda *a, **k: pytest.fail("validate compiled the snippet"))
+    response = client.post('/api/validate_algo', json={'code': "Algorithme T;\nDebut\n    Ecrire(1);\nFin.\n"})
+    assert json.loads(response.data) == {'ok': True, 'errors': []}
+    response = client.post('/api/validate_algo', json={'code': "Algorithme T;\nDebut\n    Ecrire(1)\nFin.\n"})
+    data = json.loads(response.data)
+    assert data['ok'] is False and data['errors']
@@ -0,0 +1,62 @@
+import io
+import contextlib
+from compiler.cache import CompilationCache
+from compiler.parser import compile_algo
+
+PROG = """
+Algorithme Cache;
+Var x : Entier;
+Debut
+    x <- 6 * 7;
+    Ecrire(x);
+Fin.
+"""
+
+def test_repeat_compile_hits_memory():
+    cache = CompilationCache(maxsize=4)
+    first = cache.get(PROG)
+    second = cache.get(PROG)
+    assert first is second
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert first.as_tuple() == compile_algo(PROG)
+
+def test_code_object_runs():
+    entry = CompilationCache().get(PROG)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        exec(entry.code_object, {})
+    assert out.getvalue() == "42"
+
+def test_lru_eviction():
+    cache = CompilationCache(maxsize=2)
+    progs = [PROG.replace("6 * 7", f"{i} * 7") for i in range(3)]
+    for src in progs:
+        cache.get(src)
+    cache.get(progs[0])
+    assert cache.stats()['size'] == 2
+    assert cache.stats()['misses'] == 4
+
+def test_errors_are_cached():
+    cache = CompilationCache()
+    bad = "Algorithme X; Debut x <- ; Fin."
+    cache.get(bad)
+    entry = cache.get(bad)
+    assert entry.errors
+    assert entry.code_object is None
+    assert cache.stats()['hits'] == 1
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    CompilationCache(disk_dir=str(tmp_path)).get(PROG)
+    fresh = CompilationCache(disk_dir=str(tmp_path))
+    entry = fresh.get(PROG)
+    assert fresh.stats()['disk_hits'] == 1
+    assert fresh.stats()['misses'] == 0
+    assert entry.code_object is not None
+
+def test_sandbox_runs_cached_code_object():
+    from web.sandbox.runner import execute_code
+    compiled = CompilationCache(maxsize=4).get(PROG)
+    results = execute_code(compiled.python_code, [{'id': 1, 'input': '', 'expected_output': '42'}],
+                           code_object=compiled.code_object)
+    assert results[0]['passed'], results[0]
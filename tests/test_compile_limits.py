@@ -0,0 +1,103 @@
+import pytest
+
+from compiler.incremental import IncrementalCompiler
+from compiler.limits import CompileLimits, expression_depth, limits, nesting_depth
+from compiler.parser import check_algo, compile_algo, compile_algo_code, parse_algo
+
+PROGRAM = """Algorithme Limites;
+Var i, s : Entier;
+Debut
+    s <- 0;
+    Pour i <- 1 a 10 Faire
+        Si i mod 2 = 0 Alors
+            s <- s + i;
+        FinSi
+    FinPour
+    Ecrire(s);
+Fin.
+"""
+
+def nested_program(depth):
+    return ("Algorithme Profond;\nVar b : Entier;\nDebut\nb <- 1;\n"
+            + "Si b > 0 Alors\n" * depth + "b <- 2;\n" + "FinSi\n" * depth + "Fin.\n")
+
+def codes(errors):
+    return [e.get('error_code') for e in errors]
+
+def test_defaults_accept_normal_programs():
+    python_code, errors = compile_algo(PROGRAM)
+    assert python_code and not errors
+
+def test_source_size(monkeypatch):
+    monkeypatch.setattr(limits, 'max_source_bytes', 100)
+    python_code, code_object, errors = compile_algo_code(PROGRAM)
+    assert python_code is None and code_object is None
+    assert codes(errors) == ['E6.1']
+    assert check_algo(PROGRAM) == (False, errors)
+
+def test_token_count(monkeypatch):
+    monkeypatch.setattr(limits, 'max_tokens', 20)
+    assert codes(compile_algo(PROGRAM)[1]) == ['E6.2']
+
+def test_nesting_depth(monkeypatch):
+    program, errors = parse_algo(nested_program(7))
+    assert not errors and nesting_depth(program) == 7
+    assert nesting_depth(parse_algo(PROGRAM)[0]) == 2
+
+    monkeypatch.setattr(limits, 'max_nesting', 6)
+    assert codes(compile_algo(nested_program(7))[1]) == ['E6.3']
+    assert not compile_algo(nested_program(6))[1]
+
+def test_deep_nesting_is_an_error_not_a_crash():
+    python_code, errors = compile_algo(nested_program(limits.max_nesting + 1))
+    assert python_code is None
+    assert codes(errors) == ['E6.3']
+
+def deep_expression(depth):
+    return ("Algorithme Expression;\nVar x : Entier; b : Booleen;\nDebut\nx <- 1;\n"
+            f"x <- {'(x + ' * depth}x{')' * depth};\nx <- {'-' * depth}x;\nb <- {'non ' * depth}(x > 0);\nFin.\n")
+
+def test_expression_depth(monkeypatch):
+    program, errors = parse_algo(deep_expression(5))
+    # 5 non, the parenthesised x > 0, then its operand x
+    assert not errors and expression_depth(program) == 7
+    long_sum = "Algorithme Somme;\nVar x : Entier;\nDebut\nx <- " + " + ".join(["x"] * 500) + ";\nFin.\n"
+    assert expression_depth(parse_algo(long_sum)[0]) == 2
+    parens = "Algorithme Parentheses;\nVar x : Entier;\nDebut\nx <- " + "(" * 5000 + "x" + ")" * 5000 + ";\nFin.\n"
+    assert expression_depth(parse_algo(parens)[0]) == 1
+    assert not compile_algo(parens, optimize=False)[1]
+
+    monkeypatch.setattr(limits, 'max_expression_depth', 7)
+    assert codes(compile_algo(deep_expression(6))[1]) == ['E6.6']
+    assert not compile_algo(deep_expression(5))[1]
+
+@pytest.mark.parametrize('optimize', [True, False])
+def test_deep_expression_is_an_error_not_a_crash(optimize):
+    code = deep_expression(500)
+    python_code, code_object, errors = compile_algo_code(code, optimize=optimize)
+    assert code_object is None and codes(errors) == ['E6.6']
+    assert check_algo(code) == (False, errors)
+
+def test_generated_size(monkeypatch):
+    monkeypatch.setattr(limits, 'max_generated_bytes', 200)
+    assert codes(compile_algo(PROGRAM)[1]) == ['E6.4']
+    assert codes(IncrementalCompiler().compile(PROGRAM)[2]) == ['E6.4']
+
+def test_deadline(monkeypatch):
+    monkeypatch.setattr(limits, 'timeout', 1e-9)
+    assert codes(compile_algo(PROGRAM)[1]) == ['E6.5']
+    assert codes(IncrementalCompiler().compile(PROGRAM)[2]) == ['E6.5']
+
+def test_zero_disables_a_limit(monkeypatch):
+    for name in CompileLimits.__slots__:
+        monkeypatch.setattr(limits, name, 0)
+    python_code, errors = compile_algo(nested_program(limits.max_nesting + 50))
+    assert python_code and not errors
+
+def test_limits_from_env(monkeypatch):
+    monkeypatch.setenv('ALGO_MAX_TOKENS', '123')
+    monkeypatch.setenv('ALGO_COMPILE_TIMEOUT', '0.5')
+    configured = CompileLimits.from_env()
+    assert configured.max_tokens == 123
+    assert configured.timeout == 0.5
+    assert configured.max_nesting == CompileLimits().max_nesting
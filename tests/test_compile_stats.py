@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from compiler.cache import CompilationCache
+from compiler.incremental import IncrementalCompiler
+from compiler.parser import compile_algo_code
+from compiler.stats import CompileStats
+from web.app import app
+
+SRC = """Fonction double(a : Entier) : Entier;
+Debut
+    Retourner a * 2;
+Fin;
+
+Algorithme Mesures;
+Var x : Entier;
+Debut
+    x <- double(3 + 4);
+    Ecrire(x);
+Fin.
+"""
+
+PHASES = {'lex', 'parse', 'optimize', 'codegen', 'compile'}
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_laps_accumulate():
+    stats = CompileStats()
+    stats.lap('parse')
+    stats.lap('parse')
+    stats.sizes['nodes'] = 3
+    result = stats.as_dict()
+    assert set(result['durations_ms']) == {'parse'}
+    assert result['total_ms'] == pytest.approx(result['durations_ms']['parse'], abs=0.01)
+    assert result['sizes'] == {'nodes': 3}
+
+def test_compile_records_every_phase():
+    stats = CompileStats()
+    python_code, code_object, errors = compile_algo_code(SRC, stats=stats)
+    assert not errors
+    result = stats.as_dict()
+    assert set(result['durations_ms']) == PHASES
+    assert all(ms >= 0 for ms in result['durations_ms'].values())
+    assert result['sizes']['tokens'] > 20
+    assert result['sizes']['nodes'] > 10
+    assert result['sizes']['generated_bytes'] == len(python_code.encode('utf-8'))
+
+def test_syntax_error_stops_after_parse():
+    stats = CompileStats()
+    compile_algo_code("Algorithme Faux;\nDebut\n    x <- ;\nFin.\n", stats=stats)
+    assert not {'codegen', 'compile'} & set(stats.durations)
+
+def test_incremental_counts_reused_subprograms():
+    compiler = IncrementalCompiler()
+    compiler.compile(SRC)
+    stats = CompileStats()
+    compiler.compile(SRC.replace("3 + 4", "5"), stats=stats)
+    assert stats.sizes['reused_subprograms'] == 1
+    assert set(stats.durations) == PHASES
+
+def test_cache_keeps_stats_of_the_miss(tmp_path):
+    cache = CompilationCache(disk_dir=str(tmp_path))
+    entry = cache.get(SRC)
+    assert set(entry.stats['durations_ms']) == PHASES
+    assert cache.get(SRC).stats is entry.stats
+    assert CompilationCache(disk_dir=str(tmp_path)).get(SRC).stats == entry.stats
+
+def test_timings_only_with_debug_flag(client, monkeypatch):
+    problem = {'code': SRC, 'input': ''}
+    response = json.loads(client.post('/api/submissions/custom', json=problem).data)
+    assert response['success'] and 'timings' not in response
+    assert response['results'][0]['actual_output'].strip() == '14'
+
+    monkeypatch.setitem(app.config, 'DEBUG_TIMINGS', True)
+    response = json.loads(client.post('/api/submissions/custom', json=problem).data)
+    timings = response['timings']
+    assert set(timings['compile']['durations_ms']) == PHASES
+    assert timings['lookup_ms'] >= 0 and timings['execution_ms'] > 0
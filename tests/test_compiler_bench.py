@@ -0,0 +1,66 @@
+import copy
+import json
+import os
+
+import pytest
+
+from compiler import bench
+from compiler.parser import compile_algo_code
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'tests', 'fixtures', 'compile_bench.json')
+
+@pytest.mark.parametrize('name', list(bench.DIMENSIONS))
+def test_generated_programs_compile(name):
+    generator, sizes = bench.DIMENSIONS[name]
+    for size in (sizes[0], sizes[-1]):
+        python_code, code_object, errors = compile_algo_code(generator(size))
+        assert not errors and code_object is not None
+
+@pytest.mark.slow
+def test_compile_time_grows_linearly():
+    # A quadratic phase shows up as an exponent close to 2
+    for name in ('statements', 'subprograms'):
+        sizes = bench.DIMENSIONS[name][1]
+        result = bench.run_dimension(name, sizes=(sizes[0], sizes[2]), repeat=2)
+        assert result['exponent'] < 1.6, (name, result)
+
+def test_growth_exponent():
+    points = [{'size': n, 'seconds': 0.001 * n * n} for n in (10, 20, 40)]
+    assert bench.growth_exponent(points) == pytest.approx(2.0)
+
+def test_baseline_file_is_valid():
+    with open(BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    assert set(baseline['dimensions']) == set(bench.DIMENSIONS)
+    assert bench.compare(baseline, baseline) == []
+
+def test_compare_reports_regressions():
+    with open(BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    current = copy.deepcopy(baseline)
+    points = current['dimensions']['statements']['points']
+    points[-1]['per_second'] *= 0.5
+    current['dimensions']['records']['points'][-1]['peak_kib'] *= 2
+    current['dimensions']['nesting']['exponent'] = 2.0
+    problems = bench.compare(baseline, current)
+    assert len(problems) == 3
+    assert [p.split(':')[0] for p in problems] == ['statements', 'nesting', 'records']
+
+    # A machine twice as slow halves the expected throughput
+    current = copy.deepcopy(baseline)
+    current['calibration'] *= 2
+    for result in current['dimensions'].values():
+        for point in result['points']:
+            point['per_second'] /= 2
+    assert bench.compare(baseline, current) == []
+
+def test_cli_check(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    assert bench.main(['nesting', '--repeat', '1', '--save', str(baseline)]) == 0
+    # One timed run per size is noisy: loosen the saved exponent too
+    saved = json.loads(baseline.read_text(encoding='utf-8'))
+    saved['dimensions']['nesting']['exponent'] += 10
+    baseline.write_text(json.dumps(saved), encoding='utf-8')
+    assert bench.main(['nesting', '--repeat', '1', '--check', str(baseline), '--threshold', '10']) == 0
+    assert 'nesting' in capsys.readouterr().out
@@ -0,0 +1,15 @@
+import os
+import compiler
+from compiler import tables
+from compiler.parser import compile_algo
+
+COMPILER_DIR = os.path.dirname(compiler.__file__)
+
+def test_import_and_compile_write_no_debug_files():
+    compile_algo("Algorithme T;\nDebut\n    Ecrire(1);\nFin.\n")
+    assert not os.path.exists(os.path.join(COMPILER_DIR, 'parser.out'))
+
+def test_stale_tables_are_ignored(monkeypatch):
+    monkeypatch.setattr(tables, 'source_hash', lambda name: 'stale')
+    assert tables.load('lextab') is None
+    assert tables.load('parsetab') is None
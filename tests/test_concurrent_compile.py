@@ -0,0 +1,68 @@
+import threading
+from compiler.parser import compile_algo
+
+GOOD = """
+Type Point = Enregistrement
+    x : Entier;
+    y : Entier;
+Fin;
+Algorithme Bon;
+Var p : Point;
+    i : Entier;
+Debut
+    Pour i <- 1 a 10 Faire
+        p.x <- p.x + i;
+    FinPour
+    Ecrire(p.x);
+Fin.
+"""
+
+BAD = """
+Algorithme Mauvais;
+Var x : Entier;
+Debut
+    x <- "texte";
+    Ecrire(x) $
+Fin.
+"""
+
+def test_threads_do_not_share_state():
+    expected_good = compile_algo(GOOD)
+    expected_bad = compile_algo(BAD)
+    assert not expected_good[1]
+    assert expected_bad[1]
+
+    results = []
+    lock = threading.Lock()
+
+    def worker(src, expected):
+        for _ in range(15):
+            out = compile_algo(src)
+            with lock:
+                results.append(out == expected)
+
+    threads = []
+    for i in range(8):
+        src, expected = (GOOD, expected_good) if i % 2 == 0 else (BAD, expected_bad)
+        threads.append(threading.Thread(target=worker, args=(src, expected)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 8 * 15
+    assert all(results)
+
+def test_record_types_do_not_leak_between_compilations():
+    compile_algo(GOOD)
+    code = """
+    Algorithme SansType;
+    Var p : Point;
+    Debut
+        Ecrire(1);
+    Fin.
+    """
+    python_code, errors = compile_algo(code)
+    assert not errors
+    # 'Point' is unknown here, so it must not be initialised as a record
+    assert "'x': 0" not in python_code
@@ -0,0 +1,58 @@
+from compiler.parser import compile_algo_code
+from compiler.runtime import (FixedString, Pointer, _algo_assign_fixed_string, _algo_concat, _algo_fixed_string,
+                              _algo_get_char, _algo_longueur, _algo_make_string, _algo_set_char, _algo_to_string)
+from conftest import run
+
+SRC = """Algorithme Chaines;
+Var
+    s[20], t[40] : Chaine;
+    i, n : Entier;
+Debut
+    s := "abc";
+    s[3] := 'd';
+    s[4] := '#0';
+    n := 0;
+    i := 0;
+    TantQue i < Longueur(s) Faire
+        n := n + 1;
+        i := i + 1;
+    FinTantQue
+    t := Concat(s, s);
+    Ecrire(n, Longueur(t), t);
+Fin.
+"""
+
+def test_length_follows_writes():
+    s = _algo_fixed_string(8)
+    assert _algo_longueur(s) == 0
+    _algo_assign_fixed_string(s, "bonjour!!")
+    assert _algo_to_string(s) == "bonjour" and s.length() == 7
+    _algo_set_char(s, 3, '#0')
+    assert _algo_longueur(s) == 3
+    _algo_set_char(s, 3, 'j')
+    assert _algo_longueur(s) == 7
+    s[1:3] = ['x', None]
+    assert _algo_to_string(s) == "bx" and s.length() == 2
+    assert _algo_get_char(s, 0) == 'b' and _algo_get_char(s, 2) == '#0'
+
+def test_writes_through_pointers():
+    s = _algo_make_string("abc", 10)
+    assert isinstance(s, FixedString) and s.length() == 3
+    p = Pointer("s", {}, index=3, base_var=s)
+    p._set('d')
+    assert s.length() == 4
+    p[-2] = '#0'
+    assert _algo_to_string(s) == "a" and s.length() == 1
+
+def test_is_still_a_list():
+    s = _algo_fixed_string(4, None)
+    _algo_assign_fixed_string(s, "ab")
+    assert s == ['a', 'b', '#0', None]
+    assert _algo_concat(s, "c") == "abc"
+
+def test_programs_use_fixed_strings():
+    python_code, code_object, errors = compile_algo_code(SRC)
+    assert not errors
+    assert "s = _algo_fixed_string(20)" in python_code
+    assert "t = _algo_fixed_string(40, None)" in python_code
+    assert run(code_object) == "4 8 abcdabcd"
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from compiler.incremental import IncrementalCompiler
+from compiler.parser import compile_algo_code
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAM = """Type Point = Enregistrement
+Debut
+    x : Entier;
+    y : Entier;
+Fin;
+
+Fonction Somme(p : Point) : Entier;
+Debut
+    Retourner p.x + p.y;
+Fin;
+
+Procedure Afficher(p : Point);
+Debut
+    Ecrire(p.x, p.y);
+Fin;
+
+Algorithme T;
+Var a : Point;
+Debut
+    a.x <- 1;
+    a.y <- 2;
+    Afficher(a);
+    Ecrire(Somme(a));
+Fin.
+"""
+
+def same_as_full_compile(compiler, code):
+    python_code, code_object, errors = compiler.compile(code)
+    expected = compile_algo_code(code)
+    assert (python_code, errors) == (expected[0], expected[2])
+    assert code_object.co_code == expected[1].co_code
+    return code_object
+
+def test_unchanged_subprograms_are_reused():
+    compiler = IncrementalCompiler()
+    same_as_full_compile(compiler, PROGRAM)
+    assert compiler.regions.stats()['misses'] == 2
+    same_as_full_compile(compiler, PROGRAM.replace("Ecrire(p.x, p.y);", "Ecrire(p.y, p.x);"))
+    stats = compiler.regions.stats()
+    assert (stats['hits'], stats['misses']) == (1, 3)
+
+def test_dependents_of_a_changed_type_are_rebuilt():
+    compiler = IncrementalCompiler()
+    same_as_full_compile(compiler, PROGRAM)
+    same_as_full_compile(compiler, PROGRAM.replace("    y : Entier;", "    y : Reel;"))
+    # Both subprograms read a Point; neither is reused
+    assert compiler.regions.stats()['hits'] == 0
+
+def test_reused_subprogram_reports_shifted_lines():
+    compiler = IncrementalCompiler()
+    compiler.compile(PROGRAM)
+    edited = "// deux lignes\n// de plus\n" + PROGRAM.replace("Retourner p.x + p.y;", "Retourner p.x div 0;")
+    code_object = same_as_full_compile(compiler, edited)
+    assert compiler.regions.stats()['hits'] == 1    # Afficher, two lines lower
+    with pytest.raises(ZeroDivisionError) as excinfo:
+        exec(code_object, {})
+    assert excinfo.traceback[-1].lineno + 1 == 11
+
+def test_matches_full_compile_on_examples():
+    compiler = IncrementalCompiler()
+    path = os.path.join(ROOT, 'examples', 'Listes_Chainees', '03_Probleme_Etudiants_Liste.algo')
+    with open(path, encoding='utf-8') as f:
+        code = f.read()
+    same_as_full_compile(compiler, code)
+    same_as_full_compile(compiler, "\n" + code)
+    assert compiler.regions.stats()['hits'] == compiler.regions.stats()['misses']
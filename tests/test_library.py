@@ -0,0 +1,144 @@
+import contextlib
+import io
+import os
+import traceback
+
+import pytest
+
+from compiler import library
+from compiler.cache import CompilationCache
+from compiler.incremental import IncrementalCompiler
+from compiler.parser import check_algo, compile_algo_code
+from conftest import run
+from web.debugger import TraceRunner
+
+LIBRARY = """Bibliotheque Compteurs;
+
+Type Compteur = Enregistrement
+Debut
+    total : Entier;
+Fin;
+
+Procedure Ajouter(Var c : Compteur, n : Entier)
+Debut
+    c.total := c.total + n;
+Fin;
+
+Fonction Moitie(c : Compteur) : Entier
+Debut
+    Retourner(c.total div 2);
+Fin;
+
+Fin.
+"""
+
+PROGRAM = """// Somme de 1 a 4
+
+Utiliser Compteurs;
+
+Algorithme Compte;
+Var
+    c : Compteur;
+    i : Entier;
+Debut
+    c.total <- 0;
+    Pour i <- 1 a 4 Faire
+        Ajouter(c, i);
+    FinPour
+    Ecrire(c.total, Moitie(c));
+Fin.
+"""
+
+@pytest.fixture
+def libraries(tmp_path, monkeypatch):
+    (tmp_path / "Compteurs.algo").write_text(LIBRARY, encoding='utf-8')
+    loader = library.LibraryLoader([str(tmp_path)])
+    monkeypatch.setattr(library, 'libraries', loader)
+    return loader
+
+def test_program_uses_library(libraries):
+    python_code, code_object, errors = compile_algo_code(PROGRAM)
+    assert not errors
+    assert "def Ajouter(c, n):" in python_code
+    assert run(code_object) == "10 5"
+    assert run(compile(python_code, '<string>', 'exec')) == "10 5"
+    assert run(IncrementalCompiler().compile(PROGRAM)[1]) == "10 5"
+
+def test_library_is_compiled_once_per_content(libraries, tmp_path):
+    compile_algo_code(PROGRAM)
+    compile_algo_code(PROGRAM.replace("1 a 4", "1 a 6"))
+    assert libraries.stats()['misses'] == 1 and libraries.stats()['hits'] == 1
+
+    path = tmp_path / "Compteurs.algo"
+    path.write_text(LIBRARY.replace("div 2", "div 4"), encoding='utf-8')
+    os.utime(path, ns=(0, 0))
+    assert run(compile_algo_code(PROGRAM)[1]) == "10 2"
+    assert libraries.stats()['misses'] == 2
+
+def test_compilation_cache_sees_library_edits(libraries, tmp_path):
+    cache = CompilationCache()
+    assert run(cache.get(PROGRAM).code_object) == "10 5"
+    path = tmp_path / "Compteurs.algo"
+    path.write_text(LIBRARY.replace("div 2", "div 4"), encoding='utf-8')
+    os.utime(path, ns=(0, 0))
+    assert run(cache.get(PROGRAM).code_object) == "10 2"
+
+def test_library_errors(libraries, tmp_path):
+    def codes(source):
+        return [e['error_code'] for e in compile_algo_code(source)[2]]
+    assert codes(PROGRAM.replace("Compteurs;", "Inconnue;")) == ['E7.1']
+    (tmp_path / "Casse.algo").write_text("Bibliotheque Casse;\nProcedure P()\nDebut\n    x <- ;\nFin;\nFin.\n")
+    assert codes(PROGRAM.replace("Compteurs;", "Compteurs;\nUtiliser Casse;")) == ['E7.2']
+    own = "Procedure Ajouter(a : Entier)\nDebut\n    Ecrire(a);\nFin;\n\n"
+    assert codes(PROGRAM.replace("Algorithme", own + "Algorithme")) == ['E7.3']
+    own_type = "Type Compteur = Enregistrement\nDebut\n    total : Reel;\nFin;\n\n"
+    assert codes(PROGRAM.replace("Algorithme", own_type + "Algorithme")) == ['E7.3']
+    local_type = "Type Compteur = Enregistrement\n    n : Entier;\nFin;\nVar\n"
+    assert codes(PROGRAM.replace("Var\n", local_type, 1)) == ['E7.3']
+    assert codes(LIBRARY) == ['E7.4']
+    assert check_algo(LIBRARY) == (True, [])
+
+def test_library_code_runs_on_utiliser_line(libraries):
+    python_code, code_object, errors = compile_algo_code(PROGRAM.replace("Ajouter(c, i);", "Ajouter(i, i);"))
+    with pytest.raises(TypeError) as raised:
+        run(code_object)
+    frames = traceback.extract_tb(raised.value.__traceback__)
+    assert (frames[-1].name, frames[-1].lineno) == ('Ajouter', 3)
+
+def test_debugger_steps_over_library_calls(libraries):
+    code_object = compile_algo_code(PROGRAM)[1]
+    with contextlib.redirect_stdout(io.StringIO()):
+        steps = TraceRunner().run(code_object, {})
+    assert {s['line'] for s in steps} == {10, 11, 12, 14}
+
+def test_shipped_libraries():
+    source = """Utiliser Piles;
+Utiliser Files;
+Utiliser Listes;
+
+Algorithme Structures;
+Var
+    p : Pile;
+    f : File;
+    L : ^Noeud;
+    i : Entier;
+Debut
+    Initialiser_Pile(p);
+    Initialiser_File(f);
+    L := NIL;
+    Pour i <- 1 a 3 Faire
+        Empiler(p, i);
+        Enfiler(f, i * 10);
+        Inserer_Fin(L, i * 100);
+    FinPour
+    Supprimer_Valeur(L, 200);
+    Ecrire(Depiler(p), Defiler(f), Longueur_Liste(L), Rechercher(L, 300));
+Fin.
+"""
+    python_code, code_object, errors = compile_algo_code(source)
+    assert not errors
+    clash = source.replace("Algorithme", "Type Pile = Enregistrement\nDebut\n    sommet : Entier;\nFin;\n\nAlgorithme")
+    errors = compile_algo_code(clash)[2]
+    assert [(e['error_code'], e['line']) for e in errors] == [('E7.3', 5)]
+    assert "Pile" in errors[0]['message'] and "Piles" in errors[0]['message']
+    assert run(code_object) == "3 10 2 Vrai"
@@ -0,0 +1,94 @@
+import contextlib
+import io
+
+from compiler import astgen
+from compiler.codegen import CodeGenerator, statement_lines
+from compiler.parser import compile_algo_code, parse_algo
+from web.debugger import TraceRunner
+
+SRC = """Fonction carre(a : Entier) : Entier;
+Var
+    r : Entier;
+Debut
+    r <- a * a;
+    Retourner r;
+Fin;
+
+Algorithme Lignes;
+Var
+    i, s : Entier;
+    t[3] : Entier;
+Debut
+    s <- 0;
+    Pour i <- 1 a 3 Faire
+        t[i - 1] <- carre(i);
+        s <- s + t[i - 1];
+    FinPour
+    Ecrire(s);
+Fin.
+"""
+
+def trace(code, line_map=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        steps = TraceRunner().run(code, {}, line_map=line_map)
+    return [(s['line'], s['event']) for s in steps]
+
+def test_statement_lines():
+    program, errors = parse_algo(SRC)
+    assert not errors
+    assert statement_lines(program) == {'carre': [5, 6], '_algo_main': [14, 15, 16, 17, 19]}
+    assert statement_lines(program, main_function=False)['<module>'] == [14, 15, 16, 17, 19]
+
+def test_line_map():
+    program, _ = parse_algo(SRC)
+    generator = CodeGenerator()
+    python_code = generator.program(program)
+    lines = python_code.split("\n")
+    assert len(generator.line_map) == len(lines)
+    by_line = dict(zip(lines, generator.line_map))
+    assert by_line["    _algo_ecrire(s)"] == 19
+    assert by_line["    for i in range(1, 3 + 1):"] == 15
+    assert by_line["    return r"] == 6
+    # Prelude and declarations are not statements
+    assert by_line["_algo_install(globals(), _algo_record_sizes, _algo_vars_info)"] == 0
+    assert by_line["def _algo_main():"] == 0
+
+def test_debugger_steps_only_at_statements():
+    python_code, code_object, errors = compile_algo_code(SRC)
+    steps = trace(code_object)
+    assert {line for line, event in steps if event == 'line'} == {5, 6, 14, 15, 16, 17, 19}
+    assert steps[0] == (14, 'line')
+    # No step for the prelude, the function header or the Var lines
+    assert all(line not in (1, 3, 11, 12) for line, _ in steps)
+
+def test_source_fallback_reports_algo_lines(monkeypatch):
+    expected = trace(compile_algo_code(SRC)[1])
+
+    def unsupported(program, filename='<string>'):
+        raise SyntaxError("unsupported")
+    monkeypatch.setattr(astgen, 'compile_program', unsupported)
+    python_code, code_object, errors = compile_algo_code(SRC)
+    assert code_object is not None
+    assert trace(code_object) == expected
+
+def test_programs_without_table_trace_every_line():
+    steps = trace(compile("x = 1\ny = x + 1\n", '<string>', 'exec'))
+    assert [line for line, event in steps if event == 'line'] == [1, 2]
+
+def test_source_with_line_map_steps_at_algo_lines():
+    generator = CodeGenerator()
+    python_code = generator.program(parse_algo(SRC)[0])
+    steps = trace(python_code, generator.line_map)
+    assert steps == trace(compile_algo_code(SRC)[1])
+    algo_lines = SRC.split("\n")
+    for line, event in steps:
+        statement = algo_lines[line - 1].strip()
+        assert not statement.startswith(('Fonction', 'Algorithme', 'Var', 'Debut')), (line, statement)
+        assert statement.endswith(';') or statement.startswith('Pour'), (line, statement)
+
+def test_source_without_line_map_traces_generated_lines():
+    python_code, code_object, errors = compile_algo_code(SRC)
+    steps = trace(python_code)
+    generated = python_code.split("\n")
+    assert "    _algo_ecrire(s)" in [generated[line - 1] for line, event in steps if event == 'line']
+    assert len(steps) > len(trace(code_object))
@@ -0,0 +1,127 @@
+import io
+import json
+
+from compiler.lsp import AlgoLanguageServer, apply_change, display_type, serve
+
+URI = 'file:///tmp/liste.algo'
+
+SRC = """Utiliser Piles;
+Type Noeud = Enregistrement
+Debut
+    val : Entier;
+    suiv : ^Noeud;
+Fin;
+Fonction carre(a : Entier) : Entier;
+Var r : Entier;
+Debut
+    r <- a * a;
+    Retourner r;
+Fin;
+Algorithme Liste;
+Const N = 5;
+Var x : Entier;
+    q : ^Noeud;
+    pl : Pile;
+Debut
+    x <- carre(N);
+    Ecrire(x);
+Fin.
+"""
+
+def position(line, character):
+    return {'textDocument': {'uri': URI}, 'position': {'line': line, 'character': character}}
+
+def open_server():
+    published = []
+    server = AlgoLanguageServer(send=published.append)
+    server.handle({'jsonrpc': '2.0', 'method': 'textDocument/didOpen',
+                   'params': {'textDocument': {'uri': URI, 'languageId': 'algo', 'version': 1, 'text': SRC}}})
+    return server, published
+
+def edit(server, version, line, start, end, text):
+    server.handle({'jsonrpc': '2.0', 'method': 'textDocument/didChange', 'params': {
+        'textDocument': {'uri': URI, 'version': version},
+        'contentChanges': [{'range': {'start': {'line': line, 'character': start},
+                                      'end': {'line': line, 'character': end}}, 'text': text}]}})
+
+def request(server, method, params):
+    return server.handle({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params})['result']
+
+def labels(items):
+    return {item['label'] for item in items}
+
+def test_apply_change_counts_utf16():
+    text = "Ecrire(\"\U0001F600é\");\nFin."
+    change = {'range': {'start': {'line': 0, 'character': 10}, 'end': {'line': 0, 'character': 11}}, 'text': 'e'}
+    assert apply_change(text, change) == "Ecrire(\"\U0001F600e\");\nFin."
+    assert apply_change(text, {'text': 'Fin.'}) == 'Fin.'
+
+def test_display_type():
+    assert display_type('POINTEUR_Noeud') == '^Noeud'
+    assert display_type('TABLEAU_Entier_3') == 'Entier[3]'
+    assert display_type('ENTIER') == 'Entier'
+
+def test_diagnostics_follow_incremental_edits():
+    server, published = open_server()
+    assert published[-1]['params']['diagnostics'] == []
+    edit(server, 2, 18, 9, 14, 'carre(')
+    diagnostics = published[-1]['params']['diagnostics']
+    assert published[-1]['params']['version'] == 2
+    assert diagnostics and diagnostics[0]['code'].startswith('E2')
+    assert diagnostics[0]['range']['start']['line'] >= 18
+    # Undoing the edit reuses the first analysis
+    edit(server, 3, 18, 9, 15, 'carre')
+    assert published[-1]['params']['diagnostics'] == []
+    assert server.analysed == 2
+
+def test_completion_in_scope():
+    server, _ = open_server()
+    main = labels(request(server, 'textDocument/completion', position(18, 4)))
+    assert {'x', 'q', 'pl', 'N', 'carre', 'Empiler', 'Noeud', 'Pile', 'TantQue'} <= main
+    assert 'r' not in main
+    assert {'a', 'r', 'x'} <= labels(request(server, 'textDocument/completion', position(9, 4)))
+
+def test_completion_of_fields_while_the_text_does_not_parse():
+    server, published = open_server()
+    edit(server, 2, 19, 4, 4, 'q->')
+    assert published[-1]['params']['diagnostics']
+    fields = request(server, 'textDocument/completion', position(19, 7))
+    assert [(f['label'], f['detail']) for f in fields] == [('val', 'Entier'), ('suiv', '^Noeud')]
+    edit(server, 3, 19, 4, 7, 'pl.')
+    assert labels(request(server, 'textDocument/completion', position(19, 7))) == {'sommet', 'nombre'}
+
+def test_hover():
+    server, _ = open_server()
+    hover = request(server, 'textDocument/hover', position(18, 4))
+    assert 'x : Entier' in hover['contents']['value']
+    assert hover['range']['start'] == {'line': 18, 'character': 4}
+    assert 'Fonction carre(a : Entier) : Entier' in request(server, 'textDocument/hover', position(18, 11))['contents']['value']
+    assert 'r : Entier' in request(server, 'textDocument/hover', position(9, 4))['contents']['value']
+    assert request(server, 'textDocument/hover', position(17, 0)) is None
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+def test_stdio_session():
+    messages = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {'capabilities': {}}},
+        {'jsonrpc': '2.0', 'method': 'initialized', 'params': {}},
+        {'jsonrpc': '2.0', 'method': 'textDocument/didOpen',
+         'params': {'textDocument': {'uri': URI, 'languageId': 'algo', 'version': 1, 'text': SRC}}},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'textDocument/definition', 'params': position(0, 0)},
+        {'jsonrpc': '2.0', 'id': 3, 'method': 'shutdown'},
+        {'jsonrpc': '2.0', 'method': 'exit'},
+    ]
+    out = io.BytesIO()
+    assert serve(io.BytesIO(b''.join(frame(m) for m in messages)), out) == 0
+    out.seek(0)
+    replies = []
+    while out.tell() < len(out.getvalue()):
+        length = int(out.readline().split(b':')[1])
+        out.readline()
+        replies.append(json.loads(out.read(length)))
+    assert replies[0]['result']['capabilities']['textDocumentSync']['change'] == 2
+    assert replies[1]['method'] == 'textDocument/publishDiagnostics'
+    assert replies[2]['error']['code'] == -32601
+    assert replies[3] == {'jsonrpc': '2.0', 'id': 3, 'result': None}
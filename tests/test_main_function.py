@@ -0,0 +1,73 @@
+import contextlib
+import io
+
+from compiler import astgen
+from compiler.codegen import CodeGenerator, main_locals
+from compiler.parser import compile_algo_code, parse_algo
+from conftest import run
+from web.debugger import TraceRunner
+
+SRC = """Fonction double(a : Entier) : Entier;
+Debut
+    total <- total + 1;
+    Retourner a * 2;
+Fin;
+
+Algorithme Principal;
+Var
+    i, s, total : Entier;
+    x : Entier;
+    p : ^Entier;
+Debut
+    total <- 0;
+    s <- 0;
+    Pour i <- 1 a 4 Faire
+        s <- s + double(i);
+    FinPour
+    p <- &x;
+    p^ <- s;
+    Ecrire(s, total, x);
+Fin.
+"""
+
+def test_main_body_variables_are_fast_locals():
+    program, errors = parse_algo(SRC)
+    assert not errors
+    # total is used by a subprogram, p is a pointer; x, whose address is
+    # taken, is a local cell
+    assert main_locals(program) == {'i', 's', 'x'}
+
+    python_code, code_object, errors = compile_algo_code(SRC)
+    assert "def _algo_main():\n    global total, p\n" in python_code
+    main = next(c for c in code_object.co_consts if getattr(c, 'co_name', None) == '_algo_main')
+    assert {'i', 's'} <= set(main.co_varnames)
+    assert 'total' not in main.co_varnames
+
+def test_same_output_with_and_without_main_function():
+    expected = "20 4 20"
+    for main_function in (True, False):
+        program, _ = parse_algo(SRC)
+        module = astgen.AstGenerator(main_function=main_function).program(program)
+        assert run(compile(module, '<string>', 'exec')) == expected
+        program, _ = parse_algo(SRC)
+        assert run(compile(CodeGenerator(main_function=main_function).program(program), '<string>', 'exec')) == expected
+
+def test_module_level_mode():
+    program, _ = parse_algo(SRC)
+    python_code = CodeGenerator(main_function=False).program(program)
+    assert '_algo_main' not in python_code
+
+def test_debugger_treats_main_as_global_scope():
+    python_code, code_object, errors = compile_algo_code(SRC)
+    runner = TraceRunner()
+    with contextlib.redirect_stdout(io.StringIO()):
+        steps = runner.run(code_object, {})
+    main_steps = [s for s in steps if 's' in s['variables']]
+    assert main_steps
+    last = steps[-1]['variables']
+    assert last['s']['value'] == '20' and last['s']['address'].startswith('@')
+    assert last['i']['type'] == 'Entier'
+    assert last['total']['value'] == '4'
+    # Inside double(): the main program's variables are still listed as globals
+    in_double = [s for s in steps if '_double.a' in s['variables']]
+    assert in_double and all('s' in s['variables'] and 'total' in s['variables'] for s in in_double)
@@ -0,0 +1,54 @@
+from compiler.parser import compile_algo
+from conftest import compile_ok, run
+
+def program(body, decls="Var res : Entier;\n    b : Booleen;"):
+    return f"Algorithme Opt;\n{decls}\nDebut\n{body}\nFin.\n"
+
+def test_long_chain_is_folded():
+    expr = " + ".join(["1"] * 1000)
+    python_code = compile_ok(program(f"res <- {expr};\nEcrire(res);"))
+    assert "res = 1000\n" in python_code
+    assert run(python_code).strip() == "1000"
+
+def test_logical_and_comparison_chains_are_folded():
+    expr = " ET ".join(f"{i} < {i + 1}" for i in range(200))
+    python_code = compile_ok(program(f"b <- {expr};"))
+    assert "b = True\n" in python_code
+
+def test_optimize_can_be_disabled():
+    python_code = compile_ok(program("res <- 2 * 3 + 1;\nEcrire(res);"), optimize=False)
+    assert "res = 2 * 3 + 1" in python_code
+    assert run(python_code).strip() == "7"
+
+def test_dead_branches_are_removed():
+    code = program('Si Faux Alors\n Ecrire("mort");\nSinon\n Ecrire("vif");\nFsi\n'
+                   'Tant Que 1 > 2 Faire\n Ecrire("jamais");\nFin Tant Que\n'
+                   'Si Vrai ET Faux Alors\n Ecrire("mort");\nFsi\n'
+                   'Ecrire("fin");')
+    python_code = compile_ok(code)
+    assert "mort" not in python_code and "jamais" not in python_code
+    assert run(python_code) == "viffin"
+
+def test_emptied_block_gets_pass():
+    code = program('res <- 0;\nTant Que res < 1 Faire\n res <- res + 1;\n'
+                   ' Si Faux Alors\n  Ecrire("x");\n Fsi\nFin Tant Que\nEcrire(res);')
+    assert run(compile_ok(code)).strip() == "1"
+
+def test_constants_are_folded():
+    code = program("res <- N * 2 + 1;\nEcrire(res, NOM, OK);",
+                   'Const N = 20;\n    NOM = "algo";\n    OK = Vrai;\nVar res : Entier;')
+    python_code = compile_ok(code)
+    assert "res = 41\n" in python_code
+    assert run(python_code).split() == ["41", "algo", "Vrai"]
+
+def test_assigned_constant_is_not_folded():
+    code = program("N <- 5;\nres <- N + 1;\nEcrire(res);", "Const N = 1;\nVar res : Entier;")
+    assert run(compile_ok(code)).strip() == "6"
+
+def test_folding_keeps_python_semantics():
+    # Chained comparison, `non` precedence and division by zero must behave
+    # exactly as the unoptimized program does
+    body = "b <- 3 > 2 > 1;\nEcrire(b);\nres <- 7 div 2;\nEcrire(res);"
+    assert run(compile_ok(program(body))) == run(compile_ok(program(body), optimize=False))
+    python_code, _ = compile_algo(program("res <- 1 div 0;"))
+    assert "1 // 0" in python_code
@@ -1,11 +1,8 @@
 import sys
 sys.path.append('src')
-from compiler.parser import pointer_class_code
+from compiler.runtime import Pointer
 
 exec_globals = {}
-exec(pointer_class_code, exec_globals)
-
-Pointer = exec_globals['Pointer']
 base = ['P', 'o', 'i', 'n', 't', 'e', 'u', 'r', 's', '!', '\0'] + [None] * 39
 p1 = Pointer("phrase", exec_globals, index=0, base_var=base)
 p2 = Pointer("ptr", exec_globals, index=0, base_var=p1)
@@ -0,0 +1,108 @@
+import pytest
+
+from compiler import runtime
+from compiler.parser import compile_algo_code
+from compiler.runtime import Pointer
+from conftest import run
+
+def program():
+    return runtime.install({}, {}, {})
+
+def test_pointers_have_no_instance_dict():
+    heap_ptr = program().allouer(8, 4)
+    for p in (Pointer("x"), heap_ptr, heap_ptr + 1, heap_ptr._clone()):
+        assert not hasattr(p, '__dict__')
+        with pytest.raises(AttributeError):
+            p.extra = 1
+
+def test_heap_address_follows_assign_and_clone():
+    prog = program()
+    p = prog.allouer(8, 4)
+    q = prog.Pointer()
+    assert q == None and str(q) == "NIL"
+    q._assign(p)
+    assert q == p and str(q) == str(p) == "@50000"
+    assert str(p._clone() + 1) == "@50004"
+    q._assign(None)
+    assert q._heap_addr is None and q == None
+
+def test_liberer_keeps_the_address():
+    prog = program()
+    p = prog.allouer_record({'val': 1})
+    prog.liberer(p)
+    assert p._heap_addr not in prog.heap
+    assert p != None
+    prog.liberer(None)
+
+INDEXED = """Algorithme Indices;
+Var
+    T : ^Entier;
+    i, s : Entier;
+Debut
+    T := allouer(4 * taille(Entier));
+    Pour i := 0 a 3 Faire
+        T[i] := i * 10;
+    FinPour
+    s := (T + 1)^ + (T + i - 1)^ + T[2];
+    Ecrire(s);
+Fin.
+"""
+
+def test_indexing_builds_no_pointers(monkeypatch):
+    python_code, code_object, errors = compile_algo_code(INDEXED)
+    assert not errors
+    assert "T._set_at(i, i * 10)" in python_code
+    assert "T._get_at(1) + T._get_at(i - 1) + T._get_at(2)" in python_code
+
+    def no_arithmetic(self, offset):
+        raise AssertionError("temporary Pointer")
+    monkeypatch.setattr(Pointer, '__add__', no_arithmetic)
+    monkeypatch.setattr(Pointer, '__sub__', no_arithmetic)
+    assert run(code_object).strip() == "50"
+
+ARRAY_PARAMETER = """Procedure Afficher(p : ^Entier, n : Entier)
+Var
+    i : Entier;
+Debut
+    Pour i <- 0 a n - 1 Faire
+        Ecrire(p[i]);
+    FinPour
+Fin;
+
+Procedure Doubler(p : ^Entier, n : Entier)
+Var
+    i : Entier;
+Debut
+    Pour i <- 0 a n - 1 Faire
+        p[i] <- p[i] * 2;
+    FinPour
+Fin;
+
+Algorithme Parametre;
+Var
+    t[5] : Entier;
+    i : Entier;
+Debut
+    Pour i <- 0 a 4 Faire
+        t[i] <- i;
+    FinPour
+    Doubler(t, 5);
+    Afficher(t, 5);
+Fin.
+"""
+
+def test_array_passed_as_pointer_parameter():
+    # The parameter holds the list itself: it keeps plain subscripts
+    python_code, code_object, errors = compile_algo_code(ARRAY_PARAMETER)
+    assert not errors
+    assert "p[i] = p[i] * 2" in python_code and "_get_at" not in python_code
+    assert run(code_object) == run(python_code) == "02468"
+
+def test_indexed_access_out_of_bounds():
+    p = program().allouer(8, 4)
+    p._set_at(1, 5)
+    assert p[1] == (p + 1)._get() == 5
+    with pytest.raises(IndexError, match="Segmentation fault: Access out of bounds at index 2"):
+        p._get_at(2)
+    with pytest.raises(IndexError, match="Segmentation fault: Write out of bounds at index -1"):
+        p[-1] = 0
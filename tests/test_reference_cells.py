@@ -0,0 +1,84 @@
+import contextlib
+import io
+
+from compiler import astgen
+from compiler.codegen import CodeGenerator, global_cells, local_cells
+from compiler.incremental import IncrementalCompiler
+from compiler.parser import compile_algo_code, parse_algo
+from compiler.runtime import Cell, Pointer
+from conftest import run
+from web.debugger import TraceRunner
+
+SRC = """Procedure incremente(n : Entier);
+Var
+    c : Entier;
+    q : ^Entier;
+Debut
+    c <- n;
+    q <- &c;
+    q^ <- q^ + 1;
+    Ecrire(c);
+Fin;
+
+Algorithme Cellules;
+Var
+    x, y : Entier;
+    p : ^Entier;
+Debut
+    x <- 1;
+    y <- 2;
+    p <- &x;
+    p^ <- p^ + 10;
+    Ecrire(x);
+    p <- &y;
+    Pour x <- 1 a 3 Faire
+        p^ <- p^ + x;
+    FinPour
+    Ecrire(y, x);
+    incremente(41);
+Fin.
+"""
+
+def test_address_taken_variables_are_cells():
+    program, errors = parse_algo(SRC)
+    assert not errors
+    assert global_cells(program) == {'x', 'y'}
+    sub = next(s for s in program.subprograms if s.name == 'incremente')
+    assert local_cells(sub) == {'c'}
+
+    python_code, code_object, errors = compile_algo_code(SRC)
+    assert 'x = _algo_cell(0)' in python_code
+    assert 'Pointer("x", cell=x, alloc_name="x")' in python_code
+    assert 'for x.value in range(' in python_code
+
+def test_writes_through_pointers():
+    # &c inside the procedure used to point at a copy of its locals()
+    expected = "118 342"
+    assert run(compile_algo_code(SRC)[1]) == expected
+    for main_function in (True, False):
+        program, _ = parse_algo(SRC)
+        module = astgen.AstGenerator(main_function=main_function).program(program)
+        assert run(compile(module, '<string>', 'exec')) == expected
+        program, _ = parse_algo(SRC)
+        assert run(compile(CodeGenerator(main_function=main_function).program(program), '<string>', 'exec')) == expected
+    assert run(IncrementalCompiler().compile(SRC)[1]) == expected
+
+def test_pointer_to_cell():
+    cell = Cell(5)
+    p = Pointer("x", cell=cell)
+    assert p._get() == 5
+    p._set(7)
+    assert cell.value == 7
+    assert p._clone().cell is cell
+    assert p == Pointer("x", cell=cell)
+    assert p != Pointer("x", cell=Cell(7))
+
+def test_debugger_shows_cell_values():
+    python_code, code_object, errors = compile_algo_code(SRC)
+    with contextlib.redirect_stdout(io.StringIO()):
+        steps = TraceRunner().run(code_object, {})
+    last = steps[-1]['variables']
+    assert last['y']['value'] == '8' and last['y']['type'] == 'Entier'
+    assert last['x']['value'] == '3'
+    in_sub = [s['variables'] for s in steps if '_incremente.c' in s['variables']]
+    assert in_sub[-1]['_incremente.c']['value'] == '42'
@@ -0,0 +1,62 @@
+import glob
+import os
+import random
+import time
+
+import pytest
+
+from compiler.lexer import lexer as ply_lexer
+from compiler.scanner import Scanner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = sorted(glob.glob(os.path.join(ROOT, 'examples', '**', '*.algo'), recursive=True)
+                + glob.glob(os.path.join(ROOT, 'tests', '**', '*.algo'), recursive=True))
+
+def tokenize(lexer, code):
+    lexer = lexer.clone()
+    lexer.errors = []
+    lexer.lineno = 1
+    lexer.input(code)
+    tokens = [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    return tokens, lexer.errors
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+@pytest.mark.parametrize('path', CORPUS, ids=lambda p: os.path.relpath(p, ROOT))
+def test_same_tokens_as_ply(path):
+    code = read(path)
+    assert tokenize(Scanner(), code) == tokenize(ply_lexer, code)
+
+def test_same_tokens_and_errors_on_noise():
+    rng = random.Random(1234)
+    alphabet = "abzAZ_09 -><=:;.,()[]^&#'\"/\\\n\t\r+*$@?!é"
+    source = read(CORPUS[0])
+    for _ in range(300):
+        noise = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 60)))
+        cut = rng.randint(0, len(source))
+        code = source[:cut] + noise + source[cut:]
+        assert tokenize(Scanner(), code) == tokenize(ply_lexer, code), code
+
+def test_tokens_per_second_benchmark(capsys):
+    code = "\n".join(read(p) for p in CORPUS)
+    count = len(tokenize(Scanner(), code)[0])
+    timings = {}
+    for name, lexer in (('ply', ply_lexer), ('scanner', Scanner())):
+        best = float('inf')
+        for _ in range(3):
+            lexer = lexer.clone()
+            lexer.errors = []
+            start = time.perf_counter()
+            # Pull tokens the way the parser does
+            lexer.input(code)
+            for _ in iter(lexer.token, None):
+                pass
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    with capsys.disabled():
+        print(f"\n{count} tokens: PLY {count / timings['ply']:,.0f} tok/s, "
+              f"scanner {count / timings['scanner']:,.0f} tok/s "
+              f"({timings['ply'] / timings['scanner']:.1f}x)")
+    assert timings['scanner'] < timings['ply']
@@ -0,0 +1,30 @@
+from conftest import compile_ok, run
+
+def test_scalar_slots_are_stored_directly():
+    python_code = compile_ok(
+        "Algorithme T;\nVar t[5] : Entier;\n    m[2][2] : Reel;\n    i : Entier;\nDebut\n"
+        "    Pour i <- 0 a 4 Faire\n        t[i] <- i * i;\n    Fin Pour\n"
+        "    m[1][1] <- 2.5;\n    Ecrire(t[4], m[1][1]);\nFin.\n")
+    assert "_tmp_val" not in python_code
+    assert "t[i] = i * i\n" in python_code
+    assert run(python_code) == "16 2.5"
+
+def test_pointer_slots_are_still_cloned():
+    python_code = compile_ok(
+        "Algorithme T;\nVar x : Entier;\n    tp[2] : ^Entier;\nDebut\n"
+        "    x <- 7;\n    tp[0] <- &x;\n    x <- 8;\n    Ecrire(tp[0]^);\nFin.\n")
+    assert "_tmp_val._clone()" in python_code
+    assert run(python_code) == "8"
+
+def test_typed_reads():
+    python_code = compile_ok(
+        "Algorithme T;\nVar n : Entier;\n    r : Reel;\n    b : Booleen;\nDebut\n"
+        "    Lire(n, r, b);\n    Ecrire(n + 1, r, b);\nFin.\n")
+    assert "_algo_read_typed" not in python_code
+    assert run(python_code, "41 0.5 vrai") == "42 0.5 Vrai"
+
+def test_string_helpers_on_literals_are_folded():
+    python_code = compile_ok(
+        'Algorithme T;\nVar n : Entier;\nDebut\n    n <- Longueur(Concat("ab", "cde"));\n    Ecrire(n);\nFin.\n')
+    assert "n = 5\n" in python_code
+    assert run(python_code) == "5"